@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
 import json
 import os
@@ -10,7 +10,17 @@ from modules.learning_planner import LearningPlanGenerator
 from modules.resume_prep import ResumePreparation
 from modules.ai_skill_assessment import AISkillAssessment
 from modules.ai_interview_prep import AIInterviewPreparation
-import sqlite3
+from modules.analysis_pipeline import AnalysisPipeline
+from modules.market_scores import MarketScoreTable
+from modules.response_cache import ResponseCache
+from modules.response_encoding import ResponseEncoder, encode_json
+from modules.session_store import create_session_store, create_job_store
+from modules.session_lifecycle import SessionLifecycleManager
+from modules.llm_enrichment import EnrichmentRunner
+from modules.llm_clients import get_llm_clients
+from modules.database import get_database
+from modules.pdf_renderer import PDFRenderer, PDFQueueFullError
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables
 load_dotenv()
@@ -18,60 +28,128 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
+# Gemini/Perplexity clients, configured once from the environment (LLM_PROVIDER=offline disables them)
+llm_clients = get_llm_clients()
+
 # Initialize AI modules
 skill_mapper = SkillMappingEngine()
-job_analyzer = JobMarketAnalyzer()
-career_recommender = CareerRecommender()
+# Shared market score table; set MARKET_SCORE_NOISE_SEED for reproducible demo jitter
+market_scores = MarketScoreTable(noise_seed=os.getenv('MARKET_SCORE_NOISE_SEED'))
+job_analyzer = JobMarketAnalyzer(market_scores)
+career_recommender = CareerRecommender(market_scores)
 learning_planner = LearningPlanGenerator()
-resume_prep = ResumePreparation()
-ai_assessment = AISkillAssessment()
-ai_interview = AIInterviewPreparation()
+resume_prep = ResumePreparation(llm_clients)
+# Assessment/interview sessions; use SESSION_STORE=sqlite or file when running several workers
+session_store = create_session_store()
+# Enrichment tickets and PDF jobs: short TTL, their own cap (JOB_TTL_SECONDS, JOB_MAX_COUNT)
+job_store = create_job_store()
+# One bounded background pool for LLM calls (interview feedback, assessment coaching)
+llm_enrichment = EnrichmentRunner(job_store)
+ai_assessment = AISkillAssessment(session_store, coaching=llm_enrichment, llm=llm_clients)
+ai_interview = AIInterviewPreparation(session_store, enrichment=llm_enrichment, llm=llm_clients)
+# Resume PDFs are rendered in worker processes (PDF_RENDER_WORKERS) and polled by job id.
+# Each web worker starts its own pool on its first render, from a forkserver rather than a fork.
+pdf_renderer = PDFRenderer(job_store)
+# Expires idle sessions and enforces SESSION_MAX_COUNT in the background
+session_lifecycle = SessionLifecycleManager(session_store, float(os.getenv('SESSION_SWEEP_SECONDS', '60')))
+session_lifecycle.start()
+job_lifecycle = SessionLifecycleManager(job_store, float(os.getenv('SESSION_SWEEP_SECONDS', '60')))
+job_lifecycle.start()
+
+# Shared pool for running independent analysis stages concurrently
+stage_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('ANALYZE_STAGE_WORKERS', '8')),
+    thread_name_prefix='analyze-stage'
+)
+# Cache of /api/analyze results keyed by the normalized profile (size 0 disables it)
+analysis_cache_size = int(os.getenv('ANALYZE_CACHE_SIZE', '1024'))
+analysis_cache = None
+if analysis_cache_size > 0:
+    analysis_cache = ResponseCache(
+        max_entries=analysis_cache_size,
+        ttl_seconds=float(os.getenv('ANALYZE_CACHE_TTL_SECONDS', '600'))
+    )
+# Static catalog entries are spliced into /api/analyze bodies as pre-encoded JSON
+response_encoder = ResponseEncoder()
+for section in ('overall_market_health', 'real_time_indicators', 'market_forecast',
+                'remote_work_analysis', 'skill_trends', 'geographic_insights'):
+    response_encoder.register(f'market_analysis.{section}', lambda: job_analyzer.static_sections['fragments'])
+response_encoder.register('learning_plan.course_recommendations.*.course', lambda: learning_planner.json_fragments)
+response_encoder.register('learning_plan.certification_recommendations.*.certification', lambda: learning_planner.json_fragments)
+response_encoder.register('learning_plan.project_recommendations.*.project', lambda: learning_planner.json_fragments)
+response_encoder.register('resume_guidance.resume_guidance.template_recommendation', lambda: resume_prep.json_fragments)
+
+analysis_pipeline = AnalysisPipeline(
+    skill_mapper, job_analyzer, career_recommender, learning_planner, resume_prep,
+    executor=stage_executor, cache=analysis_cache,
+    render=lambda analysis: response_encoder.encode({'success': True, **analysis})
+)
+
+# Periodically recompute market scores from fresh market data
+if os.getenv('MARKET_DATA_REFRESH_SECONDS'):
+    market_scores.schedule_refresh(float(os.getenv('MARKET_DATA_REFRESH_SECONDS')), job_analyzer.refresh_market_data)
+
+@app.teardown_appcontext
+def release_database_connection(exc):
+    # Request threads are short-lived; give their SQLite connection back to the pool
+    get_database().release()
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def _student_data(data):
+    """Extract the analyzed profile fields from a request payload"""
+    return {
+        'skills': data.get('skills', []),
+        'interests': data.get('interests', []),
+        'education': data.get('education', ''),
+        'experience': data.get('experience', ''),
+        'goals': data.get('goals', '')
+    }
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_student():
     try:
         data = request.json
-        student_data = {
-            'skills': data.get('skills', []),
-            'interests': data.get('interests', []),
-            'education': data.get('education', ''),
-            'experience': data.get('experience', ''),
-            'goals': data.get('goals', '')
-        }
+        student_data = _student_data(data)
         
-        # Step 1: Skill Mapping
-        skill_analysis = skill_mapper.analyze_skills(student_data)
+        # Run skill mapping -> market analysis -> career recommendations, then
+        # the learning plan and resume guidance in parallel
+        run = analysis_pipeline.analyze(student_data)
         
-        # Step 2: Job Market Analysis
-        market_analysis = job_analyzer.analyze_market(skill_analysis)
+        response = app.response_class(run['body'], mimetype='application/json')
+        response.headers['Server-Timing'] = AnalysisPipeline.format_server_timing(run['timings'])
+        response.headers['X-Cache'] = 'HIT' if run['cached'] else 'MISS'
+        return response
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze a cohort of profiles, streaming one NDJSON line per student as results complete"""
+    try:
+        data = request.json
+        students = data.get('students', []) if isinstance(data, dict) else data
+        if not isinstance(students, list) or not all(isinstance(s, dict) for s in students):
+            return jsonify({'success': False, 'error': 'Expected a list of student profiles'}), 400
         
-        # Step 3: Career Recommendations
-        career_recommendations = career_recommender.get_recommendations(
-            skill_analysis, market_analysis, student_data
-        )
+        max_students = int(os.getenv('ANALYZE_BATCH_MAX', '5000'))
+        if len(students) > max_students:
+            return jsonify({'success': False, 'error': f'At most {max_students} students per batch'}), 400
         
-        # Step 4: Learning Plan
-        learning_plan = learning_planner.generate_plan(
-            skill_analysis, career_recommendations, student_data
-        )
+        results = analysis_pipeline.analyze_batch([_student_data(student) for student in students])
         
-        # Step 5: Resume & Interview Prep
-        resume_guidance = resume_prep.prepare_guidance(
-            student_data, career_recommendations, skill_analysis
-        )
+        def generate():
+            for result in results:
+                if 'error' in result:
+                    yield encode_json({'index': result['index'], 'success': False, 'error': result['error']}) + b'\n'
+                else:
+                    # Prefix the cached {"success":true,...} body with the student's index
+                    yield b'{"index":' + str(result['index']).encode() + b',' + result['body'][1:] + b'\n'
         
-        return jsonify({
-            'success': True,
-            'skill_analysis': skill_analysis,
-            'market_analysis': market_analysis,
-            'career_recommendations': career_recommendations,
-            'learning_plan': learning_plan,
-            'resume_guidance': resume_guidance
-        })
+        return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -81,38 +159,72 @@ def get_skills():
     """Get available skills from the database"""
     return jsonify(skill_mapper.get_available_skills())
 
+@app.route('/api/skills/reload', methods=['POST'])
+def reload_skills():
+    """Refresh the in-memory skill catalog after the skills table changes"""
+    try:
+        catalog = skill_mapper.reload_catalog()
+        return jsonify({'success': True, 'catalog_version': catalog.version, 'total_skills': len(catalog)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/careers/reload', methods=['POST'])
+def reload_careers():
+    """Rebuild career scoring data after the careers table changes"""
+    try:
+        version = career_recommender.reload_careers()
+        return jsonify({'success': True, 'catalog_version': version, 'total_careers': len(career_recommender.catalog)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Hit/miss counters for the /api/analyze response cache"""
+    if analysis_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **analysis_cache.stats()})
+
+@app.route('/api/sessions/stats', methods=['GET'])
+def get_session_stats():
+    """Live assessment/interview sessions and approximate bytes held"""
+    try:
+        return jsonify({**session_lifecycle.gauges(), 'jobs': job_lifecycle.gauges()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/llm/stats', methods=['GET'])
+def get_llm_stats():
+    """Configured LLM providers, circuit breaker state and response cache hit rate"""
+    try:
+        return jsonify(llm_clients.stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/market/refresh', methods=['POST'])
+def refresh_market():
+    """Ingest updated market data (optional) and recompute market scores"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if data.get('market_trends'):
+            version = job_analyzer.ingest_market_data(data['market_trends'])
+        else:
+            version = job_analyzer.refresh_market_data()
+        return jsonify({'success': True, 'market_version': version, 'updated_at': market_scores.updated_at})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/industries', methods=['GET'])
 def get_industries():
     """Get available industries for interest selection"""
     return jsonify(job_analyzer.get_available_industries())
 
 def init_database():
-    """Initialize SQLite database with sample data"""
-    conn = sqlite3.connect('career_advisor.db')
+    """Seed the SQLite database with sample data; tables come from the migrations"""
+    conn = get_database().connection()
     cursor = conn.cursor()
     
-    # Create tables
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS skills (
-            id INTEGER PRIMARY KEY,
-            name TEXT UNIQUE,
-            category TEXT,
-            description TEXT
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS careers (
-            id INTEGER PRIMARY KEY,
-            title TEXT,
-            industry TEXT,
-            required_skills TEXT,
-            salary_range TEXT,
-            growth_rate REAL,
-            description TEXT
-        )
-    ''')
-    
     # Insert sample data
     sample_skills = [
         ('Python Programming', 'Technical', 'Programming language for data science and web development'),
@@ -140,7 +252,7 @@ def init_database():
     cursor.executemany('INSERT OR IGNORE INTO careers (title, industry, required_skills, salary_range, growth_rate, description) VALUES (?, ?, ?, ?, ?, ?)', sample_careers)
     
     conn.commit()
-    conn.close()
+    cursor.close()
 
 # AI Skill Assessment Routes
 @app.route('/api/assessment/start', methods=['POST'])
@@ -164,11 +276,54 @@ def submit_assessment():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _history_page_args():
+    """Read ``limit``, ``before`` and ``fields`` from the query string"""
+    limit = request.args.get('limit')
+    if limit is not None:
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError('limit must be a positive integer')
+        limit = min(limit, int(os.getenv('HISTORY_PAGE_MAX', '100')))
+    return {
+        'limit': limit,
+        'before': request.args.get('before') or None,
+        'fields': request.args.get('fields') or None
+    }
+
+def _history_response(page):
+    """History rows as the JSON body, with the next page's cursor in a header"""
+    response = jsonify(page['history'])
+    if page['next_cursor']:
+        response.headers['X-Next-Cursor'] = page['next_cursor']
+    return response
+
+@app.route('/api/assessment/coaching/<ticket>', methods=['GET'])
+def get_assessment_coaching(ticket):
+    """Poll for AI coaching queued by /api/assessment/submit"""
+    try:
+        result = ai_assessment.get_coaching(ticket)
+        if 'error' in result:
+            return jsonify(result), 404
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/assessment/history/<user_id>', methods=['GET'])
 def get_assessment_history(user_id):
     try:
-        history = ai_assessment.get_assessment_history(user_id)
-        return jsonify(history)
+        return _history_response(ai_assessment.get_assessment_history_page(user_id, **_history_page_args()))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/assessment/history/<user_id>/<assessment_id>', methods=['GET'])
+def get_assessment_report(user_id, assessment_id):
+    try:
+        report = ai_assessment.get_assessment_report(user_id, assessment_id)
+        if report is None:
+            return jsonify({'error': 'Assessment not found'}), 404
+        return jsonify(report)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -207,8 +362,37 @@ def submit_interview():
 @app.route('/api/interview/history/<user_id>', methods=['GET'])
 def get_interview_history(user_id):
     try:
-        history = ai_interview.get_interview_history(user_id)
-        return jsonify(history)
+        return _history_response(ai_interview.get_interview_history_page(user_id, **_history_page_args()))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/interview/history/<user_id>/<interview_id>', methods=['GET'])
+def get_interview_report(user_id, interview_id):
+    try:
+        report = ai_interview.get_interview_report(user_id, interview_id)
+        if report is None:
+            return jsonify({'error': 'Interview not found'}), 404
+        return jsonify(report)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/interview/enrichment/<ticket>', methods=['GET'])
+def get_interview_enrichment(ticket):
+    """Poll for LLM feedback that missed the submit deadline"""
+    try:
+        result = ai_interview.get_enrichment(ticket)
+        if 'error' in result:
+            return jsonify(result), 404
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/interview/questions/<question_id>/stats', methods=['GET'])
+def get_interview_question_stats(question_id):
+    try:
+        return jsonify(ai_interview.get_question_stats(question_id))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -233,20 +417,36 @@ def generate_resume():
             'use_ai': data.get('use_ai', False)
         }
         
-        # Generate resume content
+        # Generate resume content once; the PDF worker renders exactly this content
         resume_content = resume_prep.generate_resume_content(resume_data)
         
-        # Generate PDF
-        pdf_filename = resume_prep.generate_pdf_resume(resume_content, resume_data['personal_info'].get('full_name', 'Resume'))
-        
-        # Extract just the filename from the full path
-        filename_only = os.path.basename(pdf_filename)
+        # Queue the PDF and return immediately; the client polls the job for the download URL
+        job_id = pdf_renderer.submit(resume_content)
         
         return jsonify({
             'success': True,
             'resume_content': resume_content,
-            'download_url': f'/downloads/{filename_only}'
-        })
+            'job_id': job_id,
+            'status_url': f'/api/generate-resume/jobs/{job_id}'
+        }), 202
+    except PDFQueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/generate-resume/jobs/<job_id>', methods=['GET'])
+def get_resume_job(job_id):
+    """Status of a queued resume PDF, with its download URL once rendered"""
+    try:
+        job = pdf_renderer.status(job_id)
+        if job is None:
+            return jsonify({'error': 'Resume job not found'}), 404
+        result = {'job_id': job_id, 'status': job['status']}
+        if job['status'] == 'complete':
+            result['download_url'] = f"/downloads/{job['filename']}"
+        elif job['status'] == 'failed':
+            result['error'] = job.get('error')
+        return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Backfill tool: move per-question interview data out of session_data blobs
+into the normalized interview_answers table
+"""
+
+import argparse
+import os
+from modules.database import Database, get_db_path
+from modules.answer_tables import backfill_interview_answers
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--db', default=get_db_path(), help='database file (default: CAREER_ADVISOR_DB or career_advisor.db)')
+    parser.add_argument('--batch-size', type=int, default=500, help='rows per transaction')
+    parser.add_argument('--vacuum', action='store_true', help='reclaim the freed space afterwards')
+    args = parser.parse_args()
+
+    print(f"🗄️ Backfilling interview answers in {args.db}...")
+    db = Database(args.db)
+    print(f"Schema version {db.migrate()}")
+    db.connection().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    size_before = os.path.getsize(args.db)
+
+    result = backfill_interview_answers(
+        db.connection(), args.batch_size,
+        progress=lambda migrated: print(f"  {migrated} interviews migrated")
+    )
+    if args.vacuum:
+        db.connection().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        db.connection().execute('VACUUM')
+    db.close()
+
+    print(f"✅ Migrated {result['results_migrated']} interviews ({result['answers_written']} answers)")
+    print(f"Database size: {size_before} -> {os.path.getsize(args.db)} bytes")
+    # Assessment responses were never stored before this release; only new
+    # assessments populate assessment_responses.
+
+if __name__ == "__main__":
+    main()
@@ -5,41 +5,28 @@ Database initialization script for AI Career Advisor
 
 import sqlite3
 import os
+from modules.database import get_db_path
+from modules.migrations import apply_migrations
 
 def init_database():
     """Initialize SQLite database with sample data"""
     print("🗄️ Initializing database...")
     
-    # Remove existing database if it exists
-    if os.path.exists('career_advisor.db'):
-        os.remove('career_advisor.db')
+    db_path = get_db_path()
+    
+    # Remove existing database (and any WAL files left beside it) if it exists
+    if os.path.exists(db_path):
+        os.remove(db_path)
         print("Removed existing database")
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
     
-    conn = sqlite3.connect('career_advisor.db')
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    # Create tables
-    print("Creating tables...")
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS skills (
-            id INTEGER PRIMARY KEY,
-            name TEXT UNIQUE,
-            category TEXT,
-            description TEXT
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS careers (
-            id INTEGER PRIMARY KEY,
-            title TEXT,
-            industry TEXT,
-            required_skills TEXT,
-            salary_range TEXT,
-            growth_rate REAL,
-            description TEXT
-        )
-    ''')
+    # Tables, indexes and the schema version
+    print(f"Applied schema version {apply_migrations(conn)}")
     
     # Insert sample skills
     print("Inserting sample skills...")
@@ -1,24 +1,36 @@
 import json
 import random
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
-import sqlite3
-import os
-import requests
-
-# Lazy loader for Gemini to avoid heavy import at startup
-def _get_genai():
-    try:
-        import google.generativeai as _genai
-        return _genai
-    except Exception:
-        return None
+from modules.session_store import MemorySessionStore, SessionConflictError
+from modules.llm_enrichment import EnrichmentRunner
+from modules.llm_clients import LLMClients, get_llm_clients
+from modules.database import Database, get_database, select_fields, fetch_history_page
+from modules.insight_stats import record_interview, load_interview_stats
+from modules.answer_tables import slim_interview_session, save_interview_answers, load_interview_answers
 
 class AIInterviewPreparation:
-    def __init__(self):
-        self.db_path = 'career_advisor.db'
+    SESSION_NAMESPACE = 'interview'
+    # Fields the history API can project; report blobs are only decoded when requested
+    HISTORY_FIELDS = {
+        'interview_id': None,
+        'interview_type': None,
+        'difficulty': None,
+        'start_time': None,
+        'end_time': None,
+        'overall_score': None,
+        'final_report': json.loads
+    }
+
+    def __init__(self, session_store=None, database: Database = None, enrichment: EnrichmentRunner = None,
+                 llm: LLMClients = None):
+        self.db = database or get_database()
+        self.llm = llm or get_llm_clients()
         self.interview_questions = self._load_interview_questions()
-        self.interview_sessions = {}
+        # Sessions live in a shared store so any worker can continue them
+        self.session_store = session_store or MemorySessionStore()
+        # Gemini/Perplexity feedback runs concurrently under a shared deadline
+        self.enrichment = enrichment or EnrichmentRunner()
         self.feedback_criteria = self._load_feedback_criteria()
     
     def _load_interview_questions(self) -> Dict[str, List[Dict]]:
@@ -172,7 +184,7 @@ class AIInterviewPreparation:
             'session_id': f"interview_{user_id}_{int(datetime.now().timestamp())}"
         }
         
-        self.interview_sessions[user_id] = session
+        self.session_store.put(self.SESSION_NAMESPACE, user_id, session)
         
         return {
             'session_id': user_id,
@@ -217,10 +229,11 @@ class AIInterviewPreparation:
     
     def submit_answer(self, user_id: str, answer: str) -> Dict[str, Any]:
         """Submit an answer and get feedback"""
-        if user_id not in self.interview_sessions:
+        stored = self.session_store.get(self.SESSION_NAMESPACE, user_id)
+        if stored is None:
             return {'error': 'Interview session not found'}
         
-        session = self.interview_sessions[user_id]
+        session, version = stored
         current_question_index = session['current_question']
         
         if current_question_index >= len(session['questions']):
@@ -237,68 +250,35 @@ class AIInterviewPreparation:
         # Generate baseline feedback
         feedback = self._generate_feedback(current_question, answer, session['interview_type'])
 
-        # Optionally enrich with Gemini
-        api_key = os.getenv('GEMINI_API_KEY')
-        genai = _get_genai()
-        if genai and api_key:
-            try:
-                genai.configure(api_key=api_key)
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                prompt = (
-                    "You are an interview coach. Score 0-100 and give 2 strengths and 2 improvements, "
-                    "with one concise recommendation line. Use JSON with keys: score, strengths, improvements, recommendation.\n"
-                    f"Question: {current_question['question']}\nAnswer: {answer}"
-                )
-                resp = model.generate_content(prompt)
-                if getattr(resp, 'text', '').strip():
-                    import json as _json
-                    try:
-                        j = _json.loads(resp.text)
-                        if isinstance(j, dict):
-                            if 'score' in j:
-                                feedback['overall_score'] = max(feedback['overall_score'], j['score'])
-                            if 'strengths' in j:
-                                feedback['strengths'] = list(set(feedback.get('strengths', []) + j['strengths']))
-                            if 'improvements' in j:
-                                feedback['areas_for_improvement'] = list(set(feedback.get('areas_for_improvement', []) + j['improvements']))
-                            if 'recommendation' in j:
-                                feedback.setdefault('suggestions', []).append(j['recommendation'])
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-
-        # Optionally enrich with Perplexity
-        pplx_key = os.getenv('PPLX_API_KEY')
-        if pplx_key:
-            try:
-                headers = {
-                    'Authorization': f'Bearer {pplx_key}',
-                    'Content-Type': 'application/json'
-                }
-                payload = {
-                    'model': 'sonar-small-online',
-                    'messages': [
-                        {'role': 'system', 'content': 'You are a concise interview coach.'},
-                        {'role': 'user', 'content': f"Give one tip (<=16 words) to improve this answer to: {current_question['question']}\nAnswer: {answer}"}
-                    ]
-                }
-                r = requests.post('https://api.perplexity.ai/chat/completions', headers=headers, json=payload, timeout=12)
-                if r.status_code == 200:
-                    data = r.json()
-                    tip = data.get('choices', [{}])[0].get('message', {}).get('content')
-                    if tip:
-                        feedback.setdefault('suggestions', []).append(tip.strip())
-            except Exception:
-                pass
+        # Optional LLM enrichment: providers run concurrently and whatever misses
+        # the deadline is attached to a ticket for /api/interview/enrichment/<ticket>
+        enrichment = self.enrichment.run(
+            self._enrichment_calls(current_question, answer),
+            context={'question_id': current_question['id'], 'feedback': feedback}
+        )
+        feedback = self._apply_enrichment(feedback, enrichment['results'])
         session['feedback'][current_question['id']] = feedback
         
         # Move to next question
         session['current_question'] += 1
         
         # Check if interview is complete
-        if session['current_question'] >= len(session['questions']):
-            return self._complete_interview(user_id)
+        completed = session['current_question'] >= len(session['questions'])
+        if completed:
+            session['end_time'] = datetime.now().isoformat()
+            session['status'] = 'completed'
+        
+        try:
+            self.session_store.put(self.SESSION_NAMESPACE, user_id, session, expected_version=version)
+        except SessionConflictError:
+            return {'error': 'Interview session was updated by another request, please retry'}
+        
+        if completed:
+            result = self._complete_interview(user_id, session)
+            # Results are saved to the database; the finished session is no longer needed
+            self.session_store.delete(self.SESSION_NAMESPACE, user_id)
+            result.update(self._enrichment_status(enrichment))
+            return result
         
         # Return next question
         next_question = session['questions'][session['current_question']]
@@ -309,7 +289,86 @@ class AIInterviewPreparation:
             'total_questions': len(session['questions']),
             'progress': (session['current_question'] / len(session['questions'])) * 100,
             'question': next_question,
-            'feedback': feedback
+            'feedback': feedback,
+            **self._enrichment_status(enrichment)
+        }
+    
+    def _enrichment_calls(self, question: Dict, answer: str) -> Dict[str, Any]:
+        """Provider calls for the keys that are configured"""
+        calls = {}
+        if self.llm.gemini.available:
+            calls['gemini'] = lambda: self._gemini_feedback(question, answer)
+        if self.llm.perplexity.available:
+            calls['perplexity'] = lambda: self._perplexity_tip(question, answer)
+        return calls
+    
+    def _gemini_feedback(self, question: Dict, answer: str) -> Any:
+        """Gemini score, strengths and improvements for an answer, as parsed JSON"""
+        prompt = (
+            "You are an interview coach. Score 0-100 and give 2 strengths and 2 improvements, "
+            "with one concise recommendation line. Use JSON with keys: score, strengths, improvements, recommendation.\n"
+            f"Question: {question['question']}\nAnswer: {answer}"
+        )
+        text = self.llm.gemini.generate(prompt)
+        return self._valid_gemini_feedback(json.loads(text)) if text else None
+    
+    def _perplexity_tip(self, question: Dict, answer: str) -> Any:
+        """One short improvement tip from Perplexity"""
+        return self.llm.perplexity.generate(
+            f"Give one tip (<=16 words) to improve this answer to: {question['question']}\nAnswer: {answer}",
+            system='You are a concise interview coach.'
+        )
+    
+    @staticmethod
+    def _valid_gemini_feedback(reply: Any) -> Optional[Dict[str, Any]]:
+        """The Gemini reply if it matches the expected shape, else None"""
+        if not isinstance(reply, dict):
+            return None
+        score = reply.get('score')
+        if score is not None and (isinstance(score, bool) or not isinstance(score, (int, float))):
+            return None
+        for key in ('strengths', 'improvements'):
+            value = reply.get(key)
+            if value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+                return None
+        if reply.get('recommendation') is not None and not isinstance(reply['recommendation'], str):
+            return None
+        return reply
+    
+    def _apply_enrichment(self, feedback: Dict, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge provider results into a copy of the baseline feedback; malformed results are ignored"""
+        feedback = dict(feedback)
+        j = self._valid_gemini_feedback(results.get('gemini'))
+        if j is not None:
+            if j.get('score') is not None:
+                feedback['overall_score'] = max(feedback['overall_score'], j['score'])
+            if j.get('strengths'):
+                feedback['strengths'] = list(set(feedback.get('strengths', []) + j['strengths']))
+            if j.get('improvements'):
+                feedback['areas_for_improvement'] = list(set(feedback.get('areas_for_improvement', []) + j['improvements']))
+            if j.get('recommendation'):
+                feedback['suggestions'] = feedback.get('suggestions', []) + [j['recommendation']]
+        if isinstance(results.get('perplexity'), str) and results['perplexity']:
+            feedback['suggestions'] = feedback.get('suggestions', []) + [results['perplexity']]
+        return feedback
+    
+    def _enrichment_status(self, enrichment: Dict[str, Any]) -> Dict[str, Any]:
+        """Ticket fields for a response when some providers missed the deadline"""
+        if not enrichment['ticket']:
+            return {}
+        return {'enrichment_ticket': enrichment['ticket'], 'enrichment_pending': enrichment['pending']}
+    
+    def get_enrichment(self, ticket: str) -> Dict[str, Any]:
+        """Feedback with any late LLM enrichment merged in, for a submit_answer ticket"""
+        state = self.enrichment.poll(ticket)
+        if state is None:
+            return {'error': 'Enrichment ticket not found'}
+        return {
+            'ticket': ticket,
+            'status': state['status'],
+            'pending': state['pending'],
+            'question_id': state['context'].get('question_id'),
+            'feedback': self._apply_enrichment(state['context'].get('feedback', {}), state['results'])
         }
     
     def _generate_feedback(self, question: Dict, answer: str, interview_type: str) -> Dict[str, Any]:
@@ -492,12 +551,8 @@ class AIInterviewPreparation:
         
         return feedback
     
-    def _complete_interview(self, user_id: str) -> Dict[str, Any]:
+    def _complete_interview(self, user_id: str, session: Dict) -> Dict[str, Any]:
         """Complete the interview and generate final report"""
-        session = self.interview_sessions[user_id]
-        session['end_time'] = datetime.now().isoformat()
-        session['status'] = 'completed'
-        
         # Calculate overall performance
         feedback_scores = [feedback['overall_score'] for feedback in session['feedback'].values()]
         overall_score = sum(feedback_scores) / len(feedback_scores) if feedback_scores else 0
@@ -506,20 +561,15 @@ class AIInterviewPreparation:
         final_report = self._generate_final_report(session, overall_score)
 
         # Optional Gemini summary paragraph
-        api_key = os.getenv('GEMINI_API_KEY')
-        genai = _get_genai()
-        if genai and api_key:
+        if self.llm.gemini.available:
             try:
-                genai.configure(api_key=api_key)
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                prompt = (
+                summary = self.llm.gemini.generate(
                     "Summarize this mock interview performance in one short paragraph (<=70 words) "
                     "with an encouraging tone.\n"
                     f"Report: {final_report}"
                 )
-                resp = model.generate_content(prompt)
-                if getattr(resp, 'text', '').strip():
-                    final_report['ai_summary'] = resp.text.strip()
+                if summary:
+                    final_report['ai_summary'] = summary
             except Exception:
                 pass
         
@@ -699,106 +749,103 @@ class AIInterviewPreparation:
     
     def _save_interview_results(self, user_id: str, session: Dict, final_report: Dict):
         """Save interview results to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create interview results table if it doesn't exist
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS interview_results (
-                id INTEGER PRIMARY KEY,
-                user_id TEXT,
-                interview_id TEXT,
-                interview_type TEXT,
-                difficulty TEXT,
-                start_time TEXT,
-                end_time TEXT,
-                overall_score REAL,
-                session_data TEXT,
-                final_report TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Insert interview results
-        cursor.execute('''
-            INSERT INTO interview_results 
-            (user_id, interview_id, interview_type, difficulty, start_time, end_time, overall_score, session_data, final_report)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            session['session_id'],
-            session['interview_type'],
-            session['difficulty'],
-            session['start_time'],
-            session['end_time'],
-            final_report['interview_summary']['overall_score'],
-            json.dumps(session),
-            json.dumps(final_report)
-        ))
-        
-        conn.commit()
-        conn.close()
+        # The table and its indexes are created by modules/migrations.py
+        with self.db.transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO interview_results 
+                (user_id, interview_id, interview_type, difficulty, start_time, end_time, overall_score, session_data, final_report)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                user_id,
+                session['session_id'],
+                session['interview_type'],
+                session['difficulty'],
+                session['start_time'],
+                session['end_time'],
+                final_report['interview_summary']['overall_score'],
+                json.dumps(slim_interview_session(session)),
+                json.dumps(final_report)
+            ))
+            # Answers and per-question scores go to their own rows, not the session blob
+            save_interview_answers(cursor, cursor.lastrowid, session)
+            # Keep the per-user aggregates in step with the history
+            record_interview(cursor, user_id, session['interview_type'],
+                             final_report['interview_summary']['overall_score'])
     
-    def get_interview_history(self, user_id: str) -> List[Dict]:
-        """Get interview history for a user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT interview_id, interview_type, difficulty, start_time, end_time, overall_score, final_report
-            FROM interview_results 
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-        ''', (user_id,))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        history = []
-        for result in results:
-            history.append({
-                'interview_id': result[0],
-                'interview_type': result[1],
-                'difficulty': result[2],
-                'start_time': result[3],
-                'end_time': result[4],
-                'overall_score': result[5],
-                'final_report': json.loads(result[6])
-            })
-        
-        return history
+    def get_interview_history(self, user_id: str, limit: int = None, before: str = None,
+                              fields=None) -> List[Dict]:
+        """Get interview history for a user, newest first"""
+        return self.get_interview_history_page(user_id, limit, before, fields)['history']
+    
+    def get_interview_history_page(self, user_id: str, limit: int = None, before: str = None,
+                                   fields=None) -> Dict[str, Any]:
+        """One page of history plus the cursor for the next page (None on the last page)"""
+        return fetch_history_page(
+            self.db, 'interview_results', select_fields(fields, self.HISTORY_FIELDS),
+            self.HISTORY_FIELDS, user_id, limit, before
+        )
+    
+    def get_interview_report(self, user_id: str, interview_id: str) -> Optional[Dict]:
+        """Full stored result for a single interview, including its answers, or None"""
+        rows = self.db.query('''
+            SELECT interview_id, interview_type, difficulty, start_time, end_time, overall_score,
+                   session_data, final_report, id
+            FROM interview_results
+            WHERE interview_id = ? AND user_id = ?
+            ORDER BY id DESC LIMIT 1
+        ''', (interview_id, user_id))
+        if not rows:
+            return None
+        
+        result = rows[0]
+        return {
+            'interview_id': result[0],
+            'interview_type': result[1],
+            'difficulty': result[2],
+            'start_time': result[3],
+            'end_time': result[4],
+            'overall_score': result[5],
+            'session_data': json.loads(result[6]),
+            'final_report': json.loads(result[7]),
+            'answers': load_interview_answers(self.db, result[8])
+        }
+    
+    def get_question_stats(self, question_id: str) -> Dict[str, Any]:
+        """How users score on one question across all stored interviews"""
+        count, average, best, worst = self.db.query('''
+            SELECT COUNT(overall_score), AVG(overall_score), MAX(overall_score), MIN(overall_score)
+            FROM interview_answers WHERE question_id = ?
+        ''', (question_id,))[0]
+        return {
+            'question_id': question_id,
+            'times_answered': count,
+            'average_score': round(average, 1) if average is not None else None,
+            'best_score': best,
+            'lowest_score': worst
+        }
     
     def get_interview_insights(self, user_id: str) -> Dict[str, Any]:
         """Get interview performance insights for a user"""
-        history = self.get_interview_history(user_id)
+        # Running aggregates maintained on save; a single-row lookup
+        stats = load_interview_stats(self.db, user_id)
         
-        if not history:
+        if not stats:
             return {'message': 'No interview history found'}
         
-        # Calculate performance trends
-        scores = [interview['overall_score'] for interview in history]
-        avg_score = sum(scores) / len(scores)
-        
         # Performance by interview type
-        type_scores = {}
-        for interview in history:
-            interview_type = interview['interview_type']
-            if interview_type not in type_scores:
-                type_scores[interview_type] = []
-            type_scores[interview_type].append(interview['overall_score'])
-        
-        for interview_type in type_scores:
-            type_scores[interview_type] = round(
-                sum(type_scores[interview_type]) / len(type_scores[interview_type]), 1
-            )
+        type_scores = {
+            interview_type: round(score_sum / count, 1)
+            for interview_type, (count, score_sum) in stats['types'].items()
+        }
         
         return {
-            'total_interviews': len(history),
-            'average_score': round(avg_score, 1),
-            'best_score': max(scores),
-            'latest_score': scores[0],
+            'total_interviews': stats['count'],
+            'average_score': round(stats['sum'] / stats['count'], 1),
+            'best_score': stats['max'],
+            'latest_score': stats['latest'],
+            'recent_scores': stats['recent'],
             'performance_by_type': type_scores,
-            'improvement_trend': 'Improving' if len(scores) > 1 and scores[0] > scores[-1] else 'Stable',
+            'improvement_trend': 'Improving' if stats['count'] > 1 and stats['latest'] > stats['first'] else 'Stable',
             'recommended_focus': self._get_recommended_focus(type_scores)
         }
     
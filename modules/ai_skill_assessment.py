@@ -1,24 +1,41 @@
 import json
 import random
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
-import sqlite3
-import os
-
-# Lazy loader for Gemini to avoid heavy import at startup
-def _get_genai():
-    try:
-        import google.generativeai as _genai
-        return _genai
-    except Exception:
-        return None
+from modules.session_store import MemorySessionStore, SessionConflictError
+from modules.llm_enrichment import EnrichmentRunner
+from modules.llm_clients import LLMClients, get_llm_clients
+from modules.database import Database, get_database, select_fields, fetch_history_page
+from modules.insight_stats import record_assessment, load_skill_stats
+from modules.answer_tables import save_assessment_responses
 
 class AISkillAssessment:
-    def __init__(self):
-        self.db_path = 'career_advisor.db'
+    SESSION_NAMESPACE = 'assessment'
+    # Fields the history API can project; report blobs are only decoded when requested
+    HISTORY_FIELDS = {
+        'assessment_id': None,
+        'start_time': None,
+        'end_time': None,
+        'final_scores': json.loads,
+        'assessment_report': json.loads
+    }
+
+    def __init__(self, session_store=None, database: Database = None, coaching: EnrichmentRunner = None,
+                 llm: LLMClients = None):
+        self.db = database or get_database()
+        self.llm = llm or get_llm_clients()
         self.assessment_questions = self._load_assessment_questions()
         self.skill_categories = self._load_skill_categories()
-        self.assessment_sessions = {}
+        # question id -> (phase, question), for storing responses per question
+        self.question_lookup = {
+            question['id']: (phase, question)
+            for phase, questions in self.assessment_questions.items()
+            for question in questions
+        }
+        # Sessions live in a shared store so any worker can continue them
+        self.session_store = session_store or MemorySessionStore()
+        # Per-question AI coaching is generated in the background and polled by ticket
+        self.coaching = coaching or EnrichmentRunner()
     
     def _load_assessment_questions(self) -> Dict[str, List[Dict]]:
         """Load comprehensive assessment questions for different skill categories"""
@@ -239,7 +256,7 @@ class AISkillAssessment:
             'assessment_id': f"assessment_{user_id}_{int(datetime.now().timestamp())}"
         }
         
-        self.assessment_sessions[user_id] = session
+        self.session_store.put(self.SESSION_NAMESPACE, user_id, session)
         
         return {
             'session_id': user_id,
@@ -255,10 +272,11 @@ class AISkillAssessment:
     
     def submit_answer(self, user_id: str, answer: Any) -> Dict[str, Any]:
         """Submit an answer and get the next question"""
-        if user_id not in self.assessment_sessions:
+        stored = self.session_store.get(self.SESSION_NAMESPACE, user_id)
+        if stored is None:
             return {'error': 'Assessment session not found'}
         
-        session = self.assessment_sessions[user_id]
+        session, version = stored
         current_phase = session['current_phase']
         current_question = session['current_question']
         
@@ -269,27 +287,6 @@ class AISkillAssessment:
         # Update skill scores based on answer
         self._update_skill_scores(session, current_phase, current_question, answer)
         
-        # Optional AI coaching for this question
-        ai_coaching = None
-        api_key = os.getenv('GEMINI_API_KEY')
-        genai = _get_genai()
-        if genai and api_key:
-            try:
-                genai.configure(api_key=api_key)
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                q = self.assessment_questions[current_phase][current_question]
-                prompt = (
-                    "You are a career coach. In one short paragraph (max 70 words), provide coaching for a "
-                    "user who answered the following assessment item. Focus on how to improve and what to learn next.\n"
-                    f"Question: {q['question']}\n"
-                    f"User answer (index or list): {answer}\n"
-                )
-                resp = model.generate_content(prompt)
-                if getattr(resp, 'text', '').strip():
-                    ai_coaching = resp.text.strip()
-            except Exception:
-                ai_coaching = None
-
         # Move to next question
         session['current_question'] += 1
         
@@ -306,7 +303,20 @@ class AISkillAssessment:
                 session['current_phase'] = phases[current_phase_index + 1]
             else:
                 # Assessment complete
-                return self._complete_assessment(user_id)
+                session['end_time'] = datetime.now().isoformat()
+                session['status'] = 'completed'
+                if not self._save_session(user_id, session, version):
+                    return {'error': 'Assessment session was updated by another request, please retry'}
+                result = self._complete_assessment(user_id, session)
+                # Results are saved to the database; the finished session is no longer needed
+                self.session_store.delete(self.SESSION_NAMESPACE, user_id)
+                return result
+        
+        if not self._save_session(user_id, session, version):
+            return {'error': 'Assessment session was updated by another request, please retry'}
+        
+        # Optional AI coaching for this answer, queued so the next question returns at once
+        coaching_ticket = self._queue_coaching(self.assessment_questions[current_phase][current_question], answer)
         
         return {
             'session_id': user_id,
@@ -315,7 +325,39 @@ class AISkillAssessment:
             'total_questions': len(self.assessment_questions[session['current_phase']]),
             'progress': self._calculate_progress(session),
             'question': self._get_current_question(session),
-            'ai_coaching': ai_coaching
+            'ai_coaching': None,
+            'coaching_ticket': coaching_ticket
+        }
+    
+    def _queue_coaching(self, question: Dict, answer: Any) -> Any:
+        """Start Gemini coaching for an answer in the background; returns its ticket (None if disabled)"""
+        if not self.llm.gemini.available:
+            return None
+        queued = self.coaching.run(
+            {'coaching': lambda: self._generate_coaching(question, answer)},
+            context={'question_id': question['id']}, deadline_seconds=0
+        )
+        return queued['ticket']
+    
+    def _generate_coaching(self, question: Dict, answer: Any) -> Any:
+        """One short coaching paragraph for an assessment answer"""
+        return self.llm.gemini.generate(
+            "You are a career coach. In one short paragraph (max 70 words), provide coaching for a "
+            "user who answered the following assessment item. Focus on how to improve and what to learn next.\n"
+            f"Question: {question['question']}\n"
+            f"User answer (index or list): {answer}\n"
+        )
+    
+    def get_coaching(self, ticket: str) -> Dict[str, Any]:
+        """Status and text of queued AI coaching"""
+        state = self.coaching.poll(ticket)
+        if state is None:
+            return {'error': 'Coaching ticket not found'}
+        return {
+            'ticket': ticket,
+            'status': state['status'],
+            'question_id': state['context'].get('question_id'),
+            'ai_coaching': state['results'].get('coaching')
         }
     
     def _get_current_question(self, session: Dict) -> Dict[str, Any]:
@@ -340,27 +382,38 @@ class AISkillAssessment:
     def _update_skill_scores(self, session: Dict, phase: str, question_index: int, answer: Any):
         """Update skill scores based on the answer"""
         question = self.assessment_questions[phase][question_index]
-        skill_mapping = question.get('skill_mapping', {})
         
-        for skill, score_mapping in skill_mapping.items():
+        for skill in question.get('skill_mapping', {}):
             if skill not in session['skill_scores']:
                 session['skill_scores'][skill] = 0
-            
-            # Determine score based on answer type
-            if question['type'] == 'scale':
-                score = answer if isinstance(answer, int) else 0
-            elif question['type'] == 'multiple_choice':
-                score = answer if isinstance(answer, int) else 0
-            elif question['type'] == 'checkbox':
-                # For checkbox, count number of selected options
-                score = len(answer) if isinstance(answer, list) else 0
-            else:
-                score = 0
-            
-            # Map score to skill level
-            if score < len(score_mapping):
-                skill_score = score_mapping[score]
-                session['skill_scores'][skill] += skill_score
+        
+        for skill, skill_score in self._skill_points(question, answer).items():
+            session['skill_scores'][skill] += skill_score
+    
+    def _skill_points(self, question: Dict, answer: Any) -> Dict[str, int]:
+        """Points an answer earns for each skill the question maps to"""
+        # Determine score based on answer type
+        if question['type'] == 'scale':
+            score = answer if isinstance(answer, int) else 0
+        elif question['type'] == 'multiple_choice':
+            score = answer if isinstance(answer, int) else 0
+        elif question['type'] == 'checkbox':
+            # For checkbox, count number of selected options
+            score = len(answer) if isinstance(answer, list) else 0
+        else:
+            score = 0
+        
+        # Map score to skill level
+        return {
+            skill: score_mapping[score]
+            for skill, score_mapping in question.get('skill_mapping', {}).items()
+            if score < len(score_mapping)
+        }
+    
+    def _response_score(self, question_id: str, answer: Any) -> float:
+        """Total skill points for one stored response"""
+        entry = self.question_lookup.get(question_id)
+        return sum(self._skill_points(entry[1], answer).values()) if entry else 0
     
     def _calculate_progress(self, session: Dict) -> Dict[str, Any]:
         """Calculate assessment progress"""
@@ -375,12 +428,16 @@ class AISkillAssessment:
             'total_phases': len(self.assessment_questions)
         }
     
-    def _complete_assessment(self, user_id: str) -> Dict[str, Any]:
+    def _save_session(self, user_id: str, session: Dict, version: int) -> bool:
+        """Write the session back unless another request updated it first"""
+        try:
+            self.session_store.put(self.SESSION_NAMESPACE, user_id, session, expected_version=version)
+            return True
+        except SessionConflictError:
+            return False
+    
+    def _complete_assessment(self, user_id: str, session: Dict) -> Dict[str, Any]:
         """Complete the assessment and generate results"""
-        session = self.assessment_sessions[user_id]
-        session['end_time'] = datetime.now().isoformat()
-        session['status'] = 'completed'
-        
         # Calculate final skill scores
         final_scores = self._calculate_final_scores(session)
         
@@ -391,20 +448,15 @@ class AISkillAssessment:
         self._save_assessment_results(user_id, session, final_scores, assessment_report)
         
         # Optional AI refinement of recommendations
-        api_key = os.getenv('GEMINI_API_KEY')
-        genai = _get_genai()
-        if genai and api_key:
+        if self.llm.gemini.available:
             try:
-                genai.configure(api_key=api_key)
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                prompt = (
+                text = self.llm.gemini.generate(
                     "Given the following skill scores and report, create 3 concise, actionable career development tips "
                     "(bulleted, <=12 words each).\n"
                     f"Scores: {final_scores}\nReport: {assessment_report}"
                 )
-                resp = model.generate_content(prompt)
-                if getattr(resp, 'text', '').strip():
-                    tips = [t.strip('-• ').strip() for t in resp.text.split('\n') if t.strip()]
+                if text:
+                    tips = [t.strip('-• ').strip() for t in text.split('\n') if t.strip()]
                     tips = [t for t in tips if t]
                     if tips:
                         recs = self._generate_recommendations(final_scores, session)
@@ -601,88 +653,82 @@ class AISkillAssessment:
     
     def _save_assessment_results(self, user_id: str, session: Dict, final_scores: Dict, report: Dict):
         """Save assessment results to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create assessment results table if it doesn't exist
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS assessment_results (
-                id INTEGER PRIMARY KEY,
-                user_id TEXT,
-                assessment_id TEXT,
-                start_time TEXT,
-                end_time TEXT,
-                final_scores TEXT,
-                assessment_report TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        # The table and its indexes are created by modules/migrations.py
+        with self.db.transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO assessment_results 
+                (user_id, assessment_id, start_time, end_time, final_scores, assessment_report)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                user_id,
+                session['assessment_id'],
+                session['start_time'],
+                session['end_time'],
+                json.dumps(final_scores),
+                json.dumps(report)
+            ))
+            save_assessment_responses(
+                cursor, cursor.lastrowid, session.get('responses', {}),
+                {question_id: entry[0] for question_id, entry in self.question_lookup.items()},
+                self._response_score
             )
-        ''')
-        
-        # Insert assessment results
-        cursor.execute('''
-            INSERT INTO assessment_results 
-            (user_id, assessment_id, start_time, end_time, final_scores, assessment_report)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            session['assessment_id'],
-            session['start_time'],
-            session['end_time'],
-            json.dumps(final_scores),
-            json.dumps(report)
-        ))
-        
-        conn.commit()
-        conn.close()
+            # Keep the per-user aggregates in step with the history
+            record_assessment(cursor, user_id, final_scores)
     
-    def get_assessment_history(self, user_id: str) -> List[Dict]:
-        """Get assessment history for a user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+    def get_assessment_history(self, user_id: str, limit: int = None, before: str = None,
+                               fields=None) -> List[Dict]:
+        """Get assessment history for a user, newest first"""
+        return self.get_assessment_history_page(user_id, limit, before, fields)['history']
+    
+    def get_assessment_history_page(self, user_id: str, limit: int = None, before: str = None,
+                                    fields=None) -> Dict[str, Any]:
+        """One page of history plus the cursor for the next page (None on the last page)"""
+        return fetch_history_page(
+            self.db, 'assessment_results', select_fields(fields, self.HISTORY_FIELDS),
+            self.HISTORY_FIELDS, user_id, limit, before
+        )
+    
+    def get_assessment_report(self, user_id: str, assessment_id: str) -> Optional[Dict]:
+        """Full stored result for a single assessment, or None if it does not exist"""
+        rows = self.db.query('''
             SELECT assessment_id, start_time, end_time, final_scores, assessment_report
-            FROM assessment_results 
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-        ''', (user_id,))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        history = []
-        for result in results:
-            history.append({
-                'assessment_id': result[0],
-                'start_time': result[1],
-                'end_time': result[2],
-                'final_scores': json.loads(result[3]),
-                'assessment_report': json.loads(result[4])
-            })
+            FROM assessment_results
+            WHERE assessment_id = ? AND user_id = ?
+            ORDER BY id DESC LIMIT 1
+        ''', (assessment_id, user_id))
+        if not rows:
+            return None
         
-        return history
+        result = rows[0]
+        return {
+            'assessment_id': result[0],
+            'start_time': result[1],
+            'end_time': result[2],
+            'final_scores': json.loads(result[3]),
+            'assessment_report': json.loads(result[4])
+        }
     
     def get_skill_insights(self, user_id: str) -> Dict[str, Any]:
         """Get skill development insights for a user"""
-        history = self.get_assessment_history(user_id)
+        # Aggregates hold the latest and previous scores; no history scan needed
+        stats = load_skill_stats(self.db, user_id)
         
-        if not history:
+        if not stats:
             return {'message': 'No assessment history found'}
         
-        # Compare latest assessment with previous ones
-        latest = history[0]
-        previous = history[1] if len(history) > 1 else None
-        
+        latest = self.get_assessment_history(user_id, limit=1)
         insights = {
-            'latest_assessment': latest,
+            'latest_assessment': latest[0] if latest else None,
+            'total_assessments': stats['count'],
             'skill_progress': {},
             'improvement_areas': [],
             'strengths_maintained': []
         }
         
-        if previous:
-            latest_scores = latest['final_scores']
-            previous_scores = previous['final_scores']
+        # Compare latest assessment with the previous one
+        if stats['count'] > 1:
+            latest_scores = stats['latest']
+            previous_scores = stats['previous']
             
             for skill in latest_scores:
                 if skill in previous_scores:
@@ -0,0 +1,246 @@
+import time
+from concurrent.futures import Executor
+from typing import Dict, List, Any, Callable, Iterator, Optional
+from modules.stage_graph import StageGraph
+from modules.response_cache import ResponseCache
+
+
+class AnalysisPipeline:
+    """Runs the five /api/analyze stages as a dependency graph.
+
+    Skill mapping feeds market analysis, both feed the career recommender,
+    and the learning plan and resume guidance then run side by side, so the
+    request latency follows the critical path rather than the sum of stages.
+    With a ``cache``, results are reused for profiles that normalize to the
+    same skills, interests and background. With a ``render`` function the
+    encoded response body is produced once per result and cached alongside it.
+    """
+
+    def __init__(self, skill_mapper, job_analyzer, career_recommender,
+                 learning_planner, resume_prep, executor: Optional[Executor] = None,
+                 cache: Optional[ResponseCache] = None,
+                 render: Optional[Callable[[Dict[str, Any]], bytes]] = None):
+        self.skill_mapper = skill_mapper
+        self.job_analyzer = job_analyzer
+        self.career_recommender = career_recommender
+        self.learning_planner = learning_planner
+        self.resume_prep = resume_prep
+        self.executor = executor
+        self.cache = cache
+        self.render = render
+
+    def normalize_student_data(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Canonical form of a profile: deduplicated, case-insensitively sorted skills and interests"""
+        catalog = self.skill_mapper.catalog
+        skills = {}
+        for skill in student_data.get('skills') or []:
+            name = str(skill).strip()
+            known = catalog.by_lower_name.get(name.lower())
+            # Known skills keep their catalog spelling so they still match
+            skills.setdefault(name.lower(), known['name'] if known else name.lower())
+
+        return {
+            'skills': [skills[key] for key in sorted(skills)],
+            'interests': self._normalize_terms(student_data.get('interests') or []),
+            'education': str(student_data.get('education') or '').strip(),
+            'experience': str(student_data.get('experience') or '').strip(),
+            'goals': str(student_data.get('goals') or '').strip()
+        }
+
+    def data_version(self) -> tuple:
+        """Versions of the skills, careers and market data results depend on"""
+        return (
+            self.skill_mapper.catalog.version,
+            self.career_recommender.catalog_version,
+            self.career_recommender.market_scores.version
+        )
+
+    @staticmethod
+    def _normalize_terms(terms: List[str]) -> List[str]:
+        """Lowercase, strip, deduplicate and sort free-text terms"""
+        return sorted({str(term).strip().lower() for term in terms if str(term).strip()})
+
+    def _build_graph(self, student_data: Dict[str, Any]) -> StageGraph:
+        """Wire the analysis stages for a single student"""
+        graph = StageGraph()
+        graph.add_stage(
+            'skill_analysis',
+            lambda: self.skill_mapper.analyze_skills(student_data)
+        )
+        graph.add_stage(
+            'market_analysis',
+            lambda skill_analysis: self.job_analyzer.analyze_market(skill_analysis),
+            depends_on=['skill_analysis']
+        )
+        graph.add_stage(
+            'career_recommendations',
+            lambda skill_analysis, market_analysis: self.career_recommender.get_recommendations(
+                skill_analysis, market_analysis, student_data
+            ),
+            depends_on=['skill_analysis', 'market_analysis']
+        )
+        graph.add_stage(
+            'learning_plan',
+            lambda skill_analysis, career_recommendations: self.learning_planner.generate_plan(
+                skill_analysis, career_recommendations, student_data
+            ),
+            depends_on=['skill_analysis', 'career_recommendations']
+        )
+        graph.add_stage(
+            'resume_guidance',
+            lambda skill_analysis, career_recommendations: self.resume_prep.prepare_guidance(
+                student_data, career_recommendations, skill_analysis
+            ),
+            depends_on=['skill_analysis', 'career_recommendations']
+        )
+        return graph
+
+    def analyze(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze a student profile and return stage results, encoded body, timings and cache status"""
+        # Every path scores the canonical profile, so results never depend on whether caching is on
+        started = time.perf_counter()
+        student_data = self.normalize_student_data(student_data)
+        if self.cache is None:
+            return {**self._run_stages(student_data), 'cached': False}
+
+        lookup = self.cache.get_or_compute(
+            ResponseCache.make_key(student_data),
+            lambda: self._run_stages(student_data),
+            version=self.data_version()
+        )
+
+        run = lookup['value']
+        timings = run['timings']
+        if lookup['hit']:
+            timings = {'cache': round((time.perf_counter() - started) * 1000, 2)}
+            timings['total'] = timings['cache']
+        return {'analysis': run['analysis'], 'body': run['body'], 'timings': timings, 'cached': lookup['hit']}
+
+    def _run_stages(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the stage graph for one profile and render the result"""
+        run = self._build_graph(student_data).run(self.executor)
+        results = run['results']
+        timings = run['timings']
+
+        analysis = {
+            'skill_analysis': results['skill_analysis'],
+            'market_analysis': results['market_analysis'],
+            'career_recommendations': results['career_recommendations'],
+            'learning_plan': results['learning_plan'],
+            'resume_guidance': results['resume_guidance']
+        }
+
+        body = None
+        if self.render is not None:
+            started = time.perf_counter()
+            body = self.render(analysis)
+            render_ms = round((time.perf_counter() - started) * 1000, 2)
+            total_ms = timings.pop('total')
+            timings.update({'render': render_ms, 'total': round(total_ms + render_ms, 2)})
+        return {'analysis': analysis, 'body': body, 'timings': timings}
+
+    def analyze_batch(self, students: List[Dict[str, Any]], chunk_size: int = 64) -> Iterator[Dict[str, Any]]:
+        """Analyze a cohort, yielding ``{'index', 'analysis', 'body', 'cached'}`` as results complete.
+
+        Cached profiles are yielded first. Duplicate profiles are computed once,
+        and the rest run in chunks that share one catalog snapshot and score
+        skills and careers in vectorized form. A failing chunk yields
+        ``{'index', 'error'}`` items instead of aborting the whole cohort.
+        """
+        version = self.data_version()
+        pending = {}
+        for index, student_data in enumerate(students):
+            student_data = self.normalize_student_data(student_data)
+            key = ResponseCache.make_key(student_data)
+            cached = self.cache.get(key, version) if self.cache is not None else None
+            if cached is not None:
+                yield {'index': index, 'analysis': cached['analysis'], 'body': cached['body'], 'cached': True}
+            else:
+                pending.setdefault(key, (student_data, []))[1].append(index)
+
+        keys = list(pending)
+        shared = {}
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            try:
+                runs = self._run_batch([pending[key][0] for key in chunk], shared)
+            except Exception as e:
+                for key in chunk:
+                    for index in pending[key][1]:
+                        yield {'index': index, 'error': str(e)}
+                continue
+
+            for key, run in zip(chunk, runs):
+                if self.cache is not None:
+                    self.cache.set(key, run, version)
+                for index in pending[key][1]:
+                    yield {'index': index, 'analysis': run['analysis'], 'body': run['body'], 'cached': False}
+
+    def _run_batch(self, students: List[Dict[str, Any]],
+                   shared: Optional[Dict[str, Dict]] = None) -> List[Dict[str, Any]]:
+        """Run every stage for a chunk of profiles, vectorizing skill and career scoring.
+
+        ``shared`` carries stage results between the chunks of one batch, keyed
+        by the inputs each stage actually reads, so a combination of matched
+        skills and interests that repeats across a cohort is built only once.
+        """
+        shared = shared if shared is not None else {}
+        markets = shared.setdefault('market_analysis', {})
+        careers = shared.setdefault('career_recommendations', {})
+        plans = shared.setdefault('learning_plan', {})
+        guidance = shared.setdefault('resume_guidance', {})
+
+        skill_analyses = self.skill_mapper.analyze_skills_batch(students)
+        matched = [tuple(skill['name'] for skill in analysis['matched_skills']) for analysis in skill_analyses]
+
+        # Market analysis only depends on the matched skills
+        for names, skill_analysis in zip(matched, skill_analyses):
+            if names not in markets:
+                markets[names] = self.job_analyzer.analyze_market(skill_analysis)
+
+        # Recommendations depend on the matched skills and interests; score new ones together
+        career_keys = [(names, tuple(student.get('interests', []))) for names, student in zip(matched, students)]
+        new_rows = {}
+        for row, key in enumerate(career_keys):
+            if key not in careers:
+                new_rows.setdefault(key, row)
+        if new_rows:
+            rows = list(new_rows.values())
+            careers.update(zip(new_rows, self.career_recommender.get_recommendations_batch(
+                [skill_analyses[row] for row in rows],
+                [markets[matched[row]] for row in rows],
+                [students[row] for row in rows]
+            )))
+
+        runs = []
+        for student_data, skill_analysis, names, career_key in zip(students, skill_analyses, matched, career_keys):
+            career_recommendations = careers[career_key]
+
+            # Learning plans read the matched skills and recommendations; resume
+            # guidance also reads education, experience and whether skills were given
+            if career_key not in plans:
+                plans[career_key] = self.learning_planner.generate_plan(
+                    skill_analysis, career_recommendations, student_data
+                )
+            guidance_key = career_key + (student_data.get('education'), student_data.get('experience'),
+                                         bool(student_data.get('skills')))
+            if guidance_key not in guidance:
+                guidance[guidance_key] = self.resume_prep.prepare_guidance(
+                    student_data, career_recommendations, skill_analysis
+                )
+
+            analysis = {
+                'skill_analysis': skill_analysis,
+                'market_analysis': markets[names],
+                'career_recommendations': career_recommendations,
+                'learning_plan': plans[career_key],
+                'resume_guidance': guidance[guidance_key]
+            }
+            body = self.render(analysis) if self.render is not None else None
+            runs.append({'analysis': analysis, 'body': body, 'timings': {}})
+        return runs
+
+    @staticmethod
+    def format_server_timing(timings: Dict[str, float]) -> str:
+        """Render stage timings as a Server-Timing header value"""
+        return ', '.join(f'{name};dur={duration}' for name, duration in timings.items())
@@ -0,0 +1,110 @@
+import json
+import sqlite3
+from typing import Dict, List, Any, Callable, Optional
+
+# Per-question feedback kept alongside the score columns; the question text and
+# sample answer live in the question bank and are not copied into every row
+FEEDBACK_KEYS = ('strengths', 'areas_for_improvement', 'suggestions', 'detailed_feedback')
+
+# Session keys that are stored row-per-question instead of inside session_data
+NORMALIZED_SESSION_KEYS = ('questions', 'answers', 'feedback')
+
+
+def slim_interview_session(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Session metadata for ``interview_results.session_data``, without per-question payloads"""
+    slim = {key: value for key, value in session.items() if key not in NORMALIZED_SESSION_KEYS}
+    slim['question_ids'] = [question['id'] for question in session.get('questions', [])]
+    return slim
+
+
+def save_interview_answers(cursor: sqlite3.Cursor, result_id: int, session: Dict[str, Any]) -> int:
+    """Insert one ``interview_answers`` row per answered question; returns the row count"""
+    rows = []
+    for position, question in enumerate(session.get('questions', [])):
+        question_id = question['id']
+        answer = session.get('answers', {}).get(question_id)
+        if answer is None:
+            continue
+        feedback = session.get('feedback', {}).get(question_id, {})
+        rows.append((
+            result_id, question_id, position,
+            question.get('category'), question.get('difficulty'),
+            answer.get('answer'), answer.get('timestamp'),
+            feedback.get('overall_score'),
+            feedback.get('keyword_analysis', {}).get('keyword_coverage'),
+            json.dumps({key: feedback[key] for key in FEEDBACK_KEYS if feedback.get(key)},
+                       separators=(',', ':'))
+        ))
+    cursor.executemany('''
+        INSERT OR REPLACE INTO interview_answers
+        (result_id, question_id, position, category, difficulty, answer, answered_at,
+         overall_score, keyword_coverage, feedback)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    return len(rows)
+
+
+def save_assessment_responses(cursor: sqlite3.Cursor, result_id: int, responses: Dict[str, Any],
+                              question_phase: Dict[str, str],
+                              score: Callable[[str, Any], float]) -> int:
+    """Insert one ``assessment_responses`` row per answered question; returns the row count"""
+    rows = [
+        (result_id, question_id, question_phase.get(question_id),
+         json.dumps(answer, separators=(',', ':')), score(question_id, answer))
+        for question_id, answer in responses.items()
+    ]
+    cursor.executemany('''
+        INSERT OR REPLACE INTO assessment_responses (result_id, question_id, phase, answer, score)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+    return len(rows)
+
+
+def load_interview_answers(db, result_id: int) -> List[Dict[str, Any]]:
+    """Stored answers for one interview, in question order"""
+    return [
+        {
+            'question_id': row[0], 'position': row[1], 'category': row[2], 'difficulty': row[3],
+            'answer': row[4], 'answered_at': row[5], 'overall_score': row[6],
+            'keyword_coverage': row[7], **json.loads(row[8] or '{}')
+        }
+        for row in db.query('''
+            SELECT question_id, position, category, difficulty, answer, answered_at,
+                   overall_score, keyword_coverage, feedback
+            FROM interview_answers WHERE result_id = ? ORDER BY position
+        ''', (result_id,))
+    ]
+
+
+def backfill_interview_answers(conn: sqlite3.Connection, batch_size: int = 500,
+                               progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+    """Move per-question data out of legacy ``session_data`` blobs into ``interview_answers``.
+
+    Rows are processed in id order, ``batch_size`` per transaction, so the
+    tool can be interrupted and re-run; rows already slimmed (with a
+    ``question_ids`` list) are skipped.
+    """
+    migrated = answers = 0
+    last_id = 0
+    while True:
+        batch = conn.execute('''
+            SELECT id, session_data FROM interview_results
+            WHERE id > ? AND session_data IS NOT NULL ORDER BY id LIMIT ?
+        ''', (last_id, batch_size)).fetchall()
+        if not batch:
+            break
+        last_id = batch[-1][0]
+
+        cursor = conn.cursor()
+        for result_id, session_data in batch:
+            session = json.loads(session_data)
+            if 'question_ids' in session:
+                continue
+            answers += save_interview_answers(cursor, result_id, session)
+            cursor.execute('UPDATE interview_results SET session_data = ? WHERE id = ?',
+                           (json.dumps(slim_interview_session(session)), result_id))
+            migrated += 1
+        conn.commit()
+        if progress is not None:
+            progress(migrated)
+    return {'results_migrated': migrated, 'answers_written': answers}
@@ -1,28 +1,101 @@
-import sqlite3
 import json
+import threading
+from types import MappingProxyType
 from typing import Dict, List, Any
-import random
+import numpy as np
+from scipy import sparse
+from modules.market_scores import MarketScoreTable
+from modules.database import Database, get_database
+
+class CareerCatalog:
+    """Immutable snapshot of the career catalog and its scoring matrix.
+
+    Holds the career records, their order, the careers x skills matrix and the
+    skill/industry inverted indexes built from that same ordering, so one
+    snapshot is always internally consistent.
+    """
+
+    def __init__(self, careers: Dict[str, Dict[str, Any]], version: int):
+        self.version = version
+        self.career_database = MappingProxyType(dict(careers))
+        self.career_titles = tuple(careers.keys())
+        self.skill_index = {}
+        rows, cols = [], []
+        
+        for row, title in enumerate(self.career_titles):
+            for skill in set(careers[title]['required_skills']):
+                col = self.skill_index.setdefault(skill, len(self.skill_index))
+                rows.append(row)
+                cols.append(col)
+        
+        self.skill_matrix = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(self.career_titles), len(self.skill_index))
+        )
+        self.required_counts = np.array(
+            [len(careers[title]['required_skills']) for title in self.career_titles],
+            dtype=float
+        )
+        
+        # Interest alignment only depends on the industry, so score industries once
+        self.industries = sorted({careers[title]['industry'] for title in self.career_titles})
+        industry_position = {industry: i for i, industry in enumerate(self.industries)}
+        self.career_industry_index = np.array(
+            [industry_position[careers[title]['industry']] for title in self.career_titles],
+            dtype=int
+        )
+        
+        # Skills x careers, so a batch of students is one sparse product
+        self.skill_matrix_t = self.skill_matrix.T.tocsr()
+        
+        # Inverted indexes: skill -> careers and industry -> careers
+        skill_columns = self.skill_matrix.tocsc()
+        self.skill_to_careers = {
+            skill: skill_columns.indices[skill_columns.indptr[col]:skill_columns.indptr[col + 1]]
+            for skill, col in self.skill_index.items()
+        }
+        self.industry_to_careers = {
+            industry: np.flatnonzero(self.career_industry_index == i)
+            for i, industry in enumerate(self.industries)
+        }
+
+    def __len__(self) -> int:
+        return len(self.career_titles)
 
 class CareerRecommender:
-    def __init__(self):
-        self.db_path = 'career_advisor.db'
-        self.career_database = {}
-        self._load_career_data()
+    def __init__(self, market_scores: MarketScoreTable = None, database: Database = None):
+        self.db = database or get_database()
+        self.catalog = None
+        self.market_state = None
+        self._catalog_lock = threading.Lock()
+        self.industry_keywords = self._load_industry_keywords()
+        self.market_scores = market_scores or MarketScoreTable()
+        self.market_scores.subscribe(self._refresh_market_scores)
+        self.reload_careers()
     
-    def _load_career_data(self):
+    @property
+    def catalog_version(self) -> int:
+        """Version of the career catalog requests are currently scored against"""
+        return self.market_state['catalog'].version
+    
+    @property
+    def career_database(self) -> Dict[str, Dict[str, Any]]:
+        return self.market_state['catalog'].career_database
+    
+    @property
+    def career_titles(self) -> tuple:
+        return self.market_state['catalog'].career_titles
+    
+    def _load_career_data(self) -> Dict[str, Dict[str, Any]]:
         """Load career data from database and add comprehensive career information"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        careers = self.db.query('''
             SELECT title, industry, required_skills, salary_range, growth_rate, description 
             FROM careers
         ''')
         
-        careers = cursor.fetchall()
-        
+        career_database = {}
         for career in careers:
-            self.career_database[career[0]] = {
+            career_database[career[0]] = {
                 'title': career[0],
                 'industry': career[1],
                 'required_skills': career[2].split(',') if career[2] else [],
@@ -32,11 +105,24 @@ class CareerRecommender:
             }
         
         # Add comprehensive career data
-        self._add_comprehensive_career_data()
-        
-        conn.close()
+        self._add_comprehensive_career_data(career_database)
+        return career_database
+    
+    def reload_careers(self) -> int:
+        """Reload the careers table and publish a rebuilt catalog and scoring matrix"""
+        with self._catalog_lock:
+            version = self.catalog.version + 1 if self.catalog else 1
+            return self._publish_catalog(self._load_career_data(), version)
     
-    def _add_comprehensive_career_data(self):
+    def _publish_catalog(self, careers: Dict[str, Dict[str, Any]], version: int) -> int:
+        """Build a catalog snapshot and make it visible together with its market scores"""
+        self.catalog = CareerCatalog(careers, version)
+        # Recomputing career scores notifies _refresh_market_scores, which swaps
+        # in the new catalog and its score arrays as one market_state
+        self.market_scores.load_careers(self.catalog.career_database)
+        return version
+    
+    def _add_comprehensive_career_data(self, career_database: Dict[str, Dict[str, Any]]):
         """Add comprehensive career information for better recommendations"""
         comprehensive_careers = {
             'Data Scientist': {
@@ -219,10 +305,205 @@ class CareerRecommender:
         
         # Update career database with comprehensive data
         for title, data in comprehensive_careers.items():
-            if title in self.career_database:
-                self.career_database[title].update(data)
+            if title in career_database:
+                career_database[title].update(data)
             else:
-                self.career_database[title] = data
+                career_database[title] = data
+    
+    def _load_industry_keywords(self) -> Dict[str, List[str]]:
+        """Load the industry-interest keyword mapping used for interest alignment"""
+        return {
+            'Technology': ['technology', 'programming', 'software', 'ai', 'data', 'tech'],
+            'Healthcare': ['healthcare', 'health', 'medical', 'science', 'research'],
+            'Finance': ['finance', 'banking', 'business', 'economics', 'money'],
+            'Education': ['education', 'teaching', 'learning', 'academic', 'research']
+        }
+    
+    def _refresh_market_scores(self, version: int = None):
+        """Rebuild market score arrays and baseline tables after a market data reload"""
+        catalog = self.catalog
+        if catalog is None:
+            return
+        
+        market_scores = np.array(
+            [self.market_scores.career_score(title) for title in catalog.career_titles],
+            dtype=float
+        )
+        
+        # Careers sharing no skill or interest keyword with a student get a fixed
+        # baseline score (no skill match, neutral or zero interest). Pre-rank them
+        # and keep their totals so a request never has to touch them one by one.
+        state = {
+            'version': self.market_scores.version,
+            'catalog': catalog,
+            'scores': market_scores,
+            'baseline_scores': {},
+            'baseline_order': {},
+            'baseline_stats': {}
+        }
+        for interest_base in (0.0, 50.0):
+            scores = np.round(interest_base * 0.3 + market_scores * 0.2, 2)
+            state['baseline_scores'][interest_base] = scores
+            state['baseline_order'][interest_base] = np.lexsort((np.arange(len(scores)), -scores))
+            state['baseline_stats'][interest_base] = {
+                'total': float(scores.sum()),
+                'above_70': int(np.count_nonzero(scores > 70))
+            }
+        
+        # Swap the whole state at once so requests see one consistent catalog and version
+        self.market_state = state
+    
+    def _skill_matrix_for(self, catalog: CareerCatalog, student_skills: List[List[str]]) -> sparse.csr_matrix:
+        """Build a binary students x skills matrix over the career skill vocabulary"""
+        rows, cols = [], []
+        for row, skills in enumerate(student_skills):
+            for col in {catalog.skill_index[skill] for skill in skills if skill in catalog.skill_index}:
+                rows.append(row)
+                cols.append(col)
+        
+        return sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(student_skills), len(catalog.skill_index))
+        )
+    
+    def _industry_interest_scores(self, catalog: CareerCatalog, interests: List[str]) -> np.ndarray:
+        """Interest alignment for every industry, in ``industries`` order"""
+        interest_base = 50.0 if not interests else 0.0
+        scores = np.full(len(catalog.industries), interest_base)
+        
+        # Only keyword-mapped industries can differ from the baseline
+        for i, industry in enumerate(catalog.industries):
+            if industry in self.industry_keywords:
+                scores[i] = self._calculate_interest_alignment(industry, interests)
+        
+        return scores
+    
+    def score_students(self, student_skills: List[List[str]],
+                       student_interests: List[List[str]]) -> Dict[str, np.ndarray]:
+        """Score a batch of students against every career at once.
+        
+        Returns arrays of shape (students, careers) in ``career_titles`` order.
+        """
+        return self._score_students(self.market_state, student_skills, student_interests)
+    
+    def _score_students(self, market_state: Dict[str, Any], student_skills: List[List[str]],
+                        student_interests: List[List[str]]) -> Dict[str, np.ndarray]:
+        catalog = market_state['catalog']
+        student_matrix = self._skill_matrix_for(catalog, student_skills)
+        skill_matches = np.asarray((student_matrix @ catalog.skill_matrix.T).todense())
+        skill_scores = np.divide(
+            skill_matches * 100, catalog.required_counts,
+            out=np.zeros_like(skill_matches), where=catalog.required_counts > 0
+        )
+        
+        industry_scores = np.array(
+            [self._industry_interest_scores(catalog, interests) for interests in student_interests],
+            dtype=float
+        ).reshape(len(student_interests), len(catalog.industries))
+        interest_scores = industry_scores[:, catalog.career_industry_index]
+        
+        market_scores = np.tile(market_state['scores'], (len(student_skills), 1))
+        
+        # Weighted total score
+        total_scores = skill_scores * 0.5 + interest_scores * 0.3 + market_scores * 0.2
+        
+        return {
+            'score': total_scores,
+            'skill_score': skill_scores,
+            'interest_score': interest_scores,
+            'market_score': market_scores,
+            'skill_matches': skill_matches.astype(int)
+        }
+    
+    def _score_profile(self, skills: List[str], interests: List[str]) -> Dict[str, Any]:
+        """Score only the careers that share a skill or interest keyword with the student"""
+        interest_base = 50.0 if not interests else 0.0
+        market_state = self.market_state
+        catalog = market_state['catalog']
+        industry_scores = self._industry_interest_scores(catalog, interests)
+        student_skills = {skill for skill in skills if skill in catalog.skill_index}
+        
+        candidate_groups = [catalog.skill_to_careers[skill] for skill in student_skills]
+        candidate_groups += [
+            catalog.industry_to_careers[industry]
+            for i, industry in enumerate(catalog.industries)
+            if industry_scores[i] != interest_base
+        ]
+        careers = np.unique(np.concatenate(candidate_groups)) if candidate_groups else np.array([], dtype=int)
+        
+        skill_columns = [catalog.skill_index[skill] for skill in student_skills]
+        skill_matches = np.asarray(
+            catalog.skill_matrix[careers][:, skill_columns].sum(axis=1)
+        ).ravel() if skill_columns else np.zeros(len(careers))
+        required_counts = catalog.required_counts[careers]
+        skill_scores = np.divide(
+            skill_matches * 100, required_counts,
+            out=np.zeros(len(careers)), where=required_counts > 0
+        )
+        interest_scores = industry_scores[catalog.career_industry_index[careers]]
+        market_scores = market_state['scores'][careers]
+        
+        return {
+            'careers': careers,
+            'interest_base': interest_base,
+            'market_state': market_state,
+            'score': skill_scores * 0.5 + interest_scores * 0.3 + market_scores * 0.2,
+            'skill_score': skill_scores,
+            'interest_score': interest_scores,
+            'market_score': market_scores,
+            'skill_matches': skill_matches.astype(int)
+        }
+    
+    def _score_profiles(self, student_skills: List[List[str]],
+                        student_interests: List[List[str]]) -> List[Dict[str, Any]]:
+        """Batch version of ``_score_profile``: one sparse product finds every student's skill matches"""
+        market_state = self.market_state
+        catalog = market_state['catalog']
+        matches = (self._skill_matrix_for(catalog, student_skills) @ catalog.skill_matrix_t).tocsr()
+        matches.sum_duplicates()
+        matches.sort_indices()
+        industry_scores_by_interests = {}
+        profiles = []
+        
+        for row, interests in enumerate(student_interests):
+            interest_base = 50.0 if not interests else 0.0
+            interest_key = tuple(interests)
+            if interest_key not in industry_scores_by_interests:
+                industry_scores_by_interests[interest_key] = self._industry_interest_scores(catalog, interests)
+            industry_scores = industry_scores_by_interests[interest_key]
+            
+            matched_careers = matches.indices[matches.indptr[row]:matches.indptr[row + 1]]
+            candidate_groups = [matched_careers] + [
+                catalog.industry_to_careers[industry]
+                for i, industry in enumerate(catalog.industries)
+                if industry_scores[i] != interest_base
+            ]
+            careers = np.unique(np.concatenate(candidate_groups)).astype(int)
+            
+            skill_matches = np.zeros(len(careers))
+            skill_matches[np.searchsorted(careers, matched_careers)] = matches.data[
+                matches.indptr[row]:matches.indptr[row + 1]
+            ]
+            required_counts = catalog.required_counts[careers]
+            skill_scores = np.divide(
+                skill_matches * 100, required_counts,
+                out=np.zeros(len(careers)), where=required_counts > 0
+            )
+            interest_scores = industry_scores[catalog.career_industry_index[careers]]
+            market_scores = market_state['scores'][careers]
+            
+            profiles.append({
+                'careers': careers,
+                'interest_base': interest_base,
+                'market_state': market_state,
+                'score': skill_scores * 0.5 + interest_scores * 0.3 + market_scores * 0.2,
+                'skill_score': skill_scores,
+                'interest_score': interest_scores,
+                'market_score': market_scores,
+                'skill_matches': skill_matches.astype(int)
+            })
+        
+        return profiles
     
     def get_recommendations(self, skill_analysis: Dict, market_analysis: Dict, 
                           student_data: Dict) -> Dict[str, Any]:
@@ -233,81 +514,169 @@ class CareerRecommender:
         skill_names = [skill['name'] for skill in matched_skills]
         interests = student_data.get('interests', [])
         
-        # Calculate career compatibility scores
-        career_scores = self._calculate_career_scores(skill_names, interests)
+        # Calculate career compatibility scores for careers sharing a skill or interest
+        profile = self._score_profile(skill_names, interests)
+        return self._build_recommendations(profile, skill_names, skill_analysis, market_analysis)
+    
+    def get_recommendations_batch(self, skill_analyses: List[Dict], market_analyses: List[Dict],
+                                  students: List[Dict]) -> List[Dict[str, Any]]:
+        """Generate recommendations for many students, scoring them all in one vectorized pass.
+        
+        Students with the same matched skills, interests and market analysis get
+        the same recommendations, so each distinct combination is built once.
+        """
+        groups = {}
+        for row, (skill_analysis, market_analysis, student_data) in enumerate(
+                zip(skill_analyses, market_analyses, students)):
+            skill_names = [skill['name'] for skill in skill_analysis.get('matched_skills', [])]
+            interests = student_data.get('interests', [])
+            key = (tuple(skill_names), tuple(interests), id(market_analysis))
+            groups.setdefault(key, (skill_names, interests, skill_analysis, market_analysis, []))[4].append(row)
+        
+        unique = list(groups.values())
+        profiles = self._score_profiles([group[0] for group in unique], [group[1] for group in unique])
+        
+        recommendations = [None] * len(students)
+        for profile, (skill_names, _, skill_analysis, market_analysis, rows) in zip(profiles, unique):
+            result = self._build_recommendations(profile, skill_names, skill_analysis, market_analysis)
+            for row in rows:
+                recommendations[row] = result
+        return recommendations
+    
+    def _build_recommendations(self, profile: Dict[str, Any], skill_names: List[str],
+                               skill_analysis: Dict, market_analysis: Dict) -> Dict[str, Any]:
+        """Assemble the recommendations response from a scored profile"""
+        catalog = profile['market_state']['catalog']
         
-        # Get top recommendations
-        top_careers = sorted(career_scores.items(), key=lambda x: x[1]['score'], reverse=True)[:5]
+        # Get top recommendations and the summary statistics in one pass
+        top_careers, score_stats = self._select_top_careers(profile, 5, set(skill_names))
         
         # Generate career paths
-        career_paths = self._generate_career_paths(top_careers, skill_analysis, market_analysis)
+        career_paths = self._generate_career_paths(catalog, top_careers, skill_analysis, market_analysis)
         
         # Analyze career progression
-        progression_analysis = self._analyze_career_progression(top_careers, skill_analysis)
+        progression_analysis = self._analyze_career_progression(catalog, top_careers, skill_analysis)
         
         # Generate role recommendations
-        role_recommendations = self._generate_role_recommendations(top_careers, skill_analysis)
+        role_recommendations = self._generate_role_recommendations(catalog, top_careers, skill_analysis)
         
         return {
-            'top_careers': [self._format_career_recommendation(career, score) 
+            'top_careers': [self._format_career_recommendation(catalog, career, score) 
                            for career, score in top_careers],
             'career_paths': career_paths,
             'progression_analysis': progression_analysis,
             'role_recommendations': role_recommendations,
-            'compatibility_summary': self._generate_compatibility_summary(career_scores),
+            'compatibility_summary': self._generate_compatibility_summary(score_stats),
             'next_steps': self._generate_next_steps(top_careers, skill_analysis),
-            'detailed_career_analysis': self._generate_detailed_career_analysis(top_careers, skill_analysis),
-            'career_comparison': self._generate_career_comparison(top_careers[:3]),
-            'industry_insights': self._generate_industry_insights(top_careers, market_analysis),
+            'detailed_career_analysis': self._generate_detailed_career_analysis(catalog, top_careers, skill_analysis),
+            'career_comparison': self._generate_career_comparison(catalog, top_careers[:3]),
+            'industry_insights': self._generate_industry_insights(catalog, top_careers, market_analysis),
             'skill_roadmap': self._generate_skill_roadmap(top_careers, skill_analysis)
         }
     
+    def _select_top_careers(self, profile: Dict[str, Any], k: int, student_skills: set):
+        """Select the k best careers without sorting the whole score table.
+        
+        Scored candidates compete with the best baseline careers, read off the
+        pre-ranked baseline order. Ties keep catalog order, matching a stable
+        descending sort. Also returns max/sum/count statistics over all careers.
+        """
+        catalog = profile['market_state']['catalog']
+        if not catalog.career_titles:
+            return [], None
+        
+        careers = profile['careers']
+        candidate_scores = np.round(profile['score'], 2)
+        interest_base = profile['interest_base']
+        market_state = profile['market_state']
+        baseline_scores = market_state['baseline_scores'][interest_base]
+        baseline_stats = market_state['baseline_stats'][interest_base]
+        
+        candidate_set = set(careers.tolist())
+        rest = []
+        for career in market_state['baseline_order'][interest_base]:
+            if len(rest) >= k:
+                break
+            if career not in candidate_set:
+                rest.append(career)
+        rest = np.array(rest, dtype=int)
+        
+        pool = np.concatenate([careers, rest])
+        scores = np.concatenate([candidate_scores, baseline_scores[rest]])
+        k = min(k, len(pool))
+        if k:
+            kth_score = np.partition(scores, len(scores) - k)[len(scores) - k]
+            above = np.flatnonzero(scores > kth_score)
+            ties = np.flatnonzero(scores == kth_score)
+            ties = ties[np.argsort(pool[ties], kind='stable')][:k - len(above)]
+            selected = np.concatenate([above, ties])
+            selected = selected[np.lexsort((pool[selected], -scores[selected]))]
+        else:
+            selected = np.array([], dtype=int)
+        
+        candidate_baselines = baseline_scores[careers]
+        stats = {
+            'count': len(catalog.career_titles),
+            'total': float(candidate_scores.sum() + baseline_stats['total']
+                           - candidate_baselines.sum()),
+            'max': float(scores.max()),
+            'above_70': int(np.count_nonzero(candidate_scores > 70)
+                            + baseline_stats['above_70']
+                            - np.count_nonzero(candidate_baselines > 70))
+        }
+        
+        top_careers = []
+        for position in selected.tolist():
+            career = int(pool[position])
+            if position < len(careers):
+                values = {name: profile[name][position] for name in
+                          ('score', 'skill_score', 'interest_score', 'market_score', 'skill_matches')}
+            else:
+                values = {
+                    'score': baseline_scores[career],
+                    'skill_score': 0.0,
+                    'interest_score': interest_base,
+                    'market_score': market_state['scores'][career],
+                    'skill_matches': 0
+                }
+            top_careers.append((catalog.career_titles[career], self._score_entry(catalog, career, values, student_skills)))
+        
+        return top_careers, stats
+    
     def _calculate_career_scores(self, skills: List[str], interests: List[str]) -> Dict[str, Dict]:
         """Calculate compatibility scores for each career"""
+        market_state = self.market_state
+        catalog = market_state['catalog']
+        scores = self._score_students(market_state, [skills], [interests])
+        student_skills = set(skills)
         career_scores = {}
         
-        for title, career_data in self.career_database.items():
-            required_skills = career_data['required_skills']
-            
-            # Calculate skill match score
-            skill_matches = len([skill for skill in skills if skill in required_skills])
-            skill_score = (skill_matches / len(required_skills)) * 100 if required_skills else 0
-            
-            # Calculate interest alignment
-            interest_score = self._calculate_interest_alignment(career_data['industry'], interests)
-            
-            # Calculate market opportunity score
-            market_score = self._calculate_market_score(career_data)
-            
-            # Weighted total score
-            total_score = (skill_score * 0.5 + interest_score * 0.3 + market_score * 0.2)
-            
-            career_scores[title] = {
-                'score': round(total_score, 2),
-                'skill_score': round(skill_score, 2),
-                'interest_score': round(interest_score, 2),
-                'market_score': round(market_score, 2),
-                'skill_matches': skill_matches,
-                'total_required': len(required_skills),
-                'missing_skills': [skill for skill in required_skills if skill not in skills]
-            }
+        for i, title in enumerate(catalog.career_titles):
+            values = {name: array[0, i] for name, array in scores.items()}
+            career_scores[title] = self._score_entry(catalog, i, values, student_skills)
         
         return career_scores
     
+    def _score_entry(self, catalog: CareerCatalog, career: int, values: Dict[str, Any], student_skills: set) -> Dict[str, Any]:
+        """Build the per-career score record for one student"""
+        required_skills = catalog.career_database[catalog.career_titles[career]]['required_skills']
+        
+        return {
+            'score': round(float(values['score']), 2),
+            'skill_score': round(float(values['skill_score']), 2),
+            'interest_score': round(float(values['interest_score']), 2),
+            'market_score': round(float(values['market_score']), 2),
+            'skill_matches': int(values['skill_matches']),
+            'total_required': len(required_skills),
+            'missing_skills': [skill for skill in required_skills if skill not in student_skills]
+        }
+    
     def _calculate_interest_alignment(self, industry: str, interests: List[str]) -> float:
         """Calculate how well career aligns with user interests"""
         if not interests:
             return 50.0  # Neutral score if no interests specified
         
-        # Industry-interest mapping
-        industry_keywords = {
-            'Technology': ['technology', 'programming', 'software', 'ai', 'data', 'tech'],
-            'Healthcare': ['healthcare', 'health', 'medical', 'science', 'research'],
-            'Finance': ['finance', 'banking', 'business', 'economics', 'money'],
-            'Education': ['education', 'teaching', 'learning', 'academic', 'research']
-        }
-        
-        industry_keywords_list = industry_keywords.get(industry, [])
+        industry_keywords_list = self.industry_keywords.get(industry, [])
         
         # Check for keyword matches
         matches = 0
@@ -319,22 +688,9 @@ class CareerRecommender:
         
         return (matches / len(interests)) * 100 if interests else 50.0
     
-    def _calculate_market_score(self, career_data: Dict) -> float:
-        """Calculate market opportunity score for career"""
-        growth_rate = career_data.get('growth_rate', 0)
-        
-        # Convert growth rate to score (0-100)
-        # Assuming 0-20% growth rate maps to 0-100 score
-        market_score = min(growth_rate * 5, 100)
-        
-        # Add some randomness to simulate market factors
-        market_score += random.uniform(-5, 5)
-        
-        return max(0, min(100, market_score))
-    
-    def _format_career_recommendation(self, career_title: str, score_data: Dict) -> Dict[str, Any]:
+    def _format_career_recommendation(self, catalog: CareerCatalog, career_title: str, score_data: Dict) -> Dict[str, Any]:
         """Format career recommendation with all relevant data"""
-        career_data = self.career_database[career_title]
+        career_data = catalog.career_database[career_title]
         
         return {
             'title': career_title,
@@ -371,13 +727,13 @@ class CareerRecommender:
         
         return "; ".join(reasons)
     
-    def _generate_career_paths(self, top_careers: List, skill_analysis: Dict, 
+    def _generate_career_paths(self, catalog: CareerCatalog, top_careers: List, skill_analysis: Dict, 
                              market_analysis: Dict) -> List[Dict[str, Any]]:
         """Generate career progression paths"""
         paths = []
         
         for career_title, score_data in top_careers[:3]:  # Top 3 careers
-            career_data = self.career_database[career_title]
+            career_data = catalog.career_database[career_title]
             
             # Generate entry-level to senior progression
             path = {
@@ -425,13 +781,13 @@ class CareerRecommender:
         
         return f'₹{estimated:,}'
     
-    def _analyze_career_progression(self, top_careers: List, skill_analysis: Dict) -> Dict[str, Any]:
+    def _analyze_career_progression(self, catalog: CareerCatalog, top_careers: List, skill_analysis: Dict) -> Dict[str, Any]:
         """Analyze career progression opportunities"""
         if not top_careers:
             return {'message': 'No career recommendations available'}
         
         best_career = top_careers[0]
-        career_data = self.career_database[best_career[0]]
+        career_data = catalog.career_database[best_career[0]]
         
         return {
             'primary_career': best_career[0],
@@ -445,12 +801,12 @@ class CareerRecommender:
             'growth_trajectory': f"{career_data['growth_rate']}% annual growth"
         }
     
-    def _generate_role_recommendations(self, top_careers: List, skill_analysis: Dict) -> List[Dict[str, str]]:
+    def _generate_role_recommendations(self, catalog: CareerCatalog, top_careers: List, skill_analysis: Dict) -> List[Dict[str, str]]:
         """Generate specific role recommendations"""
         roles = []
         
         for career_title, score_data in top_careers[:3]:
-            career_data = self.career_database[career_title]
+            career_data = catalog.career_database[career_title]
             
             # Generate related roles
             related_roles = self._get_related_roles(career_title, career_data['industry'])
@@ -486,19 +842,17 @@ class CareerRecommender:
             {'title': f'Related {career_title}', 'compatibility': 'Medium', 'description': 'Related role in same field', 'requirements': 'Similar skills'}
         ])
     
-    def _generate_compatibility_summary(self, career_scores: Dict) -> Dict[str, Any]:
+    def _generate_compatibility_summary(self, score_stats: Dict) -> Dict[str, Any]:
         """Generate summary of career compatibility"""
-        if not career_scores:
+        if not score_stats:
             return {'message': 'No career data available'}
         
-        scores = [data['score'] for data in career_scores.values()]
-        
         return {
-            'average_compatibility': round(sum(scores) / len(scores), 2),
-            'highest_score': max(scores),
-            'careers_above_70': len([s for s in scores if s > 70]),
-            'total_careers_analyzed': len(scores),
-            'recommendation': 'Focus on top 3 careers for best opportunities' if max(scores) > 60 else 'Consider skill development before career transition'
+            'average_compatibility': round(score_stats['total'] / score_stats['count'], 2),
+            'highest_score': score_stats['max'],
+            'careers_above_70': score_stats['above_70'],
+            'total_careers_analyzed': score_stats['count'],
+            'recommendation': 'Focus on top 3 careers for best opportunities' if score_stats['max'] > 60 else 'Consider skill development before career transition'
         }
     
     def _generate_next_steps(self, top_careers: List, skill_analysis: Dict) -> List[str]:
@@ -520,7 +874,7 @@ class CareerRecommender:
         
         return steps
     
-    def _generate_detailed_career_analysis(self, top_careers: List, skill_analysis: Dict) -> Dict[str, Any]:
+    def _generate_detailed_career_analysis(self, catalog: CareerCatalog, top_careers: List, skill_analysis: Dict) -> Dict[str, Any]:
         """Generate detailed analysis for top career recommendations"""
         if not top_careers:
             return {'message': 'No career recommendations available'}
@@ -528,7 +882,7 @@ class CareerRecommender:
         detailed_analysis = {}
         
         for career_title, score_data in top_careers[:3]:  # Top 3 careers
-            career_data = self.career_database[career_title]
+            career_data = catalog.career_database[career_title]
             
             detailed_analysis[career_title] = {
                 'overview': {
@@ -559,12 +913,12 @@ class CareerRecommender:
                 'certifications': career_data.get('certifications', []),
                 'alternative_roles': career_data.get('alternative_roles', []),
                 'market_demand': self._assess_market_demand(career_title, career_data),
-                'learning_path': self._generate_learning_path(career_title, score_data['missing_skills'])
+                'learning_path': self._generate_learning_path(catalog, career_title, score_data['missing_skills'])
             }
         
         return detailed_analysis
     
-    def _generate_career_comparison(self, top_careers: List) -> Dict[str, Any]:
+    def _generate_career_comparison(self, catalog: CareerCatalog, top_careers: List) -> Dict[str, Any]:
         """Generate side-by-side comparison of top careers"""
         if len(top_careers) < 2:
             return {'message': 'Need at least 2 careers for comparison'}
@@ -581,7 +935,7 @@ class CareerRecommender:
         }
         
         for career_title, score_data in top_careers:
-            career_data = self.career_database[career_title]
+            career_data = catalog.career_database[career_title]
             
             comparison['careers'].append({
                 'title': career_title,
@@ -602,12 +956,12 @@ class CareerRecommender:
         
         return comparison
     
-    def _generate_industry_insights(self, top_careers: List, market_analysis: Dict) -> Dict[str, Any]:
+    def _generate_industry_insights(self, catalog: CareerCatalog, top_careers: List, market_analysis: Dict) -> Dict[str, Any]:
         """Generate industry-specific insights for recommended careers"""
         industries = {}
         
         for career_title, score_data in top_careers:
-            career_data = self.career_database[career_title]
+            career_data = catalog.career_database[career_title]
             industry = career_data['industry']
             
             if industry not in industries:
@@ -743,9 +1097,9 @@ class CareerRecommender:
             'job_availability': 'High' if growth_rate >= 10 else 'Medium'
         }
     
-    def _generate_learning_path(self, career_title: str, missing_skills: List[str]) -> Dict[str, Any]:
+    def _generate_learning_path(self, catalog: CareerCatalog, career_title: str, missing_skills: List[str]) -> Dict[str, Any]:
         """Generate learning path for a specific career"""
-        career_data = self.career_database[career_title]
+        career_data = catalog.career_database[career_title]
         
         return {
             'foundation_skills': missing_skills[:3],  # Top 3 missing skills
@@ -0,0 +1,261 @@
+import base64
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple, Union
+from modules.migrations import apply_migrations
+
+DEFAULT_DB_PATH = 'career_advisor.db'
+
+
+def get_db_path() -> str:
+    """Database file used by every module; override with CAREER_ADVISOR_DB"""
+    return os.getenv('CAREER_ADVISOR_DB', DEFAULT_DB_PATH)
+
+
+class _Lease:
+    """A thread's claim on one pooled connection; returned when released or garbage collected"""
+
+    def __init__(self, conn: sqlite3.Connection, pid: int):
+        self.conn = conn
+        self.pid = pid
+        self.finalizer = None
+
+
+class ConnectionPool:
+    """Idle-connection cache for SQLite connections leased to threads.
+
+    A thread keeps the connection it checked out until it calls ``release``
+    or exits; either way the connection goes back to the idle list, which
+    holds at most ``size`` connections (extras are closed). Leases are not
+    capped: ``acquire`` opens a new connection whenever none is idle, so
+    every thread gets one without waiting. Connections are keyed by process
+    id, so a forked worker never reuses its parent's handles.
+    """
+
+    def __init__(self, opener: Callable[[], sqlite3.Connection], size: int = 8):
+        self.opener = opener
+        self.size = size
+        self._idle = []
+        self._leased = set()
+        self._pid = os.getpid()
+        self._local = threading.local()
+        # Re-entrant: a lease can be collected, and checked in, while the lock is held
+        self._lock = threading.RLock()
+
+    def acquire(self) -> sqlite3.Connection:
+        """This thread's connection, checked out on first use"""
+        lease = getattr(self._local, 'lease', None)
+        if lease is not None and lease.pid == os.getpid():
+            return lease.conn
+        conn = self._checkout()
+        lease = _Lease(conn, os.getpid())
+        lease.finalizer = weakref.finalize(lease, self._checkin, conn, lease.pid)
+        self._local.lease = lease
+        return conn
+
+    def release(self):
+        """Return this thread's connection to the pool, if it holds one"""
+        lease = getattr(self._local, 'lease', None)
+        if lease is not None:
+            self._local.lease = None
+            lease.finalizer()
+
+    def _checkout(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Handles inherited across fork belong to the parent; drop them unused
+                self._pid, self._idle, self._leased = os.getpid(), [], set()
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self.opener()
+        with self._lock:
+            self._leased.add(conn)
+        return conn
+
+    def _checkin(self, conn: sqlite3.Connection, pid: int):
+        if pid != os.getpid():
+            return
+        with self._lock:
+            self._leased.discard(conn)
+            keep = len(self._idle) < self.size
+            if keep:
+                try:
+                    if conn.in_transaction:
+                        conn.rollback()
+                except sqlite3.Error:
+                    keep = False
+                else:
+                    self._idle.append(conn)
+        if not keep:
+            _close_quietly(conn)
+
+    def stats(self) -> Dict[str, int]:
+        """Connections currently leased to threads and idle in the pool"""
+        with self._lock:
+            return {'leased': len(self._leased), 'idle': len(self._idle), 'size': self.size}
+
+    def close(self):
+        """Close every connection, idle or leased"""
+        with self._lock:
+            connections = self._idle + list(self._leased)
+            self._idle, self._leased = [], set()
+        for conn in connections:
+            _close_quietly(conn)
+        self._local = threading.local()
+
+
+def _close_quietly(conn: sqlite3.Connection):
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+class Database:
+    """Shared SQLite access layer backed by a bounded connection pool.
+
+    Connections are opened lazily, tuned once (WAL journal, synchronous=NORMAL,
+    memory-mapped reads, a prepared statement cache) and then reused instead
+    of being opened and closed on every query. A thread holds one connection
+    until it calls ``release`` (the app does so when each request ends) or
+    exits, after which the connection is handed to the next thread.
+    """
+
+    def __init__(self, path: str = None, mmap_size: int = None, cached_statements: int = None,
+                 busy_timeout: float = 10.0, pool_size: int = None):
+        self.path = path or get_db_path()
+        self.mmap_size = mmap_size if mmap_size is not None else int(os.getenv('CAREER_ADVISOR_DB_MMAP_BYTES', str(64 * 1024 * 1024)))
+        self.cached_statements = cached_statements if cached_statements is not None else int(os.getenv('CAREER_ADVISOR_DB_CACHED_STATEMENTS', '256'))
+        self.busy_timeout = busy_timeout
+        self.pool = ConnectionPool(self._open, pool_size or int(os.getenv('CAREER_ADVISOR_DB_POOL_SIZE', '8')))
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened and configured on first use"""
+        return self.pool.acquire()
+
+    def release(self):
+        """Hand this thread's connection back to the pool"""
+        self.pool.release()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                               cached_statements=self.cached_statements, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor; commit on success, roll back on error"""
+        conn = self.connection()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            cursor.close()
+
+    def migrate(self) -> int:
+        """Bring the schema up to date and return its version"""
+        return apply_migrations(self.connection())
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> List[tuple]:
+        """Run a read-only statement and return all rows"""
+        cursor = self.connection().execute(sql, tuple(params))
+        try:
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def close(self):
+        """Close every connection opened through this handle"""
+        self.pool.close()
+
+
+def encode_cursor(created_at: str, row_id: int) -> str:
+    """Opaque pagination cursor pointing just past a history row"""
+    return base64.urlsafe_b64encode(f'{created_at}|{row_id}'.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of ``encode_cursor``; raises ValueError for malformed cursors"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rsplit('|', 1)
+        return created_at, int(row_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+
+def select_fields(fields: Union[str, Iterable[str], None],
+                  available: Dict[str, Optional[Callable[[Any], Any]]]) -> List[str]:
+    """Validate a ``fields=`` projection (comma-separated or a list) against ``available``"""
+    if not fields:
+        return list(available)
+    names = [name.strip() for name in fields.split(',')] if isinstance(fields, str) else list(fields)
+    names = [name for name in names if name]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}; available: {', '.join(available)}")
+    return names or list(available)
+
+
+def fetch_history_page(db: 'Database', table: str, fields: List[str],
+                       available: Dict[str, Optional[Callable[[Any], Any]]], user_id: str,
+                       limit: Optional[int] = None, before: Optional[str] = None) -> Dict[str, Any]:
+    """Newest-first page of a user's history rows using keyset pagination.
+
+    Rows are read through the ``(user_id, created_at DESC, id DESC)`` index
+    starting just after ``before``, so every page costs the same no matter
+    how deep it is. Only the requested columns are selected, and a column's
+    decoder (e.g. ``json.loads`` for report blobs) only runs when it is asked
+    for. Returns ``{'history': [...], 'next_cursor': str or None}``.
+    """
+    sql = f"SELECT id, created_at, {', '.join(fields)} FROM {table} WHERE user_id = ?"
+    params = [user_id]
+    if before:
+        sql += ' AND (created_at, id) < (?, ?)'
+        params.extend(decode_cursor(before))
+    sql += ' ORDER BY created_at DESC, id DESC'
+    if limit is not None:
+        # One extra row tells us whether another page exists
+        sql += ' LIMIT ?'
+        params.append(limit + 1)
+
+    rows = db.query(sql, params)
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+
+    history = []
+    for row in rows:
+        item = {}
+        for name, value in zip(fields, row[2:]):
+            decode = available[name]
+            item[name] = decode(value) if decode is not None and value is not None else value
+        history.append(item)
+    return {'history': history, 'next_cursor': next_cursor}
+
+
+_databases: Dict[str, Database] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(path: Optional[str] = None) -> Database:
+    """Process-wide shared, migrated ``Database`` for ``path`` (default: ``get_db_path()``)"""
+    path = path or get_db_path()
+    with _databases_lock:
+        database = _databases.get(path)
+        if database is None:
+            database = Database(path)
+            database.migrate()
+            _databases[path] = database
+        return database
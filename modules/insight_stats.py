@@ -0,0 +1,113 @@
+import json
+import sqlite3
+from typing import Dict, Any, Optional
+
+# How many of the most recent scores each aggregate keeps (newest first)
+RECENT_SCORES = 10
+
+
+def record_interview(cursor: sqlite3.Cursor, user_id: str, interview_type: str, score: float):
+    """Fold one completed interview into ``user_interview_stats``.
+
+    Runs on the caller's cursor so it commits (or rolls back) together with
+    the ``interview_results`` row it summarizes.
+    """
+    row = cursor.execute('''
+        SELECT interview_count, score_sum, min_score, max_score, first_score, recent_scores, type_stats
+        FROM user_interview_stats WHERE user_id = ?
+    ''', (user_id,)).fetchone()
+
+    if row is None:
+        count, total, low, high, first = 0, 0.0, score, score, score
+        recent, types = [], {}
+    else:
+        count, total, low, high, first = row[0], row[1], min(row[2], score), max(row[3], score), row[4]
+        recent, types = json.loads(row[5]), json.loads(row[6])
+
+    type_count, type_sum = types.get(interview_type, [0, 0.0])
+    types[interview_type] = [type_count + 1, type_sum + score]
+    recent = ([score] + recent)[:RECENT_SCORES]
+
+    cursor.execute('''
+        INSERT OR REPLACE INTO user_interview_stats
+        (user_id, interview_count, score_sum, min_score, max_score, first_score, latest_score,
+         recent_scores, type_stats, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', (user_id, count + 1, total + score, low, high, first, score, json.dumps(recent), json.dumps(types)))
+
+
+def record_assessment(cursor: sqlite3.Cursor, user_id: str, final_scores: Dict[str, float]):
+    """Fold one completed assessment's skill scores into ``user_skill_stats``"""
+    row = cursor.execute('''
+        SELECT assessment_count, latest_scores, skill_stats FROM user_skill_stats WHERE user_id = ?
+    ''', (user_id,)).fetchone()
+
+    count, previous, skills = (0, {}, {}) if row is None else (row[0], json.loads(row[1]), json.loads(row[2]))
+    for skill, score in final_scores.items():
+        stats = skills.get(skill)
+        if stats is None:
+            skills[skill] = {'count': 1, 'sum': score, 'min': score, 'max': score, 'recent': [score]}
+        else:
+            stats['count'] += 1
+            stats['sum'] += score
+            stats['min'] = min(stats['min'], score)
+            stats['max'] = max(stats['max'], score)
+            stats['recent'] = ([score] + stats['recent'])[:RECENT_SCORES]
+
+    cursor.execute('''
+        INSERT OR REPLACE INTO user_skill_stats
+        (user_id, assessment_count, latest_scores, previous_scores, skill_stats, updated_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', (user_id, count + 1, json.dumps(final_scores), json.dumps(previous), json.dumps(skills)))
+
+
+def load_interview_stats(db, user_id: str) -> Optional[Dict[str, Any]]:
+    """The user's interview aggregate row, decoded, or None"""
+    rows = db.query('''
+        SELECT interview_count, score_sum, min_score, max_score, first_score, latest_score,
+               recent_scores, type_stats
+        FROM user_interview_stats WHERE user_id = ?
+    ''', (user_id,))
+    if not rows:
+        return None
+    row = rows[0]
+    return {
+        'count': row[0], 'sum': row[1], 'min': row[2], 'max': row[3],
+        'first': row[4], 'latest': row[5],
+        'recent': json.loads(row[6]), 'types': json.loads(row[7])
+    }
+
+
+def load_skill_stats(db, user_id: str) -> Optional[Dict[str, Any]]:
+    """The user's skill aggregate row, decoded, or None"""
+    rows = db.query('''
+        SELECT assessment_count, latest_scores, previous_scores, skill_stats
+        FROM user_skill_stats WHERE user_id = ?
+    ''', (user_id,))
+    if not rows:
+        return None
+    row = rows[0]
+    return {
+        'count': row[0], 'latest': json.loads(row[1]),
+        'previous': json.loads(row[2]), 'skills': json.loads(row[3])
+    }
+
+
+def rebuild_stats(conn: sqlite3.Connection):
+    """Recompute every aggregate from the history tables, oldest result first"""
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM user_interview_stats')
+    cursor.execute('DELETE FROM user_skill_stats')
+    interviews = conn.execute('''
+        SELECT user_id, interview_type, overall_score FROM interview_results
+        WHERE overall_score IS NOT NULL ORDER BY created_at, id
+    ''').fetchall()
+    for user_id, interview_type, score in interviews:
+        record_interview(cursor, user_id, interview_type, score)
+
+    assessments = conn.execute('''
+        SELECT user_id, final_scores FROM assessment_results
+        WHERE final_scores IS NOT NULL ORDER BY created_at, id
+    ''').fetchall()
+    for user_id, final_scores in assessments:
+        record_assessment(cursor, user_id, json.loads(final_scores))
@@ -1,21 +1,48 @@
-import sqlite3
 import json
 import requests
 from typing import Dict, List, Any
+import threading
 from datetime import datetime, timedelta
-import random
+from types import MappingProxyType
+from modules.market_scores import MarketScoreTable
+from modules.response_encoding import JsonFragments
+from modules.database import Database, get_database
 
 class JobMarketAnalyzer:
-    def __init__(self):
-        self.db_path = 'career_advisor.db'
-        self.market_trends = {}
+    # Fields every industry needs for analyze_market, and their accepted types
+    INDUSTRY_FIELDS = {
+        'growth_rate': (int, float),
+        'demand_skills': list,
+        'salary_trend': str,
+        'job_openings': (int, float),
+        'competition_level': str,
+        'remote_work_percentage': (int, float)
+    }
+    # Optional fields that are type-checked when present
+    OPTIONAL_INDUSTRY_FIELDS = {
+        'market_factor': (int, float),
+        'emerging_roles': list,
+        'hot_skills': list,
+        'market_insights': list
+    }
+
+    def __init__(self, market_scores: MarketScoreTable = None, database: Database = None):
+        self.db = database or get_database()
         self.industry_data = {}
-        self._load_market_data()
+        self.market_scores = market_scores or MarketScoreTable()
+        self._reload_lock = threading.Lock()
+        static = self._build_static_sections(self._load_market_data())
+        self.static_sections = dict(static, version=self.market_scores.load_industries(static['market_trends']))
+    
+    @property
+    def market_trends(self) -> Dict[str, Dict[str, Any]]:
+        """Per-industry market data of the current snapshot"""
+        return self.static_sections['market_trends']
     
-    def _load_market_data(self):
+    def _load_market_data(self) -> Dict[str, Dict[str, Any]]:
         """Load comprehensive market data and trends with real-time insights"""
         # Enhanced market data with more detailed insights
-        self.market_trends = {
+        market_trends = {
             'technology': {
                 'growth_rate': 12.5,
                 'demand_skills': ['Python Programming', 'Machine Learning', 'Data Analysis', 'Cloud Computing', 'DevOps', 'AI/ML'],
@@ -131,6 +158,80 @@ class JobMarketAnalyzer:
                 'long_term': 'AI and automation reshaping job landscape'
             }
         }
+        return market_trends
+    
+    def refresh_market_data(self) -> int:
+        """Reload market data and recompute the market score table"""
+        with self._reload_lock:
+            static = self._build_static_sections(self._load_market_data())
+            version = self.market_scores.load_industries(static['market_trends'])
+            self.static_sections = dict(static, version=version)
+            return version
+    
+    def ingest_market_data(self, market_trends: Dict[str, Dict[str, Any]]) -> int:
+        """Merge new per-industry market data and recompute the market score table.
+
+        Raises ValueError, leaving the current data untouched, if any merged
+        industry is missing a required field or has a field of the wrong type.
+        """
+        if not isinstance(market_trends, dict):
+            raise ValueError('market_trends must be an object keyed by industry')
+        with self._reload_lock:
+            merged = {industry: dict(data) for industry, data in self.market_trends.items()}
+            for industry, data in market_trends.items():
+                if not isinstance(data, dict):
+                    raise ValueError(f'Market data for {industry} must be an object')
+                merged.setdefault(industry, {}).update(data)
+            for industry, data in merged.items():
+                self._validate_industry(industry, data)
+            
+            # Build everything from the merged data before publishing any of it
+            static = self._build_static_sections(merged)
+            version = self.market_scores.load_industries(merged)
+            self.static_sections = dict(static, version=version)
+            return version
+    
+    def _validate_industry(self, industry: str, data: Dict[str, Any]):
+        """Raise ValueError unless one industry's market data has the expected fields and types"""
+        for field, types in list(self.INDUSTRY_FIELDS.items()) + list(self.OPTIONAL_INDUSTRY_FIELDS.items()):
+            if field not in data:
+                if field in self.INDUSTRY_FIELDS:
+                    raise ValueError(f'Market data for {industry} is missing {field}')
+                continue
+            value = data[field]
+            if isinstance(value, bool) or not isinstance(value, types):
+                raise ValueError(f'Market data field {field} for {industry} has the wrong type')
+            if isinstance(value, list) and not all(isinstance(item, str) for item in value):
+                raise ValueError(f'Market data field {field} for {industry} must be a list of strings')
+    
+    def _build_static_sections(self, market_trends: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Precompute the skill-independent sections, and their JSON, for one set of market data.
+
+        The snapshot also carries the market data itself; callers add the
+        market score ``version`` and swap the whole snapshot in with one
+        assignment, so a request never mixes two versions.
+        """
+        sections = {
+            'overall_market_health': self._assess_market_health(),
+            'real_time_indicators': self._get_real_time_indicators(),
+            'market_forecast': self._generate_market_forecast(),
+            'remote_work_analysis': self._analyze_remote_work_trends(market_trends),
+            'skill_trends': self._analyze_skill_trends(),
+            'geographic_insights': self._generate_geographic_insights()
+        }
+        return {
+            'market_trends': market_trends,
+            'sections': MappingProxyType(sections),
+            'fragments': JsonFragments(sections.values())
+        }
+    
+    def get_static_fragments(self) -> Dict[str, str]:
+        """Serialized JSON for the skill-independent market analysis sections"""
+        static = self.static_sections
+        return {
+            name: static['fragments'].get(section).decode('utf-8')
+            for name, section in static['sections'].items()
+        }
     
     def get_available_industries(self) -> List[str]:
         """Get list of available industries"""
@@ -142,11 +243,13 @@ class JobMarketAnalyzer:
         """
         matched_skills = skill_analysis.get('matched_skills', [])
         skill_names = [skill['name'] for skill in matched_skills]
+        snapshot = self.static_sections
+        static = snapshot['sections']
         
         # Analyze market opportunities for each industry
         industry_opportunities = {}
-        for industry, data in self.market_trends.items():
-            opportunity_score = self._calculate_opportunity_score(skill_names, data)
+        for industry, data in snapshot['market_trends'].items():
+            opportunity_score = self._calculate_opportunity_score(skill_names, industry, data)
             industry_opportunities[industry] = {
                 'opportunity_score': opportunity_score,
                 'growth_rate': data['growth_rate'],
@@ -174,18 +277,18 @@ class JobMarketAnalyzer:
             'industry_opportunities': dict(top_opportunities),
             'emerging_trends': emerging_trends,
             'market_insights': market_insights,
-            'overall_market_health': self._assess_market_health(),
+            'overall_market_health': static['overall_market_health'],
             'skill_demand_analysis': self._analyze_skill_demand(skill_names),
             'salary_insights': self._generate_salary_insights(industry_opportunities),
-            'real_time_indicators': self._get_real_time_indicators(),
-            'market_forecast': self._generate_market_forecast(),
-            'remote_work_analysis': self._analyze_remote_work_trends(),
+            'real_time_indicators': static['real_time_indicators'],
+            'market_forecast': static['market_forecast'],
+            'remote_work_analysis': static['remote_work_analysis'],
             'emerging_roles': self._identify_emerging_roles(skill_names),
-            'skill_trends': self._analyze_skill_trends(),
-            'geographic_insights': self._generate_geographic_insights()
+            'skill_trends': static['skill_trends'],
+            'geographic_insights': static['geographic_insights']
         }
     
-    def _calculate_opportunity_score(self, skills: List[str], industry_data: Dict) -> float:
+    def _calculate_opportunity_score(self, skills: List[str], industry: str, industry_data: Dict) -> float:
         """Calculate opportunity score based on skill match and market factors"""
         demand_skills = industry_data['demand_skills']
         growth_rate = industry_data['growth_rate']
@@ -206,7 +309,7 @@ class JobMarketAnalyzer:
         opportunity_score = (
             skill_match_percentage * skill_weight +
             normalized_growth * 100 * growth_weight +
-            random.uniform(70, 90) * market_weight  # Simulated market factor
+            self.market_scores.industry_factor(industry) * market_weight  # Precomputed market factor
         )
         
         return round(min(opportunity_score, 100), 2)
@@ -336,7 +439,7 @@ class JobMarketAnalyzer:
         }
     
     def _get_real_time_indicators(self) -> Dict[str, Any]:
-        """Get real-time market indicators"""
+        """Get real-time market indicators (as of the last market data load)"""
         return {
             'market_health_score': self.market_indicators['overall_health'],
             'trending_skills': self.market_indicators['trending_skills'],
@@ -382,7 +485,7 @@ class JobMarketAnalyzer:
             }
         }
     
-    def _analyze_remote_work_trends(self) -> Dict[str, Any]:
+    def _analyze_remote_work_trends(self, market_trends: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze remote work trends and opportunities"""
         remote_trends = self.market_indicators['remote_work_trends']
         
@@ -395,7 +498,7 @@ class JobMarketAnalyzer:
             },
             'industry_remote_opportunities': {
                 industry: data['remote_work_percentage'] 
-                for industry, data in self.market_trends.items()
+                for industry, data in market_trends.items()
             },
             'remote_work_benefits': [
                 'Increased work-life balance',
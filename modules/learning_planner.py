@@ -2,12 +2,20 @@ import json
 from typing import Dict, List, Any
 from datetime import datetime, timedelta
 import random
+from modules.response_encoding import JsonFragments
 
 class LearningPlanGenerator:
     def __init__(self):
         self.course_database = self._load_course_database()
         self.certification_database = self._load_certification_database()
         self.project_database = self._load_project_database()
+        # Catalog entries are returned as-is, so their JSON can be encoded once
+        self.json_fragments = JsonFragments(
+            entry
+            for database in (self.course_database, self.certification_database, self.project_database)
+            for entries in database.values()
+            for entry in entries
+        )
     
     def _load_course_database(self) -> Dict[str, List[Dict]]:
         """Load online course database with Indian pricing and platforms"""
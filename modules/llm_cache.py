@@ -0,0 +1,178 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+
+from modules.database import ConnectionPool
+
+
+class LLMCache:
+    """On-disk cache of LLM responses, shared by every worker process on the host.
+
+    Entries are keyed by provider, model, prompt and parameters, expire after
+    ``ttl_seconds`` and are evicted least-recently-used first once the stored
+    responses exceed ``max_bytes``. The stored byte total is kept in a one-row
+    meta table, so a write only trims when it is over budget, walking the
+    ``last_used`` index ``TRIM_BATCH`` rows at a time. A hit only rewrites an entry's ``last_used``
+    once it is ``touch_seconds`` old, so repeated hits stay read-only.
+    """
+
+    TRIM_BATCH = 64
+
+    def __init__(self, path: str = 'llm_cache.db', ttl_seconds: float = 7 * 86400,
+                 max_bytes: int = 64 * 1024 * 1024, touch_seconds: float = 60.0, pool_size: int = 8):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.touch_seconds = touch_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.expired = 0
+        self._counter_lock = threading.Lock()
+        # Threads hand their connection back when they exit
+        self._pool = ConnectionPool(self._open, pool_size)
+        with self._transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache (created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache_meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    total_bytes INTEGER NOT NULL
+                )
+            ''')
+            # Seeded once from the entries already stored, then maintained by every write
+            conn.execute('INSERT OR IGNORE INTO llm_cache_meta (id, total_bytes) '
+                         'SELECT 0, COALESCE(SUM(size), 0) FROM llm_cache')
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str, params: Dict[str, Any] = None) -> str:
+        """Stable hash of everything that determines a response"""
+        material = json.dumps([provider, model, prompt, params or {}], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's pooled connection"""
+        return self._pool.acquire()
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the database lock up front"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for a key, or None if absent or expired"""
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute('SELECT response, last_used FROM llm_cache WHERE key = ? AND created_at > ?',
+                           (key, now - self.ttl_seconds)).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+        if now - row[1] >= self.touch_seconds:
+            # Recency only needs to be coarse for LRU trimming; the guard skips
+            # the write when another worker already refreshed it
+            conn.execute('UPDATE llm_cache SET last_used = ? WHERE key = ? AND last_used <= ?',
+                         (now, key, now - self.touch_seconds))
+        self._count('hits')
+        return row[0]
+
+    def put(self, key: str, provider: str, model: str, response: str):
+        """Store a response, then drop a batch of expired entries and trim to ``max_bytes``"""
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._transaction() as conn:
+            replaced = conn.execute('SELECT size FROM llm_cache WHERE key = ?', (key,)).fetchone()
+            conn.execute('''
+                INSERT OR REPLACE INTO llm_cache (key, provider, model, response, size, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (key, provider, model, response, size, now, now))
+            total = self._add_bytes(conn, size - (replaced[0] if replaced else 0))
+
+            # Reads already ignore expired entries, so one bounded batch per write is enough
+            expired = self._delete(conn, conn.execute(
+                'SELECT key, size FROM llm_cache WHERE created_at <= ? ORDER BY created_at LIMIT ?',
+                (now - self.ttl_seconds, self.TRIM_BATCH)
+            ).fetchall())
+            total = self._add_bytes(conn, -sum(size for _, size in expired))
+
+            evicted = []
+            while total > self.max_bytes:
+                victims = []
+                for victim in conn.execute('SELECT key, size FROM llm_cache ORDER BY last_used LIMIT ?',
+                                           (self.TRIM_BATCH,)).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    victims.append(victim)
+                    total -= victim[1]
+                if not victims:
+                    break
+                evicted += self._delete(conn, victims)
+            if evicted:
+                self._add_bytes(conn, -sum(size for _, size in evicted))
+        self._count('expired', len(expired))
+        self._count('evicted', len(evicted))
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, rows: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        conn.executemany('DELETE FROM llm_cache WHERE key = ?', [(key,) for key, _ in rows])
+        return rows
+
+    @staticmethod
+    def _add_bytes(conn: sqlite3.Connection, delta: int) -> int:
+        """Adjust the stored byte total and return the new value"""
+        if delta:
+            conn.execute('UPDATE llm_cache_meta SET total_bytes = total_bytes + ? WHERE id = 0', (delta,))
+        return conn.execute('SELECT total_bytes FROM llm_cache_meta WHERE id = 0').fetchone()[0]
+
+    def clear(self):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM llm_cache')
+            conn.execute('UPDATE llm_cache_meta SET total_bytes = 0 WHERE id = 0')
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, stored bytes and hit/miss counters for this process"""
+        entries, size = self._connection().execute(
+            'SELECT (SELECT COUNT(*) FROM llm_cache), total_bytes FROM llm_cache_meta WHERE id = 0'
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evicted': self.evicted,
+            'expired': self.expired
+        }
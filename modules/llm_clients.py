@@ -0,0 +1,306 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Callable, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.llm_cache import LLMCache
+from modules.provider_health import ProviderHealth, ProviderUnavailableError
+
+
+def _get_genai():
+    """Lazy import of Gemini to avoid heavy import delays at startup"""
+    try:
+        import google.generativeai as _genai
+        return _genai
+    except Exception:
+        return None
+
+
+class LLMConfig:
+    """Provider settings, read from the environment once at startup"""
+
+    def __init__(self, env: Dict[str, str] = None):
+        env = os.environ if env is None else env
+        self.provider_mode = env.get('LLM_PROVIDER', 'live').lower()
+        self.gemini_api_key = env.get('GEMINI_API_KEY')
+        self.gemini_model = env.get('GEMINI_MODEL', 'gemini-1.5-flash')
+        self.pplx_api_key = env.get('PPLX_API_KEY')
+        self.pplx_model = env.get('PPLX_MODEL', 'sonar-small-online')
+        self.pplx_url = env.get('PPLX_API_URL', 'https://api.perplexity.ai/chat/completions')
+        self.timeout_seconds = float(env.get('LLM_TIMEOUT_SECONDS', '12'))
+        self.pool_size = int(env.get('LLM_HTTP_POOL_SIZE', '16'))
+        self.cache_path = env.get('LLM_CACHE_PATH', 'llm_cache.db')
+        self.cache_ttl_seconds = float(env.get('LLM_CACHE_TTL_SECONDS', str(7 * 86400)))
+        self.cache_max_bytes = int(float(env.get('LLM_CACHE_MAX_MB', '64')) * 1024 * 1024)
+        self.cache_touch_seconds = float(env.get('LLM_CACHE_TOUCH_SECONDS', '60'))
+        self.min_timeout_seconds = float(env.get('LLM_MIN_TIMEOUT_SECONDS', '1'))
+        self.breaker_failures = int(env.get('LLM_BREAKER_FAILURES', '5'))
+        self.breaker_reset_seconds = float(env.get('LLM_BREAKER_RESET_SECONDS', '30'))
+
+    def health_options(self) -> Dict[str, Any]:
+        """Keyword arguments for each provider's ``ProviderHealth``"""
+        return {
+            'failure_threshold': self.breaker_failures,
+            'reset_seconds': self.breaker_reset_seconds,
+            'min_timeout': self.min_timeout_seconds,
+            'max_timeout': self.timeout_seconds
+        }
+
+
+class LLMProvider(ABC):
+    """A text-generation backend: ``generate(prompt, system, timeout)`` returns text or None.
+
+    ``min_timeout`` is the caller's floor for slow prompts; only providers with
+    an adaptive timeout (``GuardedProvider``) use it.
+    """
+
+    name = 'provider'
+    model = ''
+
+    @property
+    def available(self) -> bool:
+        return False
+
+    @abstractmethod
+    def generate(self, prompt: str, system: str = None, timeout: float = None,
+                 min_timeout: float = None) -> Optional[str]:
+        """Reply text, or None when the provider had nothing to say"""
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini client configured once; the model object is shared across threads"""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: str, model: str = 'gemini-1.5-flash'):
+        self.api_key = api_key
+        self.model = model
+        # Resolved once: ``available`` is checked before every enrichment call
+        self._genai = _get_genai() if api_key else None
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self._genai is not None
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._genai.configure(api_key=self.api_key)
+                    self._client = self._genai.GenerativeModel(self.model)
+        return self._client
+
+    def generate(self, prompt: str, system: str = None, timeout: float = None,
+                 min_timeout: float = None) -> Optional[str]:
+        if system:
+            prompt = f'{system}\n{prompt}'
+        resp = self._get_client().generate_content(
+            prompt, request_options={'timeout': timeout} if timeout else None
+        )
+        text = getattr(resp, 'text', '').strip()
+        return text or None
+
+
+class PerplexityProvider(LLMProvider):
+    """Perplexity chat completions over a pooled keep-alive ``requests.Session``"""
+
+    name = 'perplexity'
+
+    def __init__(self, api_key: str, model: str = 'sonar-small-online',
+                 url: str = 'https://api.perplexity.ai/chat/completions',
+                 timeout_seconds: float = 12.0, pool_size: int = 16):
+        self.api_key = api_key
+        self.model = model
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        })
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def generate(self, prompt: str, system: str = None, timeout: float = None,
+                 min_timeout: float = None) -> Optional[str]:
+        messages = [{'role': 'system', 'content': system}] if system else []
+        messages.append({'role': 'user', 'content': prompt})
+        r = self.session.post(self.url, json={'model': self.model, 'messages': messages},
+                              timeout=timeout or self.timeout_seconds)
+        # Errors raise so the health tracker counts them
+        r.raise_for_status()
+        text = (r.json().get('choices', [{}])[0].get('message', {}).get('content') or '').strip()
+        return text or None
+
+
+class StubProvider(LLMProvider):
+    """Offline provider for tests and local runs: replies come from ``reply``.
+
+    ``reply`` may be a string or ``callable(prompt, system)``; with no reply
+    the provider reports itself unavailable, so callers skip it entirely.
+    Every prompt is recorded in ``calls``.
+    """
+
+    def __init__(self, name: str, reply: Union[str, Callable[[str, Optional[str]], Optional[str]], None] = None):
+        self.name = name
+        self.reply = reply
+        self.calls = []
+
+    @property
+    def available(self) -> bool:
+        return self.reply is not None
+
+    def generate(self, prompt: str, system: str = None, timeout: float = None,
+                 min_timeout: float = None) -> Optional[str]:
+        self.calls.append((prompt, system))
+        return self.reply(prompt, system) if callable(self.reply) else self.reply
+
+
+class CachedProvider(LLMProvider):
+    """Serves repeat prompts from an ``LLMCache`` and stores fresh responses"""
+
+    def __init__(self, provider: LLMProvider, cache: LLMCache):
+        self.provider = provider
+        self.cache = cache
+        self.name = provider.name
+        self.model = provider.model
+
+    @property
+    def available(self) -> bool:
+        return self.provider.available
+
+    def generate(self, prompt: str, system: str = None, timeout: float = None,
+                 min_timeout: float = None) -> Optional[str]:
+        key = self.cache.make_key(self.name, self.model, prompt, {'system': system})
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        text = self.provider.generate(prompt, system, timeout, min_timeout)
+        # Failures (None) are not cached so the next request retries the provider
+        if text:
+            self.cache.put(key, self.name, self.model, text)
+        return text
+
+
+class GuardedProvider(LLMProvider):
+    """Applies a ``ProviderHealth`` circuit breaker and adaptive timeout to a provider.
+
+    While the circuit is open the provider reports itself unavailable, so
+    enrichment call sites skip it, and direct calls raise
+    ``ProviderUnavailableError`` without touching the network.
+
+    The adaptive timeout is learnt from short prompts; callers with slower
+    prompts pass ``min_timeout`` to raise it, and those calls stay out of the
+    latency window so they do not stretch the timeout for everyone else.
+    """
+
+    def __init__(self, provider: LLMProvider, health: ProviderHealth):
+        self.provider = provider
+        self.health = health
+        self.name = provider.name
+        self.model = provider.model
+
+    @property
+    def available(self) -> bool:
+        return self.provider.available and not self.health.is_open()
+
+    def generate(self, prompt: str, system: str = None, timeout: float = None,
+                 min_timeout: float = None) -> Optional[str]:
+        if not self.health.allow():
+            raise ProviderUnavailableError(f'{self.name} circuit is open')
+        adaptive = max(self.health.timeout(), min_timeout or 0.0)
+        timeout = min(timeout, adaptive) if timeout else adaptive
+        start = time.perf_counter()
+        try:
+            text = self.provider.generate(prompt, system, timeout)
+        except Exception:
+            self.health.record_failure()
+            raise
+        self.health.record_success(None if min_timeout else time.perf_counter() - start)
+        return text
+
+
+class LLMClients:
+    """The configured providers, shared by every module"""
+
+    def __init__(self, gemini: LLMProvider = None, perplexity: LLMProvider = None,
+                 cache: LLMCache = None, health_options: Dict[str, Any] = None):
+        self.gemini = gemini or StubProvider('gemini')
+        self.perplexity = perplexity or StubProvider('perplexity')
+        self.cache = cache
+        self.health = {}
+        if health_options is not None:
+            # The cache sits outside the breaker so cached answers never count against a provider
+            self.health = {name: ProviderHealth(name, **health_options) for name in ('gemini', 'perplexity')}
+            self.gemini = GuardedProvider(self.gemini, self.health['gemini'])
+            self.perplexity = GuardedProvider(self.perplexity, self.health['perplexity'])
+        if cache is not None:
+            self.gemini = CachedProvider(self.gemini, cache)
+            self.perplexity = CachedProvider(self.perplexity, cache)
+
+    @classmethod
+    def from_config(cls, config: LLMConfig = None) -> 'LLMClients':
+        """Live clients for the configured keys, or stubs when ``LLM_PROVIDER=offline``.
+
+        Live responses are cached on disk unless ``LLM_CACHE_MAX_MB`` is 0.
+        """
+        config = config or LLMConfig()
+        if config.provider_mode == 'offline':
+            return cls()
+        cache = None
+        if config.cache_max_bytes > 0 and (config.gemini_api_key or config.pplx_api_key):
+            cache = LLMCache(config.cache_path, config.cache_ttl_seconds, config.cache_max_bytes,
+                             config.cache_touch_seconds)
+        return cls(
+            gemini=GeminiProvider(config.gemini_api_key, config.gemini_model) if config.gemini_api_key else None,
+            perplexity=PerplexityProvider(
+                config.pplx_api_key, config.pplx_model, config.pplx_url,
+                config.timeout_seconds, config.pool_size
+            ) if config.pplx_api_key else None,
+            cache=cache,
+            health_options=config.health_options()
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Which providers are usable, without exposing keys"""
+        return {provider.name: provider.available for provider in (self.gemini, self.perplexity)}
+
+    def stats(self) -> Dict[str, Any]:
+        """Provider availability, circuit breaker state and response cache metrics"""
+        return {
+            'providers': self.status(),
+            'health': {name: health.snapshot() for name, health in self.health.items()},
+            'cache': self.cache.stats() if self.cache else None
+        }
+
+
+_clients = None
+_clients_lock = threading.Lock()
+
+
+def get_llm_clients() -> LLMClients:
+    """Process-wide clients, built from the environment on first use"""
+    global _clients
+    if _clients is None:
+        with _clients_lock:
+            if _clients is None:
+                _clients = LLMClients.from_config()
+    return _clients
+
+
+def set_llm_clients(clients: LLMClients):
+    """Replace the process-wide clients (e.g. with stubs in tests)"""
+    global _clients
+    with _clients_lock:
+        _clients = clients
@@ -0,0 +1,113 @@
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, Callable, Optional
+
+from modules.session_store import SessionStore, MemorySessionStore, SessionConflictError
+
+
+class EnrichmentRunner:
+    """Runs optional LLM provider calls concurrently under one shared deadline.
+
+    ``run`` returns whatever finished before the deadline. Calls still in
+    flight keep running in the background; the ticket in the session store
+    collects every result (early and late), so a follow-up poll from any
+    worker sees the complete set. Tickets belong in a job store (see
+    ``create_job_store``), not the session store.
+
+    At most ``max_pending`` calls may be queued or running; a ``run`` that
+    would exceed that is skipped entirely (counted in ``dropped``), since
+    enrichment is optional and the caller already has a baseline answer.
+    """
+
+    NAMESPACE = 'enrichment'
+
+    def __init__(self, store: SessionStore = None, executor: ThreadPoolExecutor = None,
+                 deadline_seconds: float = None, max_pending: int = None):
+        self.store = store or MemorySessionStore(ttl_seconds=900.0)
+        self.executor = executor or ThreadPoolExecutor(max_workers=8, thread_name_prefix='llm-enrichment')
+        self.deadline_seconds = deadline_seconds if deadline_seconds is not None else float(os.getenv('LLM_ENRICHMENT_DEADLINE_SECONDS', '3'))
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv('LLM_ENRICHMENT_QUEUE_MAX', '64'))
+        self.dropped = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def run(self, calls: Dict[str, Callable[[], Any]], context: Dict[str, Any] = None,
+            deadline_seconds: float = None) -> Dict[str, Any]:
+        """Start every call, wait up to the deadline and return
+        ``{'results': {...}, 'pending': [...], 'ticket': str or None}``.
+
+        A call that raises or returns None contributes nothing.
+        """
+        if not calls:
+            return {'results': {}, 'pending': [], 'ticket': None}
+        with self._lock:
+            if self._pending + len(calls) > self.max_pending:
+                self.dropped += len(calls)
+                return {'results': {}, 'pending': [], 'ticket': None}
+            self._pending += len(calls)
+
+        futures = {self.executor.submit(call): name for name, call in calls.items()}
+        for future in futures:
+            future.add_done_callback(self._settle)
+        deadline = self.deadline_seconds if deadline_seconds is None else deadline_seconds
+        done, not_done = wait(futures, timeout=deadline)
+
+        results = {}
+        for future in done:
+            value = self._result(future)
+            if value is not None:
+                results[futures[future]] = value
+
+        if not not_done:
+            return {'results': results, 'pending': [], 'ticket': None}
+
+        pending = sorted(futures[future] for future in not_done)
+        ticket = uuid.uuid4().hex
+        # Create the ticket before attaching callbacks so late results always have a home
+        self.store.put(self.NAMESPACE, ticket, {
+            'status': 'pending', 'pending': pending, 'results': dict(results), 'context': context or {}
+        })
+        for future in not_done:
+            future.add_done_callback(lambda f, name=futures[future]: self._record(ticket, name, self._result(f)))
+        return {'results': results, 'pending': pending, 'ticket': ticket}
+
+    def _settle(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def pending(self) -> int:
+        """Calls queued or running"""
+        with self._lock:
+            return self._pending
+
+    def poll(self, ticket: str) -> Optional[Dict[str, Any]]:
+        """Current state of a ticket, or None if it is unknown or expired"""
+        stored = self.store.get(self.NAMESPACE, ticket)
+        return stored[0] if stored else None
+
+    @staticmethod
+    def _result(future) -> Any:
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def _record(self, ticket: str, name: str, value: Any):
+        """Attach a late result to its ticket, retrying if another result lands at the same time"""
+        for _ in range(20):
+            stored = self.store.get(self.NAMESPACE, ticket)
+            if stored is None:
+                return
+            data, version = stored
+            data['pending'] = [item for item in data['pending'] if item != name]
+            if value is not None:
+                data['results'][name] = value
+            if not data['pending']:
+                data['status'] = 'complete'
+            try:
+                self.store.put(self.NAMESPACE, ticket, data, expected_version=version)
+                return
+            except SessionConflictError:
+                continue
@@ -0,0 +1,102 @@
+import logging
+import random
+import threading
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class MarketScoreTable:
+    """Precomputed, versioned market scores for careers and industries.
+
+    Scores are a pure function of the loaded market data, so identical inputs
+    always produce identical recommendations. Every reload bumps ``version``,
+    which downstream caches use for invalidation. An optional noise seed adds
+    reproducible jitter (the old simulated market factor) for demos.
+    """
+
+    # Midpoint of the simulated 70-90 market factor used before scores were tabled
+    DEFAULT_INDUSTRY_FACTOR = 80.0
+
+    def __init__(self, noise_seed: Optional[str] = None):
+        self.noise_seed = noise_seed
+        self.version = 0
+        self.updated_at = None
+        self.career_scores = {}
+        self.industry_factors = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._refresh_thread = None
+        self._refresh_stop = threading.Event()
+
+    def subscribe(self, callback: Callable[[int], None]):
+        """Register a callback invoked with the new version after each reload"""
+        self._listeners.append(callback)
+
+    def load_careers(self, careers: Dict[str, Dict[str, Any]]) -> int:
+        """Recompute career market scores from career growth rates"""
+        with self._lock:
+            version = self.version + 1
+            scores = {}
+            for title, career in careers.items():
+                # Convert growth rate to score (0-100), assuming 0-20% growth maps to 0-100
+                score = min(career.get('growth_rate', 0) * 5, 100)
+                score += self._noise(version, 'career', title, 5)
+                scores[title] = max(0, min(100, score))
+            self.career_scores = scores
+            self._publish(version)
+        return version
+
+    def load_industries(self, market_trends: Dict[str, Dict[str, Any]]) -> int:
+        """Recompute per-industry market factors from market trend data"""
+        with self._lock:
+            version = self.version + 1
+            factors = {}
+            for industry, data in market_trends.items():
+                factor = data.get('market_factor', self.DEFAULT_INDUSTRY_FACTOR)
+                factor += self._noise(version, 'industry', industry, 10)
+                factors[industry] = max(0, min(100, factor))
+            self.industry_factors = factors
+            self._publish(version)
+        return version
+
+    def career_score(self, title: str) -> float:
+        """Market opportunity score (0-100) for a career"""
+        return self.career_scores.get(title, 0.0)
+
+    def industry_factor(self, industry: str) -> float:
+        """Market factor (0-100) for an industry"""
+        return self.industry_factors.get(industry, self.DEFAULT_INDUSTRY_FACTOR)
+
+    def schedule_refresh(self, interval_seconds: float, refresh: Callable[[], Any]):
+        """Call ``refresh`` (which reloads market data) every ``interval_seconds``"""
+        if self._refresh_thread is not None or interval_seconds <= 0:
+            return
+
+        def run():
+            while not self._refresh_stop.wait(interval_seconds):
+                try:
+                    refresh()
+                except Exception as e:
+                    # The previous table stays published; try again next interval
+                    logger.exception('Market data refresh failed: %s', e)
+
+        self._refresh_thread = threading.Thread(target=run, name='market-score-refresh', daemon=True)
+        self._refresh_thread.start()
+
+    def stop_refresh(self):
+        """Stop the scheduled refresh thread, if any"""
+        self._refresh_stop.set()
+
+    def _noise(self, version: int, kind: str, name: str, spread: float) -> float:
+        """Seeded jitter for demo mode; zero when no seed is configured"""
+        if self.noise_seed is None:
+            return 0.0
+        return random.Random(f'{self.noise_seed}:{version}:{kind}:{name}').uniform(-spread, spread)
+
+    def _publish(self, version: int):
+        """Make a new version visible and notify subscribers"""
+        self.version = version
+        self.updated_at = datetime.now().isoformat()
+        for callback in list(self._listeners):
+            callback(version)
@@ -0,0 +1,172 @@
+import sqlite3
+from typing import List, Tuple, Callable, Union
+from modules.insight_stats import rebuild_stats
+
+# Ordered schema migrations: (version, description, steps). A step is an SQL
+# statement or a callable taking the connection (for data backfills). Append
+# new entries with the next version number; never edit ones that have shipped.
+MIGRATIONS: List[Tuple[int, str, List[Union[str, Callable[[sqlite3.Connection], None]]]]] = [
+    (1, 'Create catalog and history tables', [
+        '''
+        CREATE TABLE IF NOT EXISTS skills (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE,
+            category TEXT,
+            description TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS careers (
+            id INTEGER PRIMARY KEY,
+            title TEXT,
+            industry TEXT,
+            required_skills TEXT,
+            salary_range TEXT,
+            growth_rate REAL,
+            description TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS assessment_results (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT,
+            assessment_id TEXT,
+            start_time TEXT,
+            end_time TEXT,
+            final_scores TEXT,
+            assessment_report TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS interview_results (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT,
+            interview_id TEXT,
+            interview_type TEXT,
+            difficulty TEXT,
+            start_time TEXT,
+            end_time TEXT,
+            overall_score REAL,
+            session_data TEXT,
+            final_report TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        '''
+    ]),
+    (2, 'Index history tables by user and recency', [
+        # id breaks ties between rows saved within the same second
+        'CREATE INDEX IF NOT EXISTS idx_assessment_results_user_created '
+        'ON assessment_results (user_id, created_at DESC, id DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_interview_results_user_created '
+        'ON interview_results (user_id, created_at DESC, id DESC)'
+    ]),
+    (3, 'Index history tables by report id', [
+        'CREATE INDEX IF NOT EXISTS idx_assessment_results_assessment_id ON assessment_results (assessment_id)',
+        'CREATE INDEX IF NOT EXISTS idx_interview_results_interview_id ON interview_results (interview_id)'
+    ]),
+    (4, 'Add per-user insight aggregates', [
+        '''
+        CREATE TABLE IF NOT EXISTS user_interview_stats (
+            user_id TEXT PRIMARY KEY,
+            interview_count INTEGER NOT NULL,
+            score_sum REAL NOT NULL,
+            min_score REAL,
+            max_score REAL,
+            first_score REAL,
+            latest_score REAL,
+            recent_scores TEXT NOT NULL,
+            type_stats TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS user_skill_stats (
+            user_id TEXT PRIMARY KEY,
+            assessment_count INTEGER NOT NULL,
+            latest_scores TEXT NOT NULL,
+            previous_scores TEXT NOT NULL,
+            skill_stats TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        rebuild_stats
+    ]),
+    (5, 'Add normalized per-question answer tables', [
+        '''
+        CREATE TABLE IF NOT EXISTS interview_answers (
+            result_id INTEGER NOT NULL REFERENCES interview_results (id),
+            question_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            category TEXT,
+            difficulty TEXT,
+            answer TEXT,
+            answered_at TEXT,
+            overall_score REAL,
+            keyword_coverage REAL,
+            feedback TEXT,
+            PRIMARY KEY (result_id, question_id)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS assessment_responses (
+            result_id INTEGER NOT NULL REFERENCES assessment_results (id),
+            question_id TEXT NOT NULL,
+            phase TEXT,
+            answer TEXT,
+            score REAL,
+            PRIMARY KEY (result_id, question_id)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_interview_answers_question ON interview_answers (question_id, overall_score)',
+        'CREATE INDEX IF NOT EXISTS idx_assessment_responses_question ON assessment_responses (question_id, score)'
+    ])
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _ensure_version_table(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Highest migration applied to the database behind ``conn`` (0 if none)"""
+    _ensure_version_table(conn)
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations in order and return the resulting schema version.
+
+    Each migration runs in its own write transaction, and the version is
+    re-read once the lock is held, so several workers starting at once apply
+    every migration exactly once.
+    """
+    version = get_schema_version(conn)
+    for target, description, steps in MIGRATIONS:
+        if target <= version:
+            continue
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0] >= target:
+                conn.rollback()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                         (target, description))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return get_schema_version(conn)
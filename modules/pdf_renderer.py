@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional
+
+from modules.session_store import SessionStore, MemorySessionStore
+from modules.pdf_store import PDFStore
+
+
+class PDFQueueFullError(Exception):
+    """Raised when too many PDF jobs are already waiting"""
+
+
+def _default_start_method() -> str:
+    # Never fork: pools are started lazily, by which time the process has request and background threads
+    return 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class PDFRenderer:
+    """Renders resume PDFs in worker processes so ReportLab never blocks request threads.
+
+    ``submit`` queues formatted resume content and returns a job id at once;
+    job state lives in the session store, so any worker can answer a poll.
+    PDFs are named by content hash: content already in the ``PDFStore`` completes
+    without rendering, and jobs for content that is already being rendered share
+    that render. At most ``max_pending`` renders may be queued or running in
+    this process.
+
+    Each process starts its own pool on its first render, so a pool inherited
+    from a parent (gunicorn ``--preload``, the Flask reloader) is never used.
+    Workers come from a forkserver that preloads ``modules.pdf_store`` (spawn
+    where unavailable) and never fork the threaded web process; like any
+    forkserver or spawn worker, they import the launching script once, which is
+    a no-op under a WSGI server. ``PDF_RENDER_START_METHOD`` overrides this.
+    """
+
+    NAMESPACE = 'pdf_jobs'
+
+    def __init__(self, store: SessionStore = None, max_workers: int = None, max_pending: int = None,
+                 pdf_store: PDFStore = None, start_method: str = None):
+        self.store = store or MemorySessionStore()
+        self.max_workers = max_workers or int(os.getenv('PDF_RENDER_WORKERS', str(min(2, os.cpu_count() or 1))))
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv('PDF_QUEUE_MAX', '32'))
+        self.pdf_store = pdf_store or PDFStore()
+        self.start_method = start_method or os.getenv('PDF_RENDER_START_METHOD') or _default_start_method()
+        self._executor = None
+        self._pid = None
+        self._in_flight = {}
+        # Re-entrant: a done callback runs inline when its render has already finished
+        self._lock = threading.RLock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._pid != os.getpid():
+            # Forked from the process that built the pool: its workers and manager thread are not ours
+            self._executor = None
+            self._in_flight = {}
+            self._pid = os.getpid()
+        if self._executor is None:
+            context = multiprocessing.get_context(self.start_method)
+            if self.start_method == 'forkserver':
+                context.set_forkserver_preload(['modules.pdf_store'])
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._executor
+
+    def submit(self, content: Dict[str, Any]) -> str:
+        """Queue a render of formatted resume content; returns the job id"""
+        job_id = uuid.uuid4().hex
+        filename = self.pdf_store.filename(content)
+        if self.pdf_store.exists(filename):
+            self.store.put(self.NAMESPACE, job_id, {'status': 'complete', 'filename': filename, 'reused': True})
+            return job_id
+
+        with self._lock:
+            future = self._in_flight.get(filename)
+            if future is None:
+                if len(self._in_flight) >= self.max_pending:
+                    raise PDFQueueFullError('PDF rendering queue is full, please retry shortly')
+                try:
+                    future = self._get_executor().submit(self.pdf_store.save, content)
+                except BrokenProcessPool:
+                    # A worker died; retire the broken pool and start a fresh one from the forkserver
+                    broken, self._executor = self._executor, None
+                    broken.shutdown(wait=False)
+                    future = self._get_executor().submit(self.pdf_store.save, content)
+                self._in_flight[filename] = future
+                future.add_done_callback(lambda f: self._release(filename))
+        # Recorded before the completion callback is attached, so 'pending' never overwrites the outcome
+        self.store.put(self.NAMESPACE, job_id, {'status': 'pending', 'filename': filename})
+        future.add_done_callback(lambda f: self._finish(job_id, filename, f))
+        return job_id
+
+    def _release(self, filename: str):
+        with self._lock:
+            self._in_flight.pop(filename, None)
+
+    def _finish(self, job_id: str, filename: str, future):
+        try:
+            future.result()
+            state = {'status': 'complete', 'filename': filename}
+        except Exception as e:
+            state = {'status': 'failed', 'filename': filename, 'error': str(e)}
+        self.store.put(self.NAMESPACE, job_id, state)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job, or None if it is unknown or expired"""
+        stored = self.store.get(self.NAMESPACE, job_id)
+        return stored[0] if stored else None
+
+    def pending(self) -> int:
+        """Renders queued or running in this process"""
+        with self._lock:
+            return len(self._in_flight)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._pid == os.getpid():
+            executor.shutdown(wait=wait)
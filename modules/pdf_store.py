@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import uuid
+from typing import Dict, Any
+
+from modules.resume_prep import build_resume_pdf, PDF_TEMPLATE_VERSION
+
+# The parts of formatted resume content that build_resume_pdf actually draws
+RENDERED_KEYS = ('personal_info', 'summary', 'experience', 'education', 'skills', 'projects')
+
+
+def _normalize(value: Any) -> Any:
+    """Strip surrounding whitespace from every string so cosmetic edits hash alike"""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def content_hash(content: Dict[str, Any], template_version: int = PDF_TEMPLATE_VERSION) -> str:
+    """SHA-256 of the normalized rendered content plus the PDF template version"""
+    rendered = _normalize({key: content.get(key) for key in RENDERED_KEYS})
+    material = json.dumps([template_version, rendered], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class PDFStore:
+    """Content-addressed resume PDFs: identical content is rendered once and then reused.
+
+    Files are written under a temporary name and renamed into place, so a
+    reader never sees a partial PDF and concurrent renders of the same
+    content simply replace each other with identical bytes.
+    """
+
+    def __init__(self, directory: str = 'downloads', template_version: int = PDF_TEMPLATE_VERSION):
+        self.directory = directory
+        self.template_version = template_version
+
+    def filename(self, content: Dict[str, Any]) -> str:
+        return f'resume_{content_hash(content, self.template_version)[:32]}.pdf'
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def exists(self, filename: str) -> bool:
+        return os.path.exists(self.path(filename))
+
+    def save(self, content: Dict[str, Any]) -> str:
+        """Render ``content`` unless an identical PDF is already stored; returns the filename"""
+        filename = self.filename(content)
+        final_path = self.path(filename)
+        if os.path.exists(final_path):
+            return filename
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self.path(f'.{filename}.{uuid.uuid4().hex}.tmp')
+        try:
+            build_resume_pdf(content, temp_path)
+            os.replace(temp_path, final_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return filename
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+
+class ProviderUnavailableError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+
+class ProviderHealth:
+    """Circuit breaker and latency tracker for one external provider.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected without touching the network. Once ``reset_seconds``
+    have passed a single half-open probe is let through: success closes the
+    circuit, failure opens it again. Timeouts follow the observed latency
+    (``percentile`` of recent successes times ``multiplier``), clamped to
+    ``[min_timeout, max_timeout]``; until ``min_samples`` successes are seen
+    the full ``max_timeout`` applies.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0,
+                 min_timeout: float = 1.0, max_timeout: float = 12.0, percentile: float = 0.95,
+                 multiplier: float = 2.0, window: int = 100, min_samples: int = 10):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected outright (no probe due yet)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.HALF_OPEN:
+                return self._probe_in_flight
+            return time.monotonic() < self.opened_at + self.reset_seconds
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; the first call after the cool-down becomes the probe"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() >= self.opened_at + self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency: Optional[float]):
+        """Close the circuit; ``latency`` of None keeps the call out of the timeout window"""
+        with self._lock:
+            if latency is not None:
+                self._latencies.append(latency)
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def timeout(self) -> float:
+        """Seconds to wait for the next call"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.max_timeout
+            ordered = sorted(self._latencies)
+        observed = ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+        return max(self.min_timeout, min(self.max_timeout, observed * self.multiplier))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State, failure count and current timeout, for monitoring"""
+        timeout = self.timeout()
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'rejected': self.rejected,
+                'samples': len(self._latencies),
+                'timeout_seconds': round(timeout, 3)
+            }
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable, Optional
+
+
+class ResponseCache:
+    """Size-bounded LRU cache with a TTL, keyed by content hashes.
+
+    Entries are tagged with the data versions they were computed against;
+    when the caller presents a different version the whole cache is dropped,
+    so a skills, careers or market data reload never serves stale results.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(payload: Any) -> str:
+        """Canonical SHA-256 hash of a JSON-serializable payload"""
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, version: Hashable = None) -> Optional[Any]:
+        """Return the cached value for ``key`` or None on a miss"""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, version: Hashable = None):
+        """Store ``value`` unless ``version`` has been superseded since the lookup"""
+        with self._lock:
+            if version != self.version:
+                return
+
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any],
+                       version: Hashable = None) -> Dict[str, Any]:
+        """Return ``{'value': ..., 'hit': bool}``, computing and storing on a miss"""
+        value = self.get(key, version)
+        if value is not None:
+            return {'value': value, 'hit': True}
+
+        value = compute()
+        self.set(key, value, version)
+        return {'value': value, 'hit': False}
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'version': list(self.version) if isinstance(self.version, tuple) else self.version
+            }
+
+    def _check_version(self, version: Hashable):
+        """Invalidate everything when the underlying data version moves on"""
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
@@ -0,0 +1,134 @@
+import json
+import uuid
+from types import MappingProxyType
+from typing import List, Any, Callable, Iterable, Optional
+
+# orjson is optional; it is several times faster than the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.Fragment (3.9+) embeds pre-encoded JSON without a placeholder pass
+Fragment = getattr(orjson, 'Fragment', None)
+
+
+def _default(value: Any) -> Any:
+    """Fallback conversion for values the encoders do not handle natively"""
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    if hasattr(value, 'tolist'):  # numpy arrays and scalars
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def encode_json(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON with the fastest available encoder"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+class JsonFragments:
+    """Pre-encoded JSON for long-lived, immutable objects, looked up by identity.
+
+    Holding a reference to each object keeps its id stable, so a lookup only
+    hits for the very object that was encoded, never for an equal copy.
+    """
+
+    def __init__(self, values: Iterable[Any] = ()):
+        self._encoded = {}
+        for value in values:
+            self.add(value)
+
+    def add(self, value: Any):
+        """Encode ``value`` once and remember it"""
+        self._encoded[id(value)] = (value, encode_json(value))
+
+    def get(self, value: Any) -> Optional[bytes]:
+        """Pre-encoded JSON for ``value``, or None if it was not registered"""
+        entry = self._encoded.get(id(value))
+        return entry[1] if entry is not None and entry[0] is value else None
+
+    def __len__(self) -> int:
+        return len(self._encoded)
+
+
+class ResponseEncoder:
+    """Assembles JSON response bodies from live data and pre-encoded fragments.
+
+    Fragment sources are registered against paths into the response (``*``
+    matches every list item). Only those paths are inspected, so assembling a
+    response never walks the whole tree. Registered objects found there are
+    spliced in as bytes instead of being re-serialized: natively through
+    ``orjson.Fragment`` when available, otherwise via unique placeholders
+    replaced after encoding.
+
+    Splicing pays off against the stdlib encoder and ``orjson.Fragment``; with
+    an older orjson, re-encoding the fragments is cheaper than the placeholder
+    pass, so ``splice`` defaults to off in that case.
+    """
+
+    def __init__(self, splice: Optional[bool] = None):
+        self.splice = splice if splice is not None else (orjson is None or Fragment is not None)
+        self._paths = []
+        self._token = uuid.uuid4().hex
+        self._marker = b'"' + self._token.encode() + b':'
+
+    def register(self, path: str, source: Callable[[], Optional[JsonFragments]]) -> 'ResponseEncoder':
+        """Splice fragments from ``source()`` at a dotted ``path`` such as ``plan.courses.*.course``"""
+        self._paths.append((tuple(path.split('.')), source))
+        return self
+
+    def encode(self, value: Any) -> bytes:
+        """Encode a response body, reusing pre-encoded fragments where registered"""
+        if not self.splice:
+            return encode_json(value)
+
+        splices = []
+        for path, source in self._paths:
+            fragments = source()
+            if fragments:
+                value = self._splice(value, path, fragments, splices)
+
+        body = encode_json(value)
+        if not splices:
+            return body
+
+        # Each placeholder encodes as "<token>:<n>"; swap it for fragment n
+        parts = body.split(self._marker)
+        assembled = [parts[0]]
+        for part in parts[1:]:
+            end = part.index(b'"')
+            assembled.append(splices[int(part[:end])])
+            assembled.append(part[end + 1:])
+        return b''.join(assembled)
+
+    def _splice(self, node: Any, path: tuple, fragments: JsonFragments, splices: List[bytes]) -> Any:
+        """Copy-on-write replacement of registered objects along ``path``"""
+        if not path:
+            encoded = fragments.get(node)
+            if encoded is None:
+                return node
+            if Fragment is not None:
+                return Fragment(encoded)
+            splices.append(encoded)
+            return f'{self._token}:{len(splices) - 1}'
+
+        key, rest = path[0], path[1:]
+        if key == '*':
+            if not isinstance(node, (list, tuple)):
+                return node
+            items = [self._splice(item, rest, fragments, splices) for item in node]
+            changed = any(new is not old for new, old in zip(items, node))
+            return items if changed else node
+
+        if not isinstance(node, (dict, MappingProxyType)) or key not in node:
+            return node
+        child = self._splice(node[key], rest, fragments, splices)
+        if child is node[key]:
+            return node
+        copy = dict(node)
+        copy[key] = child
+        return copy
@@ -1,6 +1,5 @@
 import json
-from typing import Dict, List, Any
-from datetime import datetime
+from typing import Dict, List, Any, Tuple
 import random
 import os
 from reportlab.lib.pagesizes import letter, A4
@@ -8,22 +7,22 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-import os
-import requests
+from modules.response_encoding import JsonFragments
+from modules.llm_clients import LLMClients, get_llm_clients
 
-# Lazy-load Gemini to avoid heavy import delays at startup
-def _get_genai():
-    try:
-        import google.generativeai as _genai
-        return _genai
-    except Exception:
-        return None
+# Bump whenever build_resume_pdf changes its output, so stored PDFs are re-rendered
+PDF_TEMPLATE_VERSION = 1
+# The batched enhancement prompt returns JSON for every entry, so it gets more time than short prompts
+ENHANCE_MIN_TIMEOUT_SECONDS = float(os.getenv('LLM_RESUME_MIN_TIMEOUT_SECONDS', '8'))
 
 class ResumePreparation:
-    def __init__(self):
+    def __init__(self, llm: LLMClients = None):
+        self.llm = llm or get_llm_clients()
         self.resume_templates = self._load_resume_templates()
         self.interview_questions = self._load_interview_questions()
         self.skill_keywords = self._load_skill_keywords()
+        # Templates are returned as-is, so their JSON can be encoded once
+        self.json_fragments = JsonFragments(self.resume_templates.values())
     
     def _load_resume_templates(self) -> Dict[str, Dict]:
         """Load comprehensive resume templates for different career paths"""
@@ -1336,85 +1335,9 @@ Real-time Chat Application | GitHub: github.com/username/chat-app
         projects = resume_data.get('projects', [])
         template = resume_data.get('template', 'modern')
 
-        # If Gemini key is present, enhance summary and achievements lightly
-        use_ai = bool(resume_data.get('use_ai'))
-        if use_ai:
-            enhanced = False
-            # Try Gemini first (lazy import)
-            genai = _get_genai()
-            gemini_key = os.getenv('GEMINI_API_KEY')
-            if genai and gemini_key:
-                try:
-                    genai.configure(api_key=gemini_key)
-                    model = genai.GenerativeModel('gemini-1.5-flash')
-
-                    if summary:
-                        prompt = (
-                            "Rewrite the following resume summary to be concise, ATS-friendly, and professional (max 60 words).\n"
-                            f"Text: {summary}"
-                        )
-                        resp = model.generate_content(prompt)
-                        if getattr(resp, 'text', '').strip():
-                            summary = resp.text.strip()
-
-                    if experience and isinstance(experience[0].get('achievements', ''), str):
-                        bullets = experience[0]['achievements']
-                        prompt = (
-                            "Convert the following raw achievement lines into crisp, action-verb-led resume bullets (max 4), each on a new line.\n"
-                            f"Lines: {bullets}"
-                        )
-                        resp = model.generate_content(prompt)
-                        if getattr(resp, 'text', '').strip():
-                            experience[0]['achievements'] = resp.text
-                    enhanced = True
-                except Exception:
-                    enhanced = False
-
-            # Fallback to Perplexity if Gemini not used/failed
-            if not enhanced:
-                pplx_key = os.getenv('PPLX_API_KEY')
-                if pplx_key:
-                    headers = {
-                        'Authorization': f'Bearer {pplx_key}',
-                        'Content-Type': 'application/json'
-                    }
-                    # Summary enhancement
-                    if summary:
-                        try:
-                            payload = {
-                                'model': 'sonar-small-online',
-                                'messages': [
-                                    {'role': 'system', 'content': 'You are a concise resume writer.'},
-                                    {'role': 'user', 'content': f"Rewrite this resume summary to be concise, ATS-friendly, and professional (<=60 words):\n{summary}"}
-                                ]
-                            }
-                            r = requests.post('https://api.perplexity.ai/chat/completions', headers=headers, json=payload, timeout=12)
-                            if r.status_code == 200:
-                                data = r.json()
-                                text = data.get('choices', [{}])[0].get('message', {}).get('content', '').strip()
-                                if text:
-                                    summary = text
-                        except Exception:
-                            pass
-                    # Experience bullets
-                    if experience and isinstance(experience[0].get('achievements', ''), str):
-                        try:
-                            bullets = experience[0]['achievements']
-                            payload = {
-                                'model': 'sonar-small-online',
-                                'messages': [
-                                    {'role': 'system', 'content': 'You are a resume bullet enhancer.'},
-                                    {'role': 'user', 'content': f"Turn these raw lines into crisp, action-verb-led resume bullets (max 4), each on a new line:\n{bullets}"}
-                                ]
-                            }
-                            r = requests.post('https://api.perplexity.ai/chat/completions', headers=headers, json=payload, timeout=12)
-                            if r.status_code == 200:
-                                data = r.json()
-                                text = data.get('choices', [{}])[0].get('message', {}).get('content', '').strip()
-                                if text:
-                                    experience[0]['achievements'] = text
-                        except Exception:
-                            pass
+        # One batched LLM call rewrites the summary and every experience entry
+        if resume_data.get('use_ai'):
+            summary, experience = self._enhance_with_ai(summary, experience)
         
         # Format personal information
         formatted_personal = self._format_personal_info(personal_info)
@@ -1457,6 +1380,77 @@ Real-time Chat Application | GitHub: github.com/username/chat-app
             'portfolio': personal_info.get('portfolio', '')
         }
     
+    def _enhance_with_ai(self, summary: str, experience: List[Dict]) -> Tuple[str, List[Dict]]:
+        """Rewrite the summary and all achievement bullets in a single provider call.
+
+        Gemini is tried first, then Perplexity; a provider error or a reply that
+        fails validation moves on to the next one, and if none succeeds the
+        input is returned unchanged.
+        """
+        entries = [
+            {'index': i, 'job_title': exp.get('job_title', ''), 'achievements': exp['achievements']}
+            for i, exp in enumerate(experience)
+            if isinstance(exp.get('achievements'), str) and exp['achievements'].strip()
+        ]
+        if not summary and not entries:
+            return summary, experience
+
+        prompt = (
+            "Rewrite this resume content. Make the summary concise, ATS-friendly and professional (max 60 words). "
+            "Turn each experience entry's raw achievement lines into crisp, action-verb-led bullets (max 4 per entry). "
+            "Reply with JSON only, in the form "
+            '{"summary": "...", "experience": [{"index": 0, "bullets": ["...", "..."]}]}, '
+            "with one experience item per input entry, keeping its index.\n"
+            f"Input: {json.dumps({'summary': summary, 'experience': entries})}"
+        )
+        for provider in (self.llm.gemini, self.llm.perplexity):
+            if not provider.available:
+                continue
+            try:
+                enhanced = self._parse_enhancement(
+                    provider.generate(prompt, system='You are a concise resume writer.',
+                                      min_timeout=ENHANCE_MIN_TIMEOUT_SECONDS),
+                    bool(summary), {entry['index'] for entry in entries}
+                )
+            except Exception:
+                continue
+            experience = [dict(exp) for exp in experience]
+            for index, bullets in enhanced['experience'].items():
+                experience[index]['achievements'] = '\n'.join(bullets)
+            return enhanced['summary'] or summary, experience
+        return summary, experience
+    
+    @staticmethod
+    def _parse_enhancement(text: str, expect_summary: bool, indexes: set) -> Dict[str, Any]:
+        """Validate a batched enhancement reply; raises ValueError if it does not match the schema"""
+        if not text:
+            raise ValueError('Empty enhancement reply')
+        text = text.strip()
+        if text.startswith('```'):
+            text = text.strip('`').split('\n', 1)[-1]
+        data = json.loads(text)
+        if not isinstance(data, dict):
+            raise ValueError('Enhancement reply is not an object')
+
+        summary = data.get('summary')
+        if expect_summary and not (isinstance(summary, str) and summary.strip()):
+            raise ValueError('Enhancement reply has no summary')
+
+        items = data.get('experience', [])
+        if not isinstance(items, list):
+            raise ValueError('Enhancement experience is not a list')
+        experience = {}
+        for item in items:
+            if not isinstance(item, dict) or item.get('index') not in indexes:
+                raise ValueError(f'Unexpected experience item: {item!r}')
+            bullets = item.get('bullets')
+            if not (isinstance(bullets, list) and bullets and all(isinstance(b, str) and b.strip() for b in bullets)):
+                raise ValueError(f"Invalid bullets for experience {item['index']}")
+            experience[item['index']] = [b.strip().lstrip('-• ').strip() for b in bullets[:4]]
+        if set(experience) != indexes:
+            raise ValueError('Enhancement reply is missing experience entries')
+        return {'summary': summary.strip() if expect_summary else None, 'experience': experience}
+    
     def _format_experience(self, experience: List[Dict]) -> List[Dict]:
         """Format experience section"""
         formatted = []
@@ -1567,121 +1561,132 @@ Technologies: {', '.join(project['technologies'])}
         return resume_text.strip()
     
     def generate_pdf_resume(self, resume_data: Dict[str, Any], filename: str = None) -> str:
-        """Generate a PDF resume"""
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"resume_{timestamp}.pdf"
-        
-        # Create downloads directory if it doesn't exist
-        downloads_dir = "downloads"
-        if not os.path.exists(downloads_dir):
-            os.makedirs(downloads_dir)
-        
-        filepath = os.path.join(downloads_dir, filename)
+        """Generate a PDF resume from raw resume data.
+
+        Without a filename the PDF goes into the content-addressed store, so
+        identical resumes share one file.
+        """
+        from modules.pdf_store import PDFStore
         
         # Generate resume content
         content = self.generate_resume_content(resume_data)
-        
-        # Create PDF
-        doc = SimpleDocTemplate(filepath, pagesize=A4)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=12,
-            alignment=1,  # Center alignment
-            textColor=colors.darkblue
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=6,
-            textColor=colors.darkblue
-        )
-        
-        # Personal Information
-        personal_info = content['personal_info']
-        story.append(Paragraph(personal_info['name'].upper(), title_style))
-        
-        contact_info = f"{personal_info['email']} | {personal_info['phone']} | {personal_info['location']}"
-        if personal_info['linkedin']:
-            contact_info += f" | LinkedIn: {personal_info['linkedin']}"
-        if personal_info['github']:
-            contact_info += f" | GitHub: {personal_info['github']}"
-        
-        story.append(Paragraph(contact_info, styles['Normal']))
+        if not filename:
+            store = PDFStore("downloads")
+            return store.path(store.save(content))
+        return build_resume_pdf(content, os.path.join("downloads", filename))
+
+
+def build_resume_pdf(content: Dict[str, Any], filepath: str) -> str:
+    """Render already formatted resume content to a PDF at ``filepath``.
+
+    Module-level so the PDF worker processes can run it without a
+    ``ResumePreparation`` instance.
+    """
+    # Create the output directory if it doesn't exist
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Create PDF
+    doc = SimpleDocTemplate(filepath, pagesize=A4)
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Custom styles
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=12,
+        alignment=1,  # Center alignment
+        textColor=colors.darkblue
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=6,
+        textColor=colors.darkblue
+    )
+
+    # Personal Information
+    personal_info = content['personal_info']
+    story.append(Paragraph(personal_info['name'].upper(), title_style))
+
+    contact_info = f"{personal_info['email']} | {personal_info['phone']} | {personal_info['location']}"
+    if personal_info['linkedin']:
+        contact_info += f" | LinkedIn: {personal_info['linkedin']}"
+    if personal_info['github']:
+        contact_info += f" | GitHub: {personal_info['github']}"
+
+    story.append(Paragraph(contact_info, styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Professional Summary
+    if content['summary']:
+        story.append(Paragraph("PROFESSIONAL SUMMARY", heading_style))
+        story.append(Paragraph(content['summary'], styles['Normal']))
         story.append(Spacer(1, 12))
-        
-        # Professional Summary
-        if content['summary']:
-            story.append(Paragraph("PROFESSIONAL SUMMARY", heading_style))
-            story.append(Paragraph(content['summary'], styles['Normal']))
-            story.append(Spacer(1, 12))
-        
-        # Experience
-        if content['experience']:
-            story.append(Paragraph("EXPERIENCE", heading_style))
-            for exp in content['experience']:
-                end_date = "Present" if exp['current'] else exp['end_date']
-                job_title = f"{exp['title']} | {exp['company']} | {exp['location']} | {exp['start_date']} - {end_date}"
-                story.append(Paragraph(job_title, styles['Normal']))
-                
-                for achievement in exp['achievements']:
-                    if achievement.strip():
-                        story.append(Paragraph(f"• {achievement.strip()}", styles['Normal']))
-                story.append(Spacer(1, 6))
-        
-        # Education
-        if content['education']:
-            story.append(Paragraph("EDUCATION", heading_style))
-            for edu in content['education']:
-                gpa_text = f" | GPA: {edu['gpa']}" if edu['gpa'] else ""
-                education_text = f"{edu['degree']} in {edu['major']} | {edu['university']} | {edu['graduation_year']}{gpa_text}"
-                story.append(Paragraph(education_text, styles['Normal']))
-                
-                for achievement in edu['achievements']:
-                    if achievement.strip():
-                        story.append(Paragraph(f"• {achievement.strip()}", styles['Normal']))
-                story.append(Spacer(1, 6))
-        
-        # Skills
-        if content['skills']['technical'] or content['skills']['tools'] or content['skills']['soft']:
-            story.append(Paragraph("TECHNICAL SKILLS", heading_style))
-            skills_text = ""
-            if content['skills']['technical']:
-                skills_text += f"Programming Languages: {', '.join(content['skills']['technical'])}<br/>"
-            if content['skills']['tools']:
-                skills_text += f"Tools & Technologies: {', '.join(content['skills']['tools'])}<br/>"
-            if content['skills']['soft']:
-                skills_text += f"Soft Skills: {', '.join(content['skills']['soft'])}"
-            story.append(Paragraph(skills_text, styles['Normal']))
-            story.append(Spacer(1, 12))
-        
-        # Projects
-        if content['projects']:
-            story.append(Paragraph("PROJECTS", heading_style))
-            for project in content['projects']:
-                story.append(Paragraph(project['name'], styles['Normal']))
-                story.append(Paragraph(project['description'], styles['Normal']))
-                if project['technologies']:
-                    story.append(Paragraph(f"Technologies: {', '.join(project['technologies'])}", styles['Normal']))
-                if project['github_url']:
-                    story.append(Paragraph(f"GitHub: {project['github_url']}", styles['Normal']))
-                if project['live_url']:
-                    story.append(Paragraph(f"Live Demo: {project['live_url']}", styles['Normal']))
-                
-                for achievement in project['achievements']:
-                    if achievement.strip():
-                        story.append(Paragraph(f"• {achievement.strip()}", styles['Normal']))
-                story.append(Spacer(1, 6))
-        
-        # Build PDF
-        doc.build(story)
-        
-        return filepath
\ No newline at end of file
+
+    # Experience
+    if content['experience']:
+        story.append(Paragraph("EXPERIENCE", heading_style))
+        for exp in content['experience']:
+            end_date = "Present" if exp['current'] else exp['end_date']
+            job_title = f"{exp['title']} | {exp['company']} | {exp['location']} | {exp['start_date']} - {end_date}"
+            story.append(Paragraph(job_title, styles['Normal']))
+
+            for achievement in exp['achievements']:
+                if achievement.strip():
+                    story.append(Paragraph(f"• {achievement.strip()}", styles['Normal']))
+            story.append(Spacer(1, 6))
+
+    # Education
+    if content['education']:
+        story.append(Paragraph("EDUCATION", heading_style))
+        for edu in content['education']:
+            gpa_text = f" | GPA: {edu['gpa']}" if edu['gpa'] else ""
+            education_text = f"{edu['degree']} in {edu['major']} | {edu['university']} | {edu['graduation_year']}{gpa_text}"
+            story.append(Paragraph(education_text, styles['Normal']))
+
+            for achievement in edu['achievements']:
+                if achievement.strip():
+                    story.append(Paragraph(f"• {achievement.strip()}", styles['Normal']))
+            story.append(Spacer(1, 6))
+
+    # Skills
+    if content['skills']['technical'] or content['skills']['tools'] or content['skills']['soft']:
+        story.append(Paragraph("TECHNICAL SKILLS", heading_style))
+        skills_text = ""
+        if content['skills']['technical']:
+            skills_text += f"Programming Languages: {', '.join(content['skills']['technical'])}<br/>"
+        if content['skills']['tools']:
+            skills_text += f"Tools & Technologies: {', '.join(content['skills']['tools'])}<br/>"
+        if content['skills']['soft']:
+            skills_text += f"Soft Skills: {', '.join(content['skills']['soft'])}"
+        story.append(Paragraph(skills_text, styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    # Projects
+    if content['projects']:
+        story.append(Paragraph("PROJECTS", heading_style))
+        for project in content['projects']:
+            story.append(Paragraph(project['name'], styles['Normal']))
+            story.append(Paragraph(project['description'], styles['Normal']))
+            if project['technologies']:
+                story.append(Paragraph(f"Technologies: {', '.join(project['technologies'])}", styles['Normal']))
+            if project['github_url']:
+                story.append(Paragraph(f"GitHub: {project['github_url']}", styles['Normal']))
+            if project['live_url']:
+                story.append(Paragraph(f"Live Demo: {project['live_url']}", styles['Normal']))
+
+            for achievement in project['achievements']:
+                if achievement.strip():
+                    story.append(Paragraph(f"• {achievement.strip()}", styles['Normal']))
+            story.append(Spacer(1, 6))
+
+    # Build PDF
+    doc.build(story)
+
+    return filepath
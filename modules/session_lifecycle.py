@@ -0,0 +1,77 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+from modules.session_store import SessionStore
+
+
+class SessionLifecycleManager:
+    """Keeps a session store bounded: expires idle sessions and evicts the
+    least recently used ones beyond ``store.max_sessions``.
+
+    ``sweep()`` can be called directly; ``start()`` runs it on a daemon
+    thread every ``sweep_interval`` seconds. ``gauges()`` reports live
+    sessions and approximate bytes for monitoring.
+    """
+
+    def __init__(self, store: SessionStore, sweep_interval: float = 60.0):
+        self.store = store
+        self.sweep_interval = sweep_interval
+        self.sweeps = 0
+        self.last_sweep_at = None
+        self.last_sweep_ms = None
+        self._sweep_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sweep(self) -> Dict[str, int]:
+        """Purge expired sessions, then enforce the session limit"""
+        with self._sweep_lock:
+            start = time.perf_counter()
+            expired = self.store.purge_expired()
+            evicted = 0
+            if self.store.max_sessions is not None:
+                evicted = self.store.evict_lru(self.store.max_sessions)
+
+            self.sweeps += 1
+            self.last_sweep_at = datetime.now().isoformat()
+            self.last_sweep_ms = round((time.perf_counter() - start) * 1000, 2)
+            return {'expired': expired, 'evicted': evicted}
+
+    def start(self):
+        """Run ``sweep`` in the background every ``sweep_interval`` seconds"""
+        if self._thread is not None or self.sweep_interval <= 0:
+            return
+
+        def run():
+            while not self._stop.wait(self.sweep_interval):
+                try:
+                    self.sweep()
+                except Exception:
+                    pass
+
+        self._thread = threading.Thread(target=run, name='session-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background sweeper, if running"""
+        self._stop.set()
+
+    def gauges(self) -> Dict[str, Any]:
+        """Live session count, approximate bytes held and sweeper counters"""
+        stats = self.store.stats()
+        return {
+            'backend': type(self.store).__name__,
+            'live_sessions': stats['sessions'],
+            'approx_bytes': stats['bytes'],
+            'max_sessions': self.store.max_sessions,
+            'idle_timeout_seconds': self.store.ttl_seconds,
+            'sweep_interval_seconds': self.sweep_interval,
+            'sweeper_running': self._thread is not None and self._thread.is_alive(),
+            'sweeps': self.sweeps,
+            'last_sweep_at': self.last_sweep_at,
+            'last_sweep_ms': self.last_sweep_ms,
+            'expired_total': self.store.expired,
+            'evicted_total': self.store.evicted
+        }
@@ -0,0 +1,476 @@
+import fcntl
+import hashlib
+import json
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+
+from modules.database import ConnectionPool
+from modules.response_encoding import encode_json
+
+# Payloads above this size are zlib-compressed before they are stored
+COMPRESS_THRESHOLD = 512
+
+
+class SessionConflictError(Exception):
+    """Raised when a session changed since it was read (optimistic versioning)"""
+
+
+def serialize_session(data: Dict[str, Any]) -> bytes:
+    """Compact JSON, zlib-compressed when that saves space, behind a one-byte tag"""
+    encoded = encode_json(data)
+    if len(encoded) > COMPRESS_THRESHOLD:
+        compressed = zlib.compress(encoded, 1)
+        if len(compressed) < len(encoded):
+            return b'z' + compressed
+    return b'j' + encoded
+
+
+def deserialize_session(blob: bytes) -> Dict[str, Any]:
+    """Inverse of ``serialize_session``"""
+    tag, payload = blob[:1], blob[1:]
+    if tag == b'z':
+        payload = zlib.decompress(payload)
+    return json.loads(payload)
+
+
+class SessionStore(ABC):
+    """Interface for assessment and interview session storage.
+
+    Sessions live under a namespace, expire ``ttl_seconds`` after their last
+    write and carry an integer version that increases on every write. Passing
+    the version a session was read at as ``expected_version`` makes ``put`` a
+    compare-and-set, so concurrent writers in different workers cannot
+    silently overwrite each other.
+
+    ``ttl_seconds`` is an idle timeout: every write pushes the expiry out.
+    ``max_sessions`` bounds the live count; the least recently written
+    sessions are evicted first.
+    """
+
+    def __init__(self, ttl_seconds: float = 7200.0, max_sessions: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.expired = 0
+        self.evicted = 0
+
+    def get(self, namespace: str, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """Return ``(data, version)`` for a live session, or None"""
+        entry = self._read(namespace, session_id)
+        if entry is None:
+            return None
+        return deserialize_session(entry[0]), entry[1]
+
+    def put(self, namespace: str, session_id: str, data: Dict[str, Any],
+            expected_version: Optional[int] = None) -> int:
+        """Store a session and return its new version.
+
+        With ``expected_version`` set, the write only succeeds if the stored
+        version still matches (0 meaning "does not exist yet"); otherwise
+        SessionConflictError is raised.
+        """
+        return self._write(namespace, session_id, serialize_session(data),
+                           time.time() + self.ttl_seconds, expected_version)
+
+    @abstractmethod
+    def delete(self, namespace: str, session_id: str) -> bool:
+        """Remove a session; returns whether one was present"""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Drop every expired session and return how many were removed"""
+
+    @abstractmethod
+    def evict_lru(self, max_sessions: int) -> int:
+        """Evict the least recently used sessions beyond ``max_sessions``"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Live session count and approximate serialized bytes held"""
+
+    @abstractmethod
+    def _read(self, namespace: str, session_id: str) -> Optional[Tuple[bytes, int]]:
+        """Serialized session and version, or None if missing or expired"""
+
+    @abstractmethod
+    def _write(self, namespace: str, session_id: str, blob: bytes, expires_at: float,
+               expected_version: Optional[int]) -> int:
+        """Store a serialized session, checking ``expected_version``; returns the new version"""
+
+    @staticmethod
+    def _check_version(current: int, expected_version: Optional[int]):
+        if expected_version is not None and current != expected_version:
+            raise SessionConflictError(
+                f'Session version is {current}, expected {expected_version}'
+            )
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process store; sessions are kept serialized, as the shared backends do.
+
+    Entries are kept in LRU order and ``max_sessions`` is enforced on every
+    write, so memory stays bounded even between sweeps.
+    """
+
+    def __init__(self, ttl_seconds: float = 7200.0, max_sessions: Optional[int] = None):
+        super().__init__(ttl_seconds, max_sessions)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def delete(self, namespace: str, session_id: str) -> bool:
+        with self._lock:
+            return self._remove((namespace, session_id))
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry[2] <= now]
+            for key in expired:
+                self._remove(key)
+            self.expired += len(expired)
+        return len(expired)
+
+    def evict_lru(self, max_sessions: int) -> int:
+        with self._lock:
+            return self._evict(max_sessions)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'sessions': len(self._entries), 'bytes': self._bytes}
+
+    def _remove(self, key: tuple) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= len(entry[0])
+        return True
+
+    def _evict(self, max_sessions: int) -> int:
+        evicted = 0
+        while len(self._entries) > max_sessions:
+            self._remove(next(iter(self._entries)))
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def _read(self, namespace: str, session_id: str) -> Optional[Tuple[bytes, int]]:
+        key = (namespace, session_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= time.time():
+                return None
+            self._entries.move_to_end(key)
+        return entry[0], entry[1]
+
+    def _write(self, namespace: str, session_id: str, blob: bytes, expires_at: float,
+               expected_version: Optional[int]) -> int:
+        key = (namespace, session_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            current = entry[1] if entry is not None and entry[2] > time.time() else 0
+            self._check_version(current, expected_version)
+            self._remove(key)
+            self._entries[key] = (blob, current + 1, expires_at)
+            self._bytes += len(blob)
+            if self.max_sessions is not None:
+                self._evict(self.max_sessions)
+            return current + 1
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite store in WAL mode, shared by every worker process on the host"""
+
+    def __init__(self, path: str = 'sessions.db', ttl_seconds: float = 7200.0,
+                 max_sessions: Optional[int] = None):
+        super().__init__(ttl_seconds, max_sessions)
+        self.path = path
+        # Threads hand their connection back when they exit
+        self._pool = ConnectionPool(self._open, int(os.getenv('SESSION_DB_POOL_SIZE', '8')))
+        with self._transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    namespace TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (namespace, session_id)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)')
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's pooled connection"""
+        return self._pool.acquire()
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the database lock up front"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def delete(self, namespace: str, session_id: str) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute('DELETE FROM sessions WHERE namespace = ? AND session_id = ?',
+                                  (namespace, session_id))
+            return cursor.rowcount > 0
+
+    def purge_expired(self) -> int:
+        with self._transaction() as conn:
+            removed = conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (time.time(),)).rowcount
+        self.expired += removed
+        return removed
+
+    def evict_lru(self, max_sessions: int) -> int:
+        # Every write pushes expires_at out by the same TTL, so it orders by last use
+        with self._transaction() as conn:
+            removed = conn.execute('''
+                DELETE FROM sessions WHERE (namespace, session_id) IN (
+                    SELECT namespace, session_id FROM sessions
+                    ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (max_sessions,)).rowcount
+        self.evicted += removed
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        count, size = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions WHERE expires_at > ?',
+            (time.time(),)
+        ).fetchone()
+        return {'sessions': count, 'bytes': size}
+
+    def _read(self, namespace: str, session_id: str) -> Optional[Tuple[bytes, int]]:
+        row = self._connection().execute(
+            'SELECT data, version FROM sessions WHERE namespace = ? AND session_id = ? AND expires_at > ?',
+            (namespace, session_id, time.time())
+        ).fetchone()
+        return (bytes(row[0]), row[1]) if row else None
+
+    def _write(self, namespace: str, session_id: str, blob: bytes, expires_at: float,
+               expected_version: Optional[int]) -> int:
+        with self._transaction() as conn:
+            row = conn.execute(
+                'SELECT version, expires_at FROM sessions WHERE namespace = ? AND session_id = ?',
+                (namespace, session_id)
+            ).fetchone()
+            current = row[0] if row and row[1] > time.time() else 0
+            self._check_version(current, expected_version)
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (namespace, session_id, version, expires_at, data) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (namespace, session_id, current + 1, expires_at, blob)
+            )
+            return current + 1
+
+
+class FileSessionStore(SessionStore):
+    """One file per session, written atomically; on /dev/shm this is a shared-memory store.
+
+    Each file holds a small header (version, expiry) followed by the
+    serialized session. Compare-and-set writes hold an ``flock`` on a
+    per-session lock file; the kernel drops it if the holder dies, so there
+    are no stale locks to break.
+    """
+
+    _HEADER = struct.Struct('>Qd')
+
+    def __init__(self, directory: str = None, ttl_seconds: float = 7200.0,
+                 max_sessions: Optional[int] = None, lock_timeout: float = 5.0):
+        super().__init__(ttl_seconds, max_sessions)
+        self.directory = directory or default_file_directory('career_advisor_sessions')
+        self.lock_timeout = lock_timeout
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, namespace: str, session_id: str) -> str:
+        digest = hashlib.sha1(f'{namespace}\0{session_id}'.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{namespace}-{digest}.session')
+
+    def _load(self, path: str) -> Optional[Tuple[bytes, int, float]]:
+        """Payload, version and expiry of a session file; a truncated file is deleted and treated as missing"""
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+                inode = os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            return None
+        try:
+            version, expires_at = self._HEADER.unpack_from(raw)
+        except struct.error:
+            try:
+                # Unless a writer has already replaced it with a good file
+                if os.stat(path).st_ino == inode:
+                    os.unlink(path)
+            except OSError:
+                pass
+            return None
+        return raw[self._HEADER.size:], version, expires_at
+
+    @contextmanager
+    def _locked(self, path: str):
+        """Exclusive per-session lock; waits at most ``lock_timeout`` seconds"""
+        lock_path = path + '.lock'
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                if time.monotonic() > deadline:
+                    raise SessionConflictError('Timed out waiting for session lock')
+                time.sleep(0.002)
+                continue
+            try:
+                # Holders unlink the file on release, so a lock on a file no longer at lock_path guards nothing
+                if os.fstat(fd).st_ino == os.stat(lock_path).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+        try:
+            yield
+        finally:
+            try:
+                os.unlink(lock_path)
+            except OSError:
+                pass
+            os.close(fd)
+
+    def delete(self, namespace: str, session_id: str) -> bool:
+        path = self._path(namespace, session_id)
+        with self._locked(path):
+            try:
+                os.unlink(path)
+                return True
+            except FileNotFoundError:
+                return False
+
+    def _scan(self) -> List[Tuple[str, float, int]]:
+        """``(path, expires_at, payload bytes)`` for every session file, reading headers only"""
+        entries = []
+        for item in os.scandir(self.directory):
+            if not item.name.endswith('.session'):
+                continue
+            try:
+                with open(item.path, 'rb') as f:
+                    _, expires_at = self._HEADER.unpack(f.read(self._HEADER.size))
+                entries.append((item.path, expires_at, item.stat().st_size - self._HEADER.size))
+            except (OSError, struct.error):
+                continue
+        return entries
+
+    def _unlink(self, paths: List[str]) -> int:
+        removed = 0
+        for path in paths:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        removed = self._unlink([path for path, expires_at, _ in self._scan() if expires_at <= now])
+        self.expired += removed
+        return removed
+
+    def evict_lru(self, max_sessions: int) -> int:
+        entries = sorted(self._scan(), key=lambda entry: entry[1], reverse=True)
+        removed = self._unlink([path for path, _, _ in entries[max_sessions:]])
+        self.evicted += removed
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        now = time.time()
+        live = [size for _, expires_at, size in self._scan() if expires_at > now]
+        return {'sessions': len(live), 'bytes': sum(live)}
+
+    def _read(self, namespace: str, session_id: str) -> Optional[Tuple[bytes, int]]:
+        entry = self._load(self._path(namespace, session_id))
+        if entry is None or entry[2] <= time.time():
+            return None
+        return entry[0], entry[1]
+
+    def _write(self, namespace: str, session_id: str, blob: bytes, expires_at: float,
+               expected_version: Optional[int]) -> int:
+        path = self._path(namespace, session_id)
+        with self._locked(path):
+            entry = self._load(path)
+            current = entry[1] if entry is not None and entry[2] > time.time() else 0
+            self._check_version(current, expected_version)
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(self._HEADER.pack(current + 1, expires_at))
+                    f.write(blob)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            return current + 1
+
+
+def default_file_directory(name: str) -> str:
+    """``name`` under /dev/shm (shared memory) when available, else the temp directory"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, name)
+
+
+def _build_store(path: Optional[str], sqlite_path: str, file_directory: str,
+                 ttl_seconds: float, max_sessions: Optional[int]) -> SessionStore:
+    backend = os.getenv('SESSION_STORE', 'memory').lower()
+    if backend == 'sqlite':
+        return SQLiteSessionStore(path or sqlite_path, ttl_seconds, max_sessions)
+    if backend == 'file':
+        return FileSessionStore(path or default_file_directory(file_directory), ttl_seconds, max_sessions)
+    if backend == 'memory':
+        return MemorySessionStore(ttl_seconds, max_sessions)
+    raise ValueError(f'Unknown SESSION_STORE backend: {backend}')
+
+
+def create_session_store() -> SessionStore:
+    """Build the store selected by SESSION_STORE (memory, sqlite or file)"""
+    return _build_store(
+        os.getenv('SESSION_STORE_PATH'), 'sessions.db', 'career_advisor_sessions',
+        float(os.getenv('SESSION_TTL_SECONDS', '7200')),
+        int(os.getenv('SESSION_MAX_COUNT', '10000')) or None
+    )
+
+
+def create_job_store() -> SessionStore:
+    """Store for short-lived job state (LLM enrichment/coaching tickets, PDF jobs).
+
+    Same backend as the session store, but a separate file or directory with
+    its own TTL and cap, so job churn never evicts a live assessment or
+    interview session.
+    """
+    return _build_store(
+        os.getenv('JOB_STORE_PATH'), 'jobs.db', 'career_advisor_jobs',
+        float(os.getenv('JOB_TTL_SECONDS', '900')),
+        int(os.getenv('JOB_MAX_COUNT', '10000')) or None
+    )
@@ -1,130 +1,165 @@
-import sqlite3
 import json
+import threading
+from types import MappingProxyType
 from typing import Dict, List, Any
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from modules.database import Database, get_database
+
+class SkillCatalog:
+    """Immutable snapshot of the skills table.
+
+    Holds the rows in display order (category, name), the precomputed
+    category partitions, a name -> row lookup and the TF-IDF vectors built
+    from the same ordering, so one snapshot is always internally consistent.
+    """
+
+    def __init__(self, rows: List[Dict[str, str]], version: int):
+        self.version = version
+        self.skills = tuple(rows)
+        self.by_name = MappingProxyType({skill['name']: skill for skill in self.skills})
+        self.by_lower_name = MappingProxyType({skill['name'].lower(): skill for skill in self.skills})
+        self.technical = tuple(skill for skill in self.skills if skill['category'] == 'Technical')
+        self.soft_skills = tuple(skill for skill in self.skills if skill['category'] == 'Soft Skills')
+        self.positions = MappingProxyType({skill['name']: i for i, skill in enumerate(self.skills)})
 
-class SkillMappingEngine:
-    def __init__(self):
-        self.db_path = 'career_advisor.db'
         self.vectorizer = TfidfVectorizer()
         self.skill_vectors = None
-        self.skill_names = []
+        if self.skills:
+            self.skill_vectors = self.vectorizer.fit_transform(
+                [f"{skill['name']} {skill['description']}" for skill in self.skills]
+            )
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+class SkillMappingEngine:
+    def __init__(self, database: Database = None):
+        self.db = database or get_database()
+        self.catalog = None
+        self._catalog_lock = threading.Lock()
         self._load_skills()
     
-    def _load_skills(self):
-        """Load skills from database and create vector representations"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT name, description FROM skills')
-        skills_data = cursor.fetchall()
-        
-        self.skill_names = [skill[0] for skill in skills_data]
-        skill_descriptions = [f"{skill[0]} {skill[1]}" for skill in skills_data]
-        
-        if skill_descriptions:
-            self.skill_vectors = self.vectorizer.fit_transform(skill_descriptions)
-        
-        conn.close()
+    def _load_skills(self) -> SkillCatalog:
+        """Load skills from database into an immutable catalog snapshot"""
+        rows = [
+            {'name': skill[0], 'category': skill[1], 'description': skill[2]}
+            for skill in self.db.query('SELECT name, category, description FROM skills ORDER BY category, name')
+        ]
+        
+        with self._catalog_lock:
+            version = self.catalog.version + 1 if self.catalog else 1
+            # Swap the whole snapshot at once so readers never see a mix
+            self.catalog = SkillCatalog(rows, version)
+            return self.catalog
+    
+    def reload_catalog(self) -> SkillCatalog:
+        """Refresh the skill catalog snapshot after the skills table changes"""
+        return self._load_skills()
     
     def get_available_skills(self) -> List[Dict[str, str]]:
-        """Get all available skills from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT name, category, description FROM skills ORDER BY category, name')
-        skills = cursor.fetchall()
-        
-        result = []
-        for skill in skills:
-            result.append({
-                'name': skill[0],
-                'category': skill[1],
-                'description': skill[2]
-            })
-        
-        conn.close()
-        return result
+        """Get all available skills from the catalog snapshot"""
+        return list(self.catalog.skills)
     
     def analyze_skills(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze student skills and identify strengths, gaps, and recommendations
         """
+        return self.analyze_skills_batch([student_data])[0]
+    
+    def analyze_skills_batch(self, students: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze many students against one catalog snapshot, vectorizing the similarity step"""
+        catalog = self.catalog
+        similarities = self._skill_similarities(catalog, students)
+        
+        return [
+            self._analyze_student(catalog, student_data, similarities[row] if similarities is not None else None)
+            for row, student_data in enumerate(students)
+        ]
+    
+    def _skill_similarities(self, catalog: SkillCatalog, students: List[Dict[str, Any]]):
+        """Cosine similarity of every student's skills and interests to every catalog skill"""
+        if catalog.skill_vectors is None or not students:
+            return None
+        
+        # Create a combined text for similarity matching
+        combined_texts = [
+            ' '.join(student.get('skills', []) + student.get('interests', []))
+            for student in students
+        ]
+        input_vectors = catalog.vectorizer.transform(combined_texts)
+        return cosine_similarity(input_vectors, catalog.skill_vectors)
+    
+    def _analyze_student(self, catalog: SkillCatalog, student_data: Dict[str, Any],
+                         similarities) -> Dict[str, Any]:
+        """Build the skill analysis for one student from precomputed similarities"""
         student_skills = student_data.get('skills', [])
         interests = student_data.get('interests', [])
-        education = student_data.get('education', '')
-        experience = student_data.get('experience', '')
-        
-        # Get all available skills
-        available_skills = self.get_available_skills()
-        all_skill_names = [skill['name'] for skill in available_skills]
-        
-        # Categorize skills
-        technical_skills = [skill for skill in available_skills if skill['category'] == 'Technical']
-        soft_skills = [skill for skill in available_skills if skill['category'] == 'Soft Skills']
-        
-        # Find skill matches and gaps
-        matched_skills = []
-        skill_gaps = []
         
-        for skill in available_skills:
-            skill_name = skill['name']
-            if skill_name in student_skills:
-                matched_skills.append(skill)
-            else:
-                skill_gaps.append(skill)
+        # Find skill matches (in catalog order) and gaps
+        matched_positions = sorted(
+            catalog.positions[name] for name in set(student_skills) if name in catalog.positions
+        )
+        matched_skills = [catalog.skills[i] for i in matched_positions]
+        matched_names = {skill['name'] for skill in matched_skills}
+        skill_gaps = self._top_skill_gaps(catalog, matched_names, 10)
         
         # Calculate skill strength score
-        skill_strength = len(matched_skills) / len(available_skills) * 100
+        skill_strength = len(matched_skills) / len(catalog) * 100 if len(catalog) else 0
         
         # Find similar skills based on interests
-        recommended_skills = self._recommend_skills(student_skills, interests, available_skills)
+        recommended_skills = self._recommend_skills(student_skills, interests, catalog, similarities)
         
         # Analyze skill distribution
-        technical_matches = [s for s in matched_skills if s['category'] == 'Technical']
-        soft_matches = [s for s in matched_skills if s['category'] == 'Soft Skills']
+        technical_count = len([s for s in matched_skills if s['category'] == 'Technical'])
+        soft_count = len([s for s in matched_skills if s['category'] == 'Soft Skills'])
         
         return {
             'matched_skills': matched_skills,
-            'skill_gaps': skill_gaps[:10],  # Top 10 gaps
+            'skill_gaps': skill_gaps,  # Top 10 gaps
             'skill_strength_score': round(skill_strength, 2),
-            'technical_skills_count': len(technical_matches),
-            'soft_skills_count': len(soft_matches),
+            'technical_skills_count': technical_count,
+            'soft_skills_count': soft_count,
             'recommended_skills': recommended_skills,
             'skill_distribution': {
-                'technical': len(technical_matches),
-                'soft_skills': len(soft_matches),
-                'total_available': len(available_skills)
+                'technical': technical_count,
+                'soft_skills': soft_count,
+                'total_available': len(catalog)
             },
             'strengths': self._identify_strengths(matched_skills),
-            'improvement_areas': self._identify_improvement_areas(skill_gaps, interests)
+            'improvement_areas': self._identify_improvement_areas(
+                catalog, matched_names, technical_count, interests
+            )
         }
     
+    def _top_skill_gaps(self, catalog: SkillCatalog, matched_names: set, limit: int) -> List[Dict]:
+        """Return the first catalog skills the student does not have"""
+        gaps = []
+        for skill in catalog.skills:
+            if skill['name'] not in matched_names:
+                gaps.append(skill)
+                if len(gaps) >= limit:
+                    break
+        return gaps
+    
     def _recommend_skills(self, current_skills: List[str], interests: List[str], 
-                         available_skills: List[Dict]) -> List[Dict]:
+                         catalog: SkillCatalog, similarities=None) -> List[Dict]:
         """Recommend skills based on current skills and interests"""
         if not current_skills and not interests:
-            return available_skills[:5]  # Return top 5 if no input
+            return list(catalog.skills[:5])  # Return top 5 if no input
         
         # Create a combined text for similarity matching
         combined_text = ' '.join(current_skills + interests)
         
-        if not self.skill_vectors is None and combined_text.strip():
-            # Vectorize the combined input
-            input_vector = self.vectorizer.transform([combined_text])
-            
-            # Calculate similarities
-            similarities = cosine_similarity(input_vector, self.skill_vectors)[0]
-            
+        if similarities is not None and combined_text.strip():
             # Get top similar skills
             skill_indices = np.argsort(similarities)[::-1]
             recommended = []
             
             for idx in skill_indices:
                 if similarities[idx] > 0.1:  # Threshold for relevance
-                    skill = available_skills[idx]
+                    skill = catalog.skills[idx]
                     if skill['name'] not in current_skills:
                         recommended.append({
                             'skill': skill,
@@ -135,7 +170,7 @@ class SkillMappingEngine:
             
             return recommended
         
-        return available_skills[:5]
+        return list(catalog.skills[:5])
     
     def _identify_strengths(self, matched_skills: List[Dict]) -> List[str]:
         """Identify key strengths from matched skills"""
@@ -163,9 +198,10 @@ class SkillMappingEngine:
         
         return strengths if strengths else ["Building skill foundation"]
     
-    def _identify_improvement_areas(self, skill_gaps: List[Dict], interests: List[str]) -> List[str]:
+    def _identify_improvement_areas(self, catalog: SkillCatalog, matched_names: set,
+                                    technical_count: int, interests: List[str]) -> List[str]:
         """Identify key areas for improvement"""
-        if not skill_gaps:
+        if len(matched_names) == len(catalog):
             return ["All core skills covered"]
         
         # Prioritize based on interests
@@ -173,21 +209,21 @@ class SkillMappingEngine:
         
         # Check for critical missing skills
         critical_skills = ['Communication', 'Problem Solving', 'Critical Thinking']
-        missing_critical = [skill for skill in skill_gaps if skill['name'] in critical_skills]
+        missing_critical = [name for name in critical_skills
+                            if name in catalog.by_name and name not in matched_names]
         
         if missing_critical:
             improvement_areas.append("Essential soft skills development")
         
         # Check for technical gaps
-        technical_gaps = [skill for skill in skill_gaps if skill['category'] == 'Technical']
-        if technical_gaps:
+        has_technical_gaps = len(catalog.technical) > technical_count
+        if has_technical_gaps:
             improvement_areas.append("Technical skill expansion")
         
         # Interest-based recommendations
-        if 'Technology' in interests or 'Programming' in interests:
-            tech_skills = [s for s in skill_gaps if s['category'] == 'Technical']
-            if tech_skills:
+        interest_names = {interest.lower() for interest in interests}
+        if 'technology' in interest_names or 'programming' in interest_names:
+            if has_technical_gaps:
                 improvement_areas.append("Programming and technical skills")
         
         return improvement_areas if improvement_areas else ["General skill development"]
-
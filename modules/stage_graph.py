@@ -0,0 +1,79 @@
+import time
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Callable, Optional
+
+
+class StageGraph:
+    """Small dependency-graph executor for pipeline stages.
+
+    Each stage is a callable that receives the results of the stages it
+    depends on as keyword arguments. Stages whose dependencies are satisfied
+    run concurrently on the supplied executor; one ready stage per round runs
+    on the calling thread so a saturated pool can never deadlock the caller.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def add_stage(self, name: str, func: Callable[..., Any],
+                  depends_on: Optional[List[str]] = None) -> 'StageGraph':
+        """Register a stage; dependencies must already be registered"""
+        if name in self.stages:
+            raise ValueError(f'Stage already registered: {name}')
+
+        depends_on = list(depends_on or [])
+        for dependency in depends_on:
+            if dependency not in self.stages:
+                raise ValueError(f'Unknown dependency for stage {name}: {dependency}')
+
+        self.stages[name] = {'func': func, 'depends_on': depends_on}
+        return self
+
+    def run(self, executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """Run all stages and return their results and per-stage wall times (ms)"""
+        results = {}
+        timings = {}
+        pending = {}
+        remaining = list(self.stages.keys())
+        started = time.perf_counter()
+
+        try:
+            while remaining or pending:
+                ready = [name for name in remaining
+                         if all(dep in results for dep in self.stages[name]['depends_on'])]
+                for name in ready:
+                    remaining.remove(name)
+
+                if ready:
+                    # Hand all but one ready stage to the pool, run the last inline
+                    if executor is not None:
+                        for name in ready[:-1]:
+                            pending[executor.submit(self._run_stage, name, results)] = name
+                        ready = ready[-1:]
+                    for name in ready:
+                        results[name], timings[name] = self._run_stage(name, results)
+
+                if pending:
+                    done, _ = wait(list(pending), timeout=0 if remaining and ready else None,
+                                   return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = pending.pop(future)
+                        results[name], timings[name] = future.result()
+                elif remaining and not ready:
+                    raise RuntimeError(f'Unsatisfiable stage dependencies: {remaining}')
+        except Exception:
+            for future in pending:
+                future.cancel()
+            raise
+
+        timings['total'] = round((time.perf_counter() - started) * 1000, 2)
+        return {'results': results, 'timings': timings}
+
+    def _run_stage(self, name: str, results: Dict[str, Any]):
+        """Run a single stage with its dependency results and time it"""
+        stage = self.stages[name]
+        kwargs = {dep: results[dep] for dep in stage['depends_on']}
+
+        started = time.perf_counter()
+        result = stage['func'](**kwargs)
+        return result, round((time.perf_counter() - started) * 1000, 2)
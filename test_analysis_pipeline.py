@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test script for the /api/analyze stage graph and analysis pipeline
+"""
+
+import sys
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.stage_graph import StageGraph
+from modules.analysis_pipeline import AnalysisPipeline
+from modules.skill_mapping import SkillMappingEngine
+from modules.job_market_analysis import JobMarketAnalyzer
+from modules.career_recommender import CareerRecommender
+from modules.learning_planner import LearningPlanGenerator
+from modules.resume_prep import ResumePreparation
+from modules.response_cache import ResponseCache
+
+def test_stage_graph_runs_independent_stages_concurrently():
+    print("🔀 Testing stage graph concurrency...")
+
+    barrier = threading.Barrier(2, timeout=5)
+
+    def branch(base):
+        # Both branches must be running at the same time to pass the barrier
+        barrier.wait()
+        return base + 1
+
+    graph = StageGraph()
+    graph.add_stage('base', lambda: 1)
+    graph.add_stage('left', branch, depends_on=['base'])
+    graph.add_stage('right', branch, depends_on=['base'])
+    graph.add_stage('join', lambda left, right: left + right, depends_on=['left', 'right'])
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        run = graph.run(executor)
+
+    assert run['results']['join'] == 4
+    assert set(run['timings']) == {'base', 'left', 'right', 'join', 'total'}
+    print(f"✅ Stage graph completed in {run['timings']['total']} ms")
+
+def test_stage_graph_rejects_unknown_dependency():
+    graph = StageGraph()
+    try:
+        graph.add_stage('orphan', lambda missing: missing, depends_on=['missing'])
+    except ValueError:
+        print("✅ Unknown dependency rejected")
+        return
+    raise AssertionError('Expected ValueError for unknown dependency')
+
+def test_stage_graph_propagates_errors():
+    def fail():
+        time.sleep(0.01)
+        raise RuntimeError('stage failed')
+
+    graph = StageGraph()
+    graph.add_stage('ok', lambda: 1)
+    graph.add_stage('broken', fail)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        try:
+            graph.run(executor)
+        except RuntimeError as e:
+            assert 'stage failed' in str(e)
+            print("✅ Stage errors propagate to the caller")
+            return
+    raise AssertionError('Expected stage error to propagate')
+
+def test_analysis_pipeline():
+    print("🧠 Testing analysis pipeline...")
+
+    student_data = {
+        'skills': ['Python Programming', 'Data Analysis', 'Communication'],
+        'interests': ['Technology', 'Business'],
+        'education': "Bachelor's Degree",
+        'experience': '1-2 years',
+        'goals': 'Want to become a data scientist'
+    }
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        pipeline = AnalysisPipeline(
+            SkillMappingEngine(), JobMarketAnalyzer(), CareerRecommender(),
+            LearningPlanGenerator(), ResumePreparation(), executor=executor
+        )
+        run = pipeline.analyze(student_data)
+
+    analysis = run['analysis']
+    assert set(analysis) == {
+        'skill_analysis', 'market_analysis', 'career_recommendations',
+        'learning_plan', 'resume_guidance'
+    }
+    assert analysis['career_recommendations']['top_careers']
+    assert 'course_recommendations' in analysis['learning_plan']
+
+    header = AnalysisPipeline.format_server_timing(run['timings'])
+    assert 'learning_plan;dur=' in header and 'total;dur=' in header
+    print(f"✅ Pipeline completed: {header}")
+
+def test_response_cache_lru_ttl_and_versions():
+    print("🗃️ Testing response cache...")
+
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    for key in ('a', 'b', 'c'):
+        assert cache.get(key, version=1) is None
+        cache.set(key, key.upper(), version=1)
+    assert cache.get('a', version=1) is None  # least recently used was evicted
+    assert cache.get('c', version=1) == 'C'
+    assert cache.evictions == 1
+
+    # A new data version drops everything, and results computed against the
+    # old version are not stored
+    assert cache.get('c', version=2) is None
+    cache.set('c', 'stale', version=1)
+    assert cache.get('c', version=2) is None
+
+    expiring = ResponseCache(ttl_seconds=0.01)
+    expiring.get('k')
+    expiring.set('k', 'value')
+    time.sleep(0.02)
+    assert expiring.get('k') is None
+
+    assert ResponseCache.make_key({'b': 1, 'a': [1, 2]}) == ResponseCache.make_key({'a': [1, 2], 'b': 1})
+    print(f"✅ Cache stats: {cache.stats()}")
+
+def test_analysis_pipeline_cache():
+    print("💾 Testing cached analysis pipeline...")
+
+    skill_mapper = SkillMappingEngine()
+    career_recommender = CareerRecommender()
+    pipeline = AnalysisPipeline(
+        skill_mapper, JobMarketAnalyzer(career_recommender.market_scores), career_recommender,
+        LearningPlanGenerator(), ResumePreparation(), cache=ResponseCache()
+    )
+
+    first = pipeline.analyze({
+        'skills': ['Python Programming', 'Communication', 'Data Analysis'],
+        'interests': ['Technology', 'Business']
+    })
+    second = pipeline.analyze({
+        'skills': ['data analysis', 'Python Programming', 'communication', 'Communication'],
+        'interests': ['business', 'TECHNOLOGY']
+    })
+    assert not first['cached'] and second['cached']
+    assert second['analysis'] is first['analysis']
+    assert [s['name'] for s in first['analysis']['skill_analysis']['matched_skills']]
+
+    # Reloading market data invalidates cached results
+    pipeline.job_analyzer.refresh_market_data()
+    third = pipeline.analyze({'skills': ['Python Programming', 'Communication', 'Data Analysis'],
+                              'interests': ['Technology', 'Business']})
+    assert not third['cached']
+    assert third['analysis']['career_recommendations'] == first['analysis']['career_recommendations']
+
+    stats = pipeline.cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['invalidations'] == 1
+    print(f"✅ Cache hit rate {stats['hit_rate']}")
+
+def test_analyze_batch_matches_single_analysis():
+    print("👥 Testing cohort batch analysis...")
+
+    skill_mapper = SkillMappingEngine()
+    career_recommender = CareerRecommender()
+    pipeline = AnalysisPipeline(
+        skill_mapper, JobMarketAnalyzer(career_recommender.market_scores), career_recommender,
+        LearningPlanGenerator(), ResumePreparation(), cache=ResponseCache()
+    )
+    cohort = [
+        {'skills': ['Python Programming', 'Data Analysis'], 'interests': ['Technology']},
+        {'skills': ['SQL', 'Leadership', 'Excel'], 'interests': ['Finance', 'Business'], 'experience': '1-2 years'},
+        {'skills': [], 'interests': []},
+        {'skills': ['data analysis', 'python programming'], 'interests': ['technology']},
+        {'skills': ['Communication'], 'interests': ['Healthcare'], 'education': "Bachelor's Degree"},
+        {'skills': ['SQL', 'Leadership', 'Rust'], 'interests': ['Business', 'Finance']},
+    ]
+    pipeline.analyze(cohort[4])  # served from the cache in the batch
+
+    results = list(pipeline.analyze_batch(cohort, chunk_size=2))
+    assert sorted(result['index'] for result in results) == list(range(len(cohort)))
+    assert results[0]['index'] == 4 and results[0]['cached']
+
+    single = AnalysisPipeline(
+        skill_mapper, pipeline.job_analyzer, career_recommender,
+        pipeline.learning_planner, pipeline.resume_prep
+    )
+    for result in results:
+        # The uncached path normalizes too, so raw profiles give the batch results
+        expected = single.analyze(cohort[result['index']])['analysis']
+        assert result['analysis'] == expected
+    matched = single.analyze(cohort[3])['analysis']['skill_analysis']['matched_skills']
+    assert sorted(skill['name'] for skill in matched) == ['Data Analysis', 'Python Programming']
+
+    by_index = {result['index']: result for result in results}
+    assert by_index[0]['analysis'] is by_index[3]['analysis']  # duplicate profile computed once
+    assert by_index[1]['analysis']['career_recommendations'] is by_index[5]['analysis']['career_recommendations']
+    print(f"✅ {len(results)} batch results match single analyses")
+
+if __name__ == "__main__":
+    test_stage_graph_runs_independent_stages_concurrently()
+    test_stage_graph_rejects_unknown_dependency()
+    test_stage_graph_propagates_errors()
+    test_analysis_pipeline()
+    test_response_cache_lru_ttl_and_versions()
+    test_analysis_pipeline_cache()
+    test_analyze_batch_matches_single_analysis()
+    print("🎉 Analysis pipeline tests passed!")
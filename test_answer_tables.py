@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the normalized interview answer and assessment response tables
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.database import Database
+from modules.session_store import MemorySessionStore
+from modules.answer_tables import backfill_interview_answers
+from modules.ai_skill_assessment import AISkillAssessment
+from modules.ai_interview_prep import AIInterviewPreparation
+
+ANSWER = 'I would use a hash map for constant time lookups and explain the memory trade-off.'
+
+def _database(directory):
+    db = Database(os.path.join(directory, 'answers.db'))
+    db.migrate()
+    return db
+
+def test_completed_interview_is_stored_per_question():
+    print("🗂️ Testing normalized interview answers...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = _database(directory)
+        try:
+            interview = AIInterviewPreparation(MemorySessionStore(), db)
+            started = interview.start_mock_interview('u1', 'technical', 'intermediate')
+            for _ in range(started['total_questions']):
+                result = interview.submit_answer('u1', ANSWER)
+            assert result['status'] == 'completed'
+
+            session_data = json.loads(db.query('SELECT session_data FROM interview_results')[0][0])
+            assert 'questions' not in session_data and 'feedback' not in session_data
+            assert session_data['question_ids'] == [q['id'] for q in started['questions']]
+
+            report = interview.get_interview_report('u1', result['interview_id'])
+            assert [a['question_id'] for a in report['answers']] == session_data['question_ids']
+            assert report['answers'][0]['answer'] == ANSWER
+            assert report['answers'][0]['overall_score'] is not None
+
+            question_id = session_data['question_ids'][0]
+            stats = interview.get_question_stats(question_id)
+            assert stats['times_answered'] == 1
+            assert stats['average_score'] == report['answers'][0]['overall_score']
+
+            plan = ' '.join(row[-1] for row in db.query(
+                'EXPLAIN QUERY PLAN SELECT AVG(overall_score) FROM interview_answers WHERE question_id = ?',
+                (question_id,)
+            ))
+            assert 'idx_interview_answers_question' in plan, plan
+        finally:
+            db.close()
+    print(f"✅ {len(report['answers'])} answers stored as rows")
+
+def test_backfill_migrates_legacy_session_blobs():
+    print("🚚 Testing answer backfill...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = _database(directory)
+        try:
+            questions = [
+                {'id': 'py_002', 'question': 'What is the difference between == and is?', 'category': 'Operators',
+                 'difficulty': 'intermediate', 'sample_answer': 'A long sample answer ' * 20},
+                {'id': 'js_002', 'question': 'Explain closures.', 'category': 'Functions',
+                 'difficulty': 'intermediate', 'sample_answer': 'Another sample answer ' * 20}
+            ]
+            legacy = {
+                'user_id': 'u1', 'interview_type': 'technical', 'difficulty': 'intermediate',
+                'questions': questions, 'current_question': 2, 'session_id': 'interview_u1_1',
+                'answers': {q['id']: {'answer': ANSWER, 'timestamp': '2024-01-01T00:00:00'} for q in questions},
+                'feedback': {q['id']: {'overall_score': 60.0 + i, 'strengths': ['Clear'],
+                                       'sample_answer': q['sample_answer'],
+                                       'keyword_analysis': {'keyword_coverage': 50.0}}
+                             for i, q in enumerate(questions)}
+            }
+            with db.transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO interview_results (user_id, interview_id, interview_type, difficulty,
+                                                   overall_score, session_data, final_report)
+                    VALUES ('u1', 'interview_u1_1', 'technical', 'intermediate', 60.5, ?, '{}')
+                ''', (json.dumps(legacy),))
+
+            result = backfill_interview_answers(db.connection(), batch_size=1)
+            assert result == {'results_migrated': 1, 'answers_written': 2}
+            # Re-running is a no-op
+            assert backfill_interview_answers(db.connection())['results_migrated'] == 0
+
+            slim = db.query('SELECT session_data FROM interview_results')[0][0]
+            assert len(slim) < len(json.dumps(legacy)) / 5
+            rows = db.query('SELECT question_id, overall_score, keyword_coverage, feedback FROM interview_answers ORDER BY position')
+            assert [row[:3] for row in rows] == [('py_002', 60.0, 50.0), ('js_002', 61.0, 50.0)]
+            assert 'sample_answer' not in rows[0][3]
+        finally:
+            db.close()
+    print(f"✅ Legacy blob shrank from {len(json.dumps(legacy))} to {len(slim)} bytes")
+
+def test_assessment_responses_are_scored():
+    with tempfile.TemporaryDirectory() as directory:
+        db = _database(directory)
+        try:
+            assessment = AISkillAssessment(MemorySessionStore(), db)
+            session = {'assessment_id': 'a1', 'start_time': '', 'end_time': '',
+                       'responses': {'tech_001': 3, 'tech_002': 4}}
+            assessment._save_assessment_results('u1', session, {'Python Programming': 70.0}, {})
+
+            rows = dict((row[0], row[1:]) for row in db.query(
+                'SELECT question_id, phase, answer, score FROM assessment_responses'
+            ))
+            # tech_001 maps answer 3 to 3 points for three skills; tech_002 maps 4 to 4 + 4
+            assert rows['tech_001'] == ('technical_skills', '3', 9)
+            assert rows['tech_002'] == ('technical_skills', '4', 8)
+        finally:
+            db.close()
+
+if __name__ == "__main__":
+    test_completed_interview_is_stored_per_question()
+    test_backfill_migrates_legacy_session_blobs()
+    test_assessment_responses_are_scored()
+    print("🎉 Answer table tests passed!")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Test script for vectorized career scoring in the Career Recommender
+"""
+
+import sys
+import os
+import threading
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.career_recommender import CareerRecommender
+from modules.market_scores import MarketScoreTable
+
+STUDENTS = [
+    (['Python Programming', 'Data Analysis', 'Communication'], ['Technology', 'Business']),
+    ([], []),
+    (['SQL', 'Leadership', 'Unknown Skill'], ['finance']),
+]
+
+def test_batch_scores_match_single_scores():
+    print("🧮 Testing batch career scoring...")
+
+    recommender = CareerRecommender()
+    batch = recommender.score_students([s for s, _ in STUDENTS], [i for _, i in STUDENTS])
+
+    assert batch['score'].shape == (len(STUDENTS), len(recommender.career_titles))
+
+    for row, (skills, interests) in enumerate(STUDENTS):
+        single = recommender._calculate_career_scores(skills, interests)
+        for col, title in enumerate(recommender.career_titles):
+            assert single[title]['skill_score'] == round(float(batch['skill_score'][row, col]), 2)
+            assert single[title]['interest_score'] == round(float(batch['interest_score'][row, col]), 2)
+            assert single[title]['skill_matches'] == batch['skill_matches'][row, col]
+
+    print(f"✅ Scored {len(STUDENTS)} students against {len(recommender.career_titles)} careers")
+
+def test_skill_score_counts_required_skills():
+    recommender = CareerRecommender()
+    title = 'Data Scientist'
+    required = recommender.career_database[title]['required_skills']
+
+    scores = recommender._calculate_career_scores(required[:2], [])
+    assert scores[title]['skill_matches'] == 2
+    assert scores[title]['skill_score'] == round(2 / len(required) * 100, 2)
+    assert scores[title]['missing_skills'] == required[2:]
+    assert np.all(recommender.catalog.required_counts > 0)
+    print("✅ Skill match counts and missing skills are consistent")
+
+def _synthetic_recommender(n_careers=2000, seed=11):
+    """Recommender with a large random catalog for pruning checks"""
+    recommender = CareerRecommender()
+    rng = np.random.default_rng(seed)
+    skills = [f'Skill {i}' for i in range(300)]
+    industries = ['Technology', 'Healthcare', 'Finance', 'Education', 'Manufacturing', 'Retail']
+
+    careers = {
+        f'Career {i}': {
+            'title': f'Career {i}',
+            'industry': industries[rng.integers(len(industries))],
+            'required_skills': list(rng.choice(skills, size=rng.integers(1, 6), replace=False)),
+            'salary_range': '',
+            'growth_rate': float(rng.integers(0, 25)),
+            'description': ''
+        }
+        for i in range(n_careers)
+    }
+    recommender._publish_catalog(careers, recommender.catalog.version + 1)
+    return recommender, skills
+
+def test_top_k_selection_matches_full_sort():
+    print("🏆 Testing top-k career selection...")
+
+    recommender, _ = _synthetic_recommender(500)
+    rng = np.random.default_rng(7)
+    careers = np.arange(len(recommender.career_titles))
+    # Coarse scores so that ties at the k-th position are common
+    scores = rng.integers(0, 20, size=len(careers)) * 5.0
+    profile = {
+        'careers': careers,
+        'interest_base': 0.0,
+        'market_state': recommender.market_state,
+        'score': scores,
+        'skill_score': scores,
+        'interest_score': np.zeros(len(careers)),
+        'market_score': np.zeros(len(careers)),
+        'skill_matches': np.zeros(len(careers), dtype=int)
+    }
+
+    top_careers, stats = recommender._select_top_careers(profile, 5, set())
+    expected = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:5]
+
+    assert [title for title, _ in top_careers] == [recommender.career_titles[i] for i in expected]
+    assert stats['max'] == scores.max()
+    assert stats['above_70'] == int((scores > 70).sum())
+    assert round(stats['total'] / stats['count'], 2) == round(scores.mean(), 2)
+    print("✅ Top-k selection matches a stable full sort")
+
+def test_pruned_recommendations_match_exhaustive_scoring():
+    print("🗂️ Testing inverted-index candidate pruning...")
+
+    recommender, skills = _synthetic_recommender()
+    profiles = [
+        (['Skill 1', 'Skill 2', 'Skill 3'], ['Technology']),
+        (['Skill 42'], []),
+        ([], ['healthcare', 'Research']),
+        ([], []),
+        (['Skill 7'], ['Sports']),
+    ]
+
+    for skill_names, interests in profiles:
+        profile = recommender._score_profile(skill_names, interests)
+        top_careers, stats = recommender._select_top_careers(profile, 5, set(skill_names))
+
+        exhaustive = recommender._calculate_career_scores(skill_names, interests)
+        expected = sorted(exhaustive.items(), key=lambda x: x[1]['score'], reverse=True)[:5]
+        all_scores = [data['score'] for data in exhaustive.values()]
+
+        assert top_careers == expected
+        assert len(profile['careers']) < len(recommender.career_titles)
+        assert stats['max'] == max(all_scores)
+        assert stats['above_70'] == len([s for s in all_scores if s > 70])
+        assert round(stats['total'] / stats['count'], 2) == round(sum(all_scores) / len(all_scores), 2)
+
+    print(f"✅ Pruned scoring matches exhaustive scoring over {len(recommender.career_titles)} careers")
+
+def test_batch_profiles_match_single_profiles():
+    recommender, skills = _synthetic_recommender(800)
+    rng = np.random.default_rng(5)
+    interest_options = [[], ['Technology'], ['healthcare', 'Research'], ['Sports']]
+    cohort = [
+        (list(rng.choice(skills, size=rng.integers(0, 6), replace=False)),
+         interest_options[rng.integers(len(interest_options))])
+        for _ in range(40)
+    ]
+
+    profiles = recommender._score_profiles([s for s, _ in cohort], [i for _, i in cohort])
+    for (skill_names, interests), batch_profile in zip(cohort, profiles):
+        profile = recommender._score_profile(skill_names, interests)
+        assert np.array_equal(profile['careers'], batch_profile['careers'])
+        for name in ('score', 'skill_score', 'interest_score', 'market_score', 'skill_matches'):
+            assert np.array_equal(profile[name], batch_profile[name])
+    print(f"✅ Batch scoring matches single scoring for {len(cohort)} students")
+
+def test_market_scores_are_deterministic():
+    print("📈 Testing precomputed market scores...")
+
+    recommender = CareerRecommender()
+    skills, interests = STUDENTS[0]
+    skill_analysis = {'matched_skills': [{'name': name} for name in skills]}
+    student_data = {'skills': skills, 'interests': interests}
+    first = recommender.get_recommendations(skill_analysis, {}, student_data)
+    second = recommender.get_recommendations(skill_analysis, {}, student_data)
+    assert first == second
+
+    version = recommender.market_scores.version
+    recommender.market_scores.load_careers(recommender.career_database)
+    assert recommender.market_state['version'] == version + 1
+
+    seeded = [MarketScoreTable(noise_seed='demo'), MarketScoreTable(noise_seed='demo')]
+    for table in seeded:
+        table.load_careers(recommender.career_database)
+    assert seeded[0].career_scores == seeded[1].career_scores
+    assert all(0 <= score <= 100 for score in seeded[0].career_scores.values())
+    print(f"✅ Market scores stable at version {recommender.market_scores.version}")
+
+def test_reload_publishes_a_consistent_catalog():
+    print("🔄 Testing atomic career catalog reloads...")
+
+    recommender = CareerRecommender()
+    before = recommender.market_state
+    load = recommender._load_career_data
+    seen = []
+
+    def load_while_serving():
+        # Requests arriving mid-reload still see the full previous catalog
+        seen.append((len(recommender.career_titles), len(recommender.market_state['scores'])))
+        return load()
+
+    recommender._load_career_data = load_while_serving
+    version = recommender.reload_careers()
+    assert seen == [(len(before['catalog']), len(before['scores']))] and seen[0][0] > 0
+    assert recommender.catalog_version == version == before['catalog'].version + 1
+    assert len(recommender.market_state['scores']) == len(recommender.career_titles)
+
+    skills, interests = STUDENTS[0]
+    skill_analysis = {'matched_skills': [{'name': name} for name in skills]}
+    student_data = {'skills': skills, 'interests': interests}
+    expected = recommender.get_recommendations(skill_analysis, {}, student_data)
+    errors, stop = [], threading.Event()
+
+    def serve():
+        while not stop.is_set():
+            try:
+                assert recommender.get_recommendations(skill_analysis, {}, student_data)['top_careers'] == expected['top_careers']
+            except Exception as e:
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=serve) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for _ in range(20):
+        recommender.reload_careers()
+    stop.set()
+    for reader in readers:
+        reader.join()
+    assert not errors, errors
+    print(f"✅ Catalog reloaded to version {recommender.catalog_version} under concurrent requests")
+
+if __name__ == "__main__":
+    test_batch_scores_match_single_scores()
+    test_skill_score_counts_required_skills()
+    test_top_k_selection_matches_full_sort()
+    test_pruned_recommendations_match_exhaustive_scoring()
+    test_batch_profiles_match_single_profiles()
+    test_market_scores_are_deterministic()
+    test_reload_publishes_a_consistent_catalog()
+    print("🎉 Career scoring tests passed!")
@@ -139,11 +139,20 @@ def test_resume_generation():
         
         response = requests.post("http://localhost:5000/api/generate-resume", 
                                json=sample_resume_data, timeout=20)
-        if response.status_code == 200:
+        if response.status_code == 202:
             data = response.json()
             if data.get('success'):
+                # The PDF is rendered in the background; poll the job for the download URL
+                for _ in range(40):
+                    job = requests.get(f"http://localhost:5000{data['status_url']}", timeout=5).json()
+                    if job.get('status') != 'pending':
+                        break
+                    time.sleep(0.5)
+                if job.get('status') != 'complete':
+                    print(f"❌ Resume PDF rendering failed: {job.get('error', job.get('status'))}")
+                    return False
                 print("✅ Resume generation completed successfully")
-                print(f"   - Download URL: {data.get('download_url', 'N/A')}")
+                print(f"   - Download URL: {job.get('download_url', 'N/A')}")
                 return True
             else:
                 print(f"❌ Resume generation failed: {data.get('error')}")
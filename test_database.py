@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared SQLite access layer
+"""
+
+import sys
+import os
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import database as database_module
+from modules.database import Database, get_database, get_db_path
+from modules.migrations import SCHEMA_VERSION, get_schema_version
+
+def test_connections_are_pooled_per_thread():
+    print("🔌 Testing pooled connections...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, 'pool.db'), mmap_size=1 << 20)
+        try:
+            conn = db.connection()
+            assert db.connection() is conn
+
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+            assert conn.execute('PRAGMA mmap_size').fetchone()[0] == 1 << 20
+
+            others = []
+            thread = threading.Thread(target=lambda: others.append(db.connection()))
+            thread.start()
+            thread.join()
+            assert others[0] is not conn
+
+            with db.transaction() as cursor:
+                cursor.execute('CREATE TABLE items (name TEXT)')
+                cursor.execute('INSERT INTO items VALUES (?)', ('one',))
+            assert db.query('SELECT name FROM items') == [('one',)]
+
+            # Errors roll the transaction back
+            try:
+                with db.transaction() as cursor:
+                    cursor.execute('INSERT INTO items VALUES (?)', ('two',))
+                    raise RuntimeError('boom')
+            except RuntimeError:
+                pass
+            assert db.query('SELECT COUNT(*) FROM items') == [(1,)]
+        finally:
+            db.close()
+    print("✅ One tuned connection per thread")
+
+def test_exited_threads_return_their_connections():
+    print("♻️ Testing connection reuse across short-lived threads...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, 'churn.db'), pool_size=4)
+        try:
+            def request():
+                db.query('SELECT 1')
+
+            for _ in range(200):
+                thread = threading.Thread(target=request)
+                thread.start()
+                thread.join()
+            assert db.pool.stats() == {'leased': 0, 'idle': 1, 'size': 4}
+
+            # Concurrent holders beyond the pool size are closed when they let go
+            ready, done = threading.Barrier(9), threading.Event()
+
+            def hold():
+                db.connection()
+                ready.wait()
+                done.wait()
+                db.release()
+
+            threads = [threading.Thread(target=hold) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            ready.wait()
+            assert db.pool.stats()['leased'] == 8
+            done.set()
+            for thread in threads:
+                thread.join()
+            assert db.pool.stats() == {'leased': 0, 'idle': 4, 'size': 4}
+
+            # A released connection comes back without a half-finished transaction
+            conn = db.connection()
+            conn.execute('CREATE TABLE items (name TEXT)')
+            conn.execute('BEGIN')
+            conn.execute("INSERT INTO items VALUES ('left open')")
+            db.release()
+            assert db.query('SELECT COUNT(*) FROM items') == [(0,)]
+        finally:
+            db.close()
+    print("✅ 200 threads, at most 4 connections kept")
+
+def test_database_path_from_environment():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'env.db')
+        previous = os.environ.get('CAREER_ADVISOR_DB')
+        os.environ['CAREER_ADVISOR_DB'] = path
+        try:
+            assert get_db_path() == path
+            db = get_database()
+            assert db.path == path and get_database() is db
+            db.close()
+        finally:
+            database_module._databases.pop(path, None)
+            if previous is None:
+                del os.environ['CAREER_ADVISOR_DB']
+            else:
+                os.environ['CAREER_ADVISOR_DB'] = previous
+
+def test_migrations_create_indexed_history_tables():
+    print("🧱 Testing schema migrations...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, 'legacy.db'))
+        try:
+            # A database created before migrations existed, with some history
+            with db.transaction() as cursor:
+                cursor.execute('CREATE TABLE assessment_results (id INTEGER PRIMARY KEY, user_id TEXT, '
+                               'assessment_id TEXT, start_time TEXT, end_time TEXT, final_scores TEXT, '
+                               'assessment_report TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)')
+                cursor.execute("INSERT INTO assessment_results (user_id, assessment_id) VALUES ('u1', 'a1')")
+
+            assert db.migrate() == SCHEMA_VERSION
+            assert db.migrate() == SCHEMA_VERSION
+            assert get_schema_version(db.connection()) == SCHEMA_VERSION
+            assert db.query('SELECT COUNT(*) FROM schema_version') == [(SCHEMA_VERSION,)]
+            assert db.query('SELECT assessment_id FROM assessment_results') == [('a1',)]
+
+            for table in ('assessment_results', 'interview_results'):
+                plan = ' '.join(row[-1] for row in db.query(
+                    f'EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE user_id = ? '
+                    'ORDER BY created_at DESC, id DESC', ('u1',)
+                ))
+                assert 'USING INDEX' in plan and 'TEMP B-TREE' not in plan, plan
+        finally:
+            db.close()
+    print(f"✅ Schema at version {SCHEMA_VERSION}, history lookups use the user/recency index")
+
+if __name__ == "__main__":
+    test_connections_are_pooled_per_thread()
+    test_exited_threads_return_their_connections()
+    test_database_path_from_environment()
+    test_migrations_create_indexed_history_tables()
+    print("🎉 Database tests passed!")
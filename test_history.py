@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for paginated assessment and interview history
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.database import Database
+from modules.insight_stats import rebuild_stats, load_interview_stats, load_skill_stats
+from modules.ai_skill_assessment import AISkillAssessment
+from modules.ai_interview_prep import AIInterviewPreparation
+
+def _database(directory):
+    db = Database(os.path.join(directory, 'history.db'))
+    db.migrate()
+    return db
+
+def _add_interviews(db, user_id, count):
+    with db.transaction() as cursor:
+        for i in range(count):
+            # Pairs of rows share a timestamp, so ordering relies on the id tie-breaker
+            cursor.execute('''
+                INSERT INTO interview_results
+                (user_id, interview_id, interview_type, difficulty, start_time, end_time,
+                 overall_score, session_data, final_report, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, f'interview_{i}', 'technical' if i % 2 else 'behavioral', 'intermediate',
+                  '', '', 50 + i, json.dumps({'answers': {}}), json.dumps({'summary': i}),
+                  f'2024-01-01 00:00:{i // 2:02d}'))
+
+def test_history_pages_follow_cursor():
+    print("📄 Testing cursor pagination...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = _database(directory)
+        try:
+            _add_interviews(db, 'power_user', 7)
+            _add_interviews(db, 'other_user', 2)
+            interview = AIInterviewPreparation(database=db)
+
+            full = interview.get_interview_history('power_user')
+            assert [row['interview_id'] for row in full] == [f'interview_{i}' for i in range(6, -1, -1)]
+
+            seen, cursor, pages = [], None, 0
+            while True:
+                page = interview.get_interview_history_page('power_user', limit=3, before=cursor)
+                seen.extend(row['interview_id'] for row in page['history'])
+                pages += 1
+                cursor = page['next_cursor']
+                if cursor is None:
+                    break
+            assert seen == [row['interview_id'] for row in full]
+            assert pages == 3
+        finally:
+            db.close()
+    print(f"✅ {len(seen)} interviews over {pages} pages in order")
+
+def test_history_projection_skips_blobs():
+    print("🔎 Testing field projection...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = _database(directory)
+        try:
+            _add_interviews(db, 'u1', 3)
+            interview = AIInterviewPreparation(database=db)
+
+            summary = interview.get_interview_history('u1', fields='interview_id,overall_score')
+            assert summary[0] == {'interview_id': 'interview_2', 'overall_score': 52}
+
+            try:
+                interview.get_interview_history('u1', fields='interview_id,session_data')
+                assert False, 'unknown field accepted'
+            except ValueError:
+                pass
+            try:
+                interview.get_interview_history('u1', limit=1, before='not-a-cursor')
+                assert False, 'malformed cursor accepted'
+            except ValueError:
+                pass
+        finally:
+            db.close()
+    print("✅ Summary rows carry only the requested fields")
+
+def test_single_report_lookup():
+    with tempfile.TemporaryDirectory() as directory:
+        db = _database(directory)
+        try:
+            _add_interviews(db, 'u1', 2)
+            interview = AIInterviewPreparation(database=db)
+            report = interview.get_interview_report('u1', 'interview_1')
+            assert report['final_report'] == {'summary': 1}
+            assert report['session_data'] == {'answers': {}}
+            assert interview.get_interview_report('someone_else', 'interview_1') is None
+
+            assessment = AISkillAssessment(database=db)
+            with db.transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO assessment_results
+                    (user_id, assessment_id, start_time, end_time, final_scores, assessment_report)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', ('u1', 'assessment_1', '', '', json.dumps({'Python': 80}), json.dumps({'ok': True})))
+            assert assessment.get_assessment_report('u1', 'assessment_1')['final_scores'] == {'Python': 80}
+            assert assessment.get_assessment_history('u1', fields=['assessment_id']) == [{'assessment_id': 'assessment_1'}]
+            assert assessment.get_assessment_report('u1', 'missing') is None
+        finally:
+            db.close()
+
+def _save_interview(interview, user_id, interview_type, score):
+    session = {'session_id': f'{user_id}_{interview_type}_{score}', 'interview_type': interview_type,
+               'difficulty': 'intermediate', 'start_time': '', 'end_time': ''}
+    interview._save_interview_results(user_id, session, {'interview_summary': {'overall_score': score}})
+
+def _save_assessment(assessment, user_id, final_scores):
+    session = {'assessment_id': f'{user_id}_{len(final_scores)}', 'start_time': '', 'end_time': ''}
+    assessment._save_assessment_results(user_id, session, final_scores, {})
+
+def test_insights_use_aggregates():
+    print("📈 Testing incrementally maintained insights...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = _database(directory)
+        try:
+            interview = AIInterviewPreparation(database=db)
+            for interview_type, score in [('technical', 55), ('behavioral', 80), ('technical', 71)]:
+                _save_interview(interview, 'u1', interview_type, score)
+
+            insights = interview.get_interview_insights('u1')
+            assert insights['total_interviews'] == 3
+            assert insights['average_score'] == 68.7
+            assert insights['best_score'] == 80 and insights['latest_score'] == 71
+            assert insights['recent_scores'] == [71, 80, 55]
+            assert insights['performance_by_type'] == {'technical': 63.0, 'behavioral': 80.0}
+            assert insights['improvement_trend'] == 'Improving'
+            assert interview.get_interview_insights('nobody') == {'message': 'No interview history found'}
+
+            assessment = AISkillAssessment(database=db)
+            _save_assessment(assessment, 'u1', {'Python': 50.0, 'SQL': 75.0})
+            _save_assessment(assessment, 'u1', {'Python': 65.0, 'SQL': 74.0, 'Git': 90.0})
+            skills = assessment.get_skill_insights('u1')
+            assert skills['total_assessments'] == 2
+            assert skills['latest_assessment']['final_scores']['Git'] == 90.0
+            assert skills['skill_progress']['Python']['improvement'] == 15.0
+            assert 'Git' not in skills['skill_progress']
+            assert skills['improvement_areas'] == ['Python']
+            assert skills['strengths_maintained'] == ['SQL']
+
+            # Rebuilding from history reproduces the incrementally maintained rows
+            expected = (load_interview_stats(db, 'u1'), load_skill_stats(db, 'u1'))
+            conn = db.connection()
+            rebuild_stats(conn)
+            conn.commit()
+            assert (load_interview_stats(db, 'u1'), load_skill_stats(db, 'u1')) == expected
+        finally:
+            db.close()
+    print("✅ Insights served from one aggregate row per user")
+
+if __name__ == "__main__":
+    test_history_pages_follow_cursor()
+    test_history_projection_skips_blobs()
+    test_single_report_lookup()
+    test_insights_use_aggregates()
+    print("🎉 History tests passed!")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk LLM response cache
+"""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.llm_cache import LLMCache
+from modules.llm_clients import LLMClients, StubProvider
+
+def test_repeat_prompts_hit_the_cache():
+    print("💾 Testing LLM response cache...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'llm_cache.db')
+        llm = LLMClients(gemini=StubProvider('gemini', lambda prompt, system: f'rewritten: {prompt}'),
+                         cache=LLMCache(path))
+        stub = llm.gemini.provider
+
+        assert llm.gemini.generate('summary A') == 'rewritten: summary A'
+        assert llm.gemini.generate('summary A') == 'rewritten: summary A'
+        assert llm.gemini.generate('summary A', system='other') == 'rewritten: summary A'
+        assert len(stub.calls) == 2
+
+        stats = llm.stats()['cache']
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+        assert stats['hit_rate'] == 0.3333
+
+        # Another worker opening the same file sees the stored responses
+        other = LLMCache(path)
+        assert other.get(LLMCache.make_key('gemini', '', 'summary A', {'system': None})) == 'rewritten: summary A'
+
+        # Failed calls are not cached
+        failing = LLMClients(perplexity=StubProvider('perplexity', lambda prompt, system: None), cache=other)
+        failing.perplexity.generate('tip')
+        failing.perplexity.generate('tip')
+        assert len(failing.perplexity.provider.calls) == 2
+    print(f"✅ Hit rate {stats['hit_rate']:.0%} after one repeat")
+
+def test_ttl_and_size_eviction():
+    print("🧹 Testing cache expiry and eviction...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = LLMCache(os.path.join(directory, 'llm_cache.db'), ttl_seconds=0.2, max_bytes=250, touch_seconds=0)
+        cache.put('old', 'gemini', 'm', 'x' * 100)
+        time.sleep(0.25)
+        assert cache.get('old') is None
+        cache.put('a', 'gemini', 'm', 'a' * 100)
+        assert cache.expired == 1
+
+        cache.ttl_seconds = 3600
+        cache.put('b', 'gemini', 'm', 'b' * 100)
+        cache.get('a')  # a is now more recently used than b
+        cache.put('c', 'gemini', 'm', 'c' * 100)
+
+        assert cache.get('b') is None
+        assert cache.get('a') and cache.get('c')
+        assert cache.evicted == 1
+        assert cache.stats()['bytes'] == 200
+    print("✅ Expired and least recently used entries removed")
+
+def test_trim_walks_the_recency_index():
+    print("📏 Testing byte accounting and batched trimming...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = LLMCache(os.path.join(directory, 'llm_cache.db'), max_bytes=1000, touch_seconds=0)
+        cache.TRIM_BATCH = 4
+        for i in range(10):
+            cache.put(f'k{i}', 'gemini', 'm', 'x' * 100)
+        cache.put('k9', 'gemini', 'm', 'y' * 50)  # replacing an entry adjusts the total
+        assert cache.stats()['bytes'] == 950 and cache.evicted == 0
+
+        # Over budget by 150 bytes: the two least recently used entries go
+        cache.put('big', 'gemini', 'm', 'z' * 200)
+        assert cache.evicted == 2
+        assert cache.get('k0') is None and cache.get('k1') is None and cache.get('k2')
+        conn = cache._connection()
+        assert cache.stats()['bytes'] == conn.execute('SELECT SUM(size) FROM llm_cache').fetchone()[0] == 950
+
+        # Evicting more than one batch takes several index walks
+        cache.max_bytes = 300
+        cache.put('last', 'gemini', 'm', 'w' * 100)
+        assert cache.stats()['bytes'] <= 300
+        assert conn.execute('SELECT SUM(size) FROM llm_cache').fetchone()[0] == cache.stats()['bytes']
+
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT key, size FROM llm_cache ORDER BY last_used LIMIT 4'))
+        assert 'idx_llm_cache_last_used' in plan and 'TEMP B-TREE' not in plan, plan
+
+        cache.clear()
+        assert cache.stats()['bytes'] == 0
+    print("✅ Byte total maintained incrementally; trimming reads the recency index")
+
+def test_hits_only_refresh_stale_recency():
+    print("✍️ Testing read-mostly cache hits...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = LLMCache(os.path.join(directory, 'llm_cache.db'), touch_seconds=0.2)
+        cache.put('a', 'gemini', 'm', 'answer')
+        conn = cache._connection()
+        writes = conn.total_changes
+        for _ in range(20):
+            assert cache.get('a') == 'answer'
+        assert conn.total_changes == writes
+
+        time.sleep(0.25)
+        assert cache.get('a') == 'answer'
+        assert conn.total_changes == writes + 1
+        assert cache.hits == 21
+    print("✅ 20 hits without a write, one refresh once the entry went stale")
+
+if __name__ == "__main__":
+    test_repeat_prompts_hit_the_cache()
+    test_ttl_and_size_eviction()
+    test_trim_walks_the_recency_index()
+    test_hits_only_refresh_stale_recency()
+    print("🎉 LLM cache tests passed!")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared LLM provider clients
+"""
+
+import sys
+import os
+import json
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import modules.llm_clients as llm_clients
+from modules.llm_clients import (LLMConfig, LLMClients, GeminiProvider, PerplexityProvider,
+                                 StubProvider, LLMProvider)
+
+class _FakeGenai:
+    """Stands in for google.generativeai and counts setup calls"""
+
+    def __init__(self):
+        self.configured = 0
+        self.models = 0
+
+    def configure(self, api_key):
+        self.configured += 1
+
+    def GenerativeModel(self, name):
+        self.models += 1
+
+        class _Model:
+            def generate_content(self, prompt, request_options=None):
+                return type('Response', (), {'text': f' {name}: {prompt} '})()
+        return _Model()
+
+def test_offline_mode_and_stubs():
+    print("🔌 Testing provider configuration...")
+
+    offline = LLMClients.from_config(LLMConfig({'LLM_PROVIDER': 'offline', 'GEMINI_API_KEY': 'k', 'PPLX_API_KEY': 'k'}))
+    assert offline.status() == {'gemini': False, 'perplexity': False}
+
+    live = LLMClients.from_config(LLMConfig({'PPLX_API_KEY': 'k', 'PPLX_MODEL': 'sonar', 'LLM_CACHE_MAX_MB': '0'}))
+    assert isinstance(live.perplexity.provider, PerplexityProvider) and live.perplexity.model == 'sonar'
+    assert live.gemini.available is False
+    assert live.stats()['cache'] is None
+    assert live.stats()['health']['perplexity']['state'] == 'closed'
+
+    stub = StubProvider('gemini', lambda prompt, system: prompt.upper())
+    assert stub.available and stub.generate('hi', system='sys') == 'HI'
+    assert stub.calls == [('hi', 'sys')]
+    print("✅ Offline mode disables providers; stubs record prompts")
+
+def test_gemini_is_configured_once():
+    print("♻️ Testing Gemini client reuse...")
+
+    fake = _FakeGenai()
+    original = llm_clients._get_genai
+    llm_clients._get_genai = lambda: fake
+    try:
+        provider = GeminiProvider('key', 'gemini-test')
+        assert provider.available and not GeminiProvider('', 'gemini-test').available
+        threads = [threading.Thread(target=provider.generate, args=('q',)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert provider.generate('hello', system='be brief') == 'gemini-test: be brief\nhello'
+    finally:
+        llm_clients._get_genai = original
+
+    assert (fake.configured, fake.models) == (1, 1)
+    try:
+        LLMProvider()
+        assert False, 'LLMProvider is abstract'
+    except TypeError:
+        pass
+    print("✅ 9 calls, one configure and one model")
+
+def test_perplexity_reuses_connection():
+    print("🔗 Testing Perplexity keep-alive...")
+
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            status = 200 if payload['messages'][-1]['content'] != 'fail' else 500
+            body = json.dumps({'choices': [{'message': {'content': f" {payload['model']} ok "}}]}).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        provider = PerplexityProvider('key', model='sonar', url=f'http://127.0.0.1:{server.server_port}/chat',
+                                      timeout_seconds=5)
+        replies = [provider.generate('tip', system='coach') for _ in range(5)]
+        assert replies == ['sonar ok'] * 5
+        try:
+            provider.generate('fail')
+            assert False, 'expected an HTTP error'
+        except requests.HTTPError:
+            pass
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(connections) == 1, connections
+    print(f"✅ 6 requests over {len(connections)} connection")
+
+if __name__ == "__main__":
+    test_offline_mode_and_stubs()
+    test_gemini_is_configured_once()
+    test_perplexity_reuses_connection()
+    print("🎉 LLM client tests passed!")
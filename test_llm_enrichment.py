@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent LLM enrichment with a shared deadline
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.llm_enrichment import EnrichmentRunner
+from modules.llm_clients import LLMClients, StubProvider
+from modules.session_store import MemorySessionStore
+from modules.ai_interview_prep import AIInterviewPreparation
+from modules.ai_skill_assessment import AISkillAssessment
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+def test_calls_run_concurrently_under_deadline():
+    print("⏱️ Testing enrichment deadline...")
+
+    runner = EnrichmentRunner(MemorySessionStore(), deadline_seconds=0.3)
+    release = threading.Event()
+
+    def slow():
+        release.wait(2)
+        return 'late tip'
+
+    start = time.perf_counter()
+    result = runner.run({'fast': lambda: 'quick', 'slow': slow, 'broken': lambda: 1 / 0})
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0, elapsed
+    assert result['results'] == {'fast': 'quick'}
+    assert result['pending'] == ['slow'] and result['ticket']
+    assert runner.poll(result['ticket'])['status'] == 'pending'
+
+    release.set()
+    assert _wait_for(lambda: runner.poll(result['ticket'])['status'] == 'complete')
+    assert runner.poll(result['ticket'])['results'] == {'fast': 'quick', 'slow': 'late tip'}
+    assert runner.poll('unknown') is None
+
+    # Everything on time: no ticket
+    assert runner.run({'a': lambda: 1, 'b': lambda: 2}) == {'results': {'a': 1, 'b': 2}, 'pending': [], 'ticket': None}
+    print(f"✅ Returned after {elapsed:.2f}s with late results attached to a ticket")
+
+def test_interview_returns_baseline_and_polls_late_feedback():
+    print("🎤 Testing late interview feedback...")
+
+    store = MemorySessionStore()
+    release = threading.Event()
+
+    def late_gemini(prompt, system):
+        release.wait(2)
+        return '{"score": 99, "strengths": ["Strong structure"], "recommendation": "Quantify the impact"}'
+
+    llm = LLMClients(gemini=StubProvider('gemini', late_gemini),
+                     perplexity=StubProvider('perplexity', 'Lead with the result'))
+    interview = AIInterviewPreparation(store, enrichment=EnrichmentRunner(store, deadline_seconds=0.2), llm=llm)
+    interview.start_mock_interview('u1', 'behavioral', 'intermediate')
+
+    start = time.perf_counter()
+    result = interview.submit_answer('u1', 'I organised the team around a clear plan.')
+    assert time.perf_counter() - start < 1.0
+    assert 'Lead with the result' in result['feedback']['suggestions']
+    assert result['feedback']['overall_score'] < 99
+    assert result['enrichment_pending'] == ['gemini']
+
+    release.set()
+    ticket = result['enrichment_ticket']
+    assert _wait_for(lambda: interview.get_enrichment(ticket)['status'] == 'complete')
+    enriched = interview.get_enrichment(ticket)
+    assert enriched['feedback']['overall_score'] == 99
+    assert 'Strong structure' in enriched['feedback']['strengths']
+    assert {'Quantify the impact', 'Lead with the result'} <= set(enriched['feedback']['suggestions'])
+    assert interview.get_enrichment('missing') == {'error': 'Enrichment ticket not found'}
+    assert llm.perplexity.calls[0][1] == 'You are a concise interview coach.'
+    print("✅ Baseline returned immediately, late feedback available by polling")
+
+def test_malformed_gemini_reply_only_loses_enrichment():
+    store = MemorySessionStore()
+    llm = LLMClients(gemini=StubProvider('gemini', '{"score": "85", "strengths": "Clear"}'))
+    interview = AIInterviewPreparation(store, enrichment=EnrichmentRunner(store, deadline_seconds=1), llm=llm)
+    interview.start_mock_interview('u1', 'behavioral', 'intermediate')
+
+    result = interview.submit_answer('u1', 'I organised the team around a clear plan.')
+    assert 'error' not in result and 'Clear' not in result['feedback']['strengths']
+
+    baseline = {'overall_score': 50.0, 'strengths': [], 'suggestions': []}
+    for reply in ({'score': '85'}, {'strengths': 'Clear'}, {'improvements': [1]}, ['not', 'a', 'dict']):
+        assert interview._apply_enrichment(baseline, {'gemini': reply}) == baseline
+
+def test_assessment_coaching_is_queued():
+    print("🧠 Testing queued assessment coaching...")
+
+    store = MemorySessionStore()
+    release = threading.Event()
+
+    def slow_coaching(prompt, system):
+        release.wait(2)
+        return 'Keep practicing loops and functions'
+
+    llm = LLMClients(gemini=StubProvider('gemini', slow_coaching))
+    assessment = AISkillAssessment(store, coaching=EnrichmentRunner(store), llm=llm)
+    assessment.start_assessment('u1')
+    start = time.perf_counter()
+    result = assessment.submit_answer('u1', 2)
+    assert time.perf_counter() - start < 0.5
+
+    ticket = result['coaching_ticket']
+    assert result['ai_coaching'] is None and ticket
+    assert assessment.get_coaching(ticket)['status'] == 'pending'
+    release.set()
+    assert _wait_for(lambda: assessment.get_coaching(ticket)['status'] == 'complete')
+    assert assessment.get_coaching(ticket)['ai_coaching'] == 'Keep practicing loops and functions'
+    assert assessment.assessment_questions['technical_skills'][0]['question'] in llm.gemini.calls[0][0]
+    assert assessment.get_coaching('missing') == {'error': 'Coaching ticket not found'}
+    print("✅ Next question returned before coaching finished")
+
+def test_backlog_is_bounded():
+    release = threading.Event()
+    runner = EnrichmentRunner(MemorySessionStore(), deadline_seconds=0, max_pending=2)
+    first = runner.run({'a': lambda: release.wait(2), 'b': lambda: release.wait(2)})
+    assert first['ticket'] and runner.pending() == 2
+
+    # A full backlog drops optional work instead of queueing it
+    assert runner.run({'c': lambda: 'coaching'}) == {'results': {}, 'pending': [], 'ticket': None}
+    assert runner.dropped == 1
+    release.set()
+    assert _wait_for(lambda: runner.pending() == 0)
+    assert runner.run({'d': lambda: 'tip'}, deadline_seconds=1)['results'] == {'d': 'tip'}
+
+def test_coaching_tickets_stay_out_of_the_session_store():
+    sessions = MemorySessionStore(max_sessions=3)
+    release = threading.Event()
+    llm = LLMClients(gemini=StubProvider('gemini', lambda prompt, system: release.wait(2) and 'Coaching'))
+    assessment = AISkillAssessment(sessions, llm=llm)
+    for user in ('u1', 'u2', 'u3'):
+        assessment.start_assessment(user)
+    try:
+        for _ in range(5):
+            assert assessment.submit_answer('u1', 0)['coaching_ticket']
+        assert sessions.stats()['sessions'] == 3 and sessions.evicted == 0
+        assert assessment.coaching.store.stats()['sessions'] == 5
+    finally:
+        release.set()
+
+if __name__ == "__main__":
+    test_calls_run_concurrently_under_deadline()
+    test_interview_returns_baseline_and_polls_late_feedback()
+    test_malformed_gemini_reply_only_loses_enrichment()
+    test_assessment_coaching_is_queued()
+    test_backlog_is_bounded()
+    test_coaching_tickets_stay_out_of_the_session_store()
+    print("🎉 LLM enrichment tests passed!")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the Job Market Analyzer's precomputed market sections
+"""
+
+import sys
+import os
+import json
+import logging
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.job_market_analysis import JobMarketAnalyzer
+from modules.market_scores import MarketScoreTable
+
+STATIC_SECTIONS = [
+    'overall_market_health', 'real_time_indicators', 'market_forecast',
+    'remote_work_analysis', 'skill_trends', 'geographic_insights'
+]
+
+def _skill_analysis(*names):
+    return {'matched_skills': [{'name': name} for name in names]}
+
+def test_static_sections_are_shared_across_requests():
+    print("📊 Testing precomputed market sections...")
+
+    analyzer = JobMarketAnalyzer()
+    first = analyzer.analyze_market(_skill_analysis('Python Programming', 'Machine Learning'))
+    second = analyzer.analyze_market(_skill_analysis('Communication'))
+
+    for name in STATIC_SECTIONS:
+        assert first[name] is second[name]
+
+    fragments = analyzer.get_static_fragments()
+    assert set(fragments) == set(STATIC_SECTIONS)
+    for name in STATIC_SECTIONS:
+        assert json.loads(fragments[name]) == first[name]
+
+    # Skill-dependent sections are still computed per request
+    assert first['skill_demand_analysis'] != second['skill_demand_analysis']
+    assert first['emerging_roles'] != second['emerging_roles']
+    print(f"✅ {len(STATIC_SECTIONS)} sections reused at market version {analyzer.static_sections['version']}")
+
+def test_market_data_ingest_rebuilds_sections():
+    analyzer = JobMarketAnalyzer()
+    before = analyzer.static_sections
+
+    version = analyzer.ingest_market_data({'technology': {'remote_work_percentage': 90}})
+    after = analyzer.static_sections
+
+    assert after['version'] == version > before['version']
+    assert after['sections']['remote_work_analysis']['industry_remote_opportunities']['technology'] == 90
+    assert before['sections']['remote_work_analysis']['industry_remote_opportunities']['technology'] == 75
+    assert '"technology":90' in analyzer.get_static_fragments()['remote_work_analysis']
+    assert after['market_trends']['technology']['remote_work_percentage'] == 90
+    assert before['market_trends']['technology']['remote_work_percentage'] == 75
+    assert analyzer.market_trends is after['market_trends']
+    print("✅ Market data ingest rebuilt the precomputed sections")
+
+def test_invalid_market_data_is_rejected_untouched():
+    analyzer = JobMarketAnalyzer()
+    trends, static, version = analyzer.market_trends, analyzer.static_sections, analyzer.market_scores.version
+
+    for bad in ({'Robotics': {'growth_rate': 10}},
+                {'technology': {'growth_rate': 'fast'}},
+                {'technology': {'demand_skills': [1, 2]}},
+                {'technology': 'not an object'}):
+        try:
+            analyzer.ingest_market_data(bad)
+            assert False, f'expected {bad} to be rejected'
+        except ValueError:
+            pass
+
+    assert analyzer.market_trends is trends and analyzer.static_sections is static
+    assert analyzer.market_scores.version == version
+    assert analyzer.analyze_market({'matched_skills': [{'name': 'Python Programming'}]})
+
+def test_failed_scheduled_refresh_is_logged():
+    print("📉 Testing scheduled refresh failures...")
+
+    analyzer = JobMarketAnalyzer(MarketScoreTable())
+    static, version = analyzer.static_sections, analyzer.market_scores.version
+    failed = threading.Event()
+
+    class _Handler(logging.Handler):
+        def emit(self, record):
+            failed.set()
+
+    def broken_feed():
+        raise RuntimeError('market feed is down')
+
+    handler = _Handler()
+    logging.getLogger('modules.market_scores').addHandler(handler)
+    try:
+        analyzer.market_scores.schedule_refresh(0.01, broken_feed)
+        assert failed.wait(5)
+    finally:
+        analyzer.market_scores.stop_refresh()
+        logging.getLogger('modules.market_scores').removeHandler(handler)
+
+    assert analyzer.static_sections is static and analyzer.market_scores.version == version
+    print("✅ Failure logged and the previous table kept")
+
+if __name__ == "__main__":
+    test_static_sections_are_shared_across_requests()
+    test_market_data_ingest_rebuilds_sections()
+    test_invalid_market_data_is_rejected_untouched()
+    test_failed_scheduled_refresh_is_logged()
+    print("🎉 Market analysis tests passed!")
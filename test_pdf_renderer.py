@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the background PDF rendering pool
+"""
+
+import sys
+import os
+import time
+import tempfile
+import multiprocessing
+from concurrent.futures import Future
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.llm_clients import LLMClients
+from modules.pdf_renderer import PDFRenderer, PDFQueueFullError
+from modules.pdf_store import PDFStore
+from modules.resume_prep import ResumePreparation
+
+RESUME = {
+    'personal_info': {'full_name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '555-0100',
+                      'location': 'Pune, India'},
+    'summary': 'Backend engineer focused on reliable services.',
+    'experience': [{'job_title': 'Engineer', 'company': 'Acme', 'start_date': '2021', 'end_date': '2024',
+                    'achievements': 'Built APIs\nCut latency by 30%'}],
+    'education': [], 'skills': {'technical_skills': ['Python']}, 'projects': []
+}
+
+class _CrashingStore(PDFStore):
+    """Kills the worker process instead of rendering a resume whose summary is 'crash'"""
+
+    def save(self, content):
+        if content.get('summary') == 'crash':
+            os._exit(1)
+        return super().save(content)
+
+def _wait(renderer, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while renderer.status(job_id)['status'] == 'pending' and time.time() < deadline:
+        time.sleep(0.05)
+    return renderer.status(job_id)
+
+def test_jobs_render_in_worker_processes():
+    print("🖨️ Testing background PDF rendering...")
+
+    content = ResumePreparation(LLMClients()).generate_resume_content(RESUME)
+    with tempfile.TemporaryDirectory() as directory:
+        renderer = PDFRenderer(max_workers=1, max_pending=1, pdf_store=PDFStore(directory))
+        try:
+            start = time.perf_counter()
+            job_id = renderer.submit(content)
+            assert time.perf_counter() - start < 1.0
+            assert renderer.status(job_id)['status'] == 'pending'
+
+            # The same content joins the render in flight (or reuses its file)
+            duplicate = renderer.submit(dict(content))
+
+            job = _wait(renderer, job_id)
+            assert job['status'] == 'complete', job
+            assert _wait(renderer, duplicate)['filename'] == job['filename']
+            with open(os.path.join(directory, job['filename']), 'rb') as f:
+                assert f.read(5) == b'%PDF-'
+            assert renderer.pending() == 0
+
+            # Bad content fails the job rather than the worker
+            failed = _wait(renderer, renderer.submit({'personal_info': {}}))
+            assert failed['status'] == 'failed' and failed['error']
+            assert sorted(os.listdir(directory)) == [job['filename']]
+            assert renderer.status('unknown') is None
+
+            # The queue is bounded
+            renderer._in_flight['busy.pdf'] = Future()
+            try:
+                renderer.submit(dict(content, summary='Something else entirely.'))
+                assert False, 'expected the queue to be full'
+            except PDFQueueFullError:
+                pass
+        finally:
+            renderer.shutdown()
+    print("✅ Job returned immediately and completed in a worker process")
+
+def test_workers_start_per_process_and_recover_from_crashes():
+    print("🧯 Testing worker start-up and crash recovery...")
+
+    content = ResumePreparation(LLMClients()).generate_resume_content(RESUME)
+    with tempfile.TemporaryDirectory() as directory:
+        renderer = PDFRenderer(max_workers=1, pdf_store=_CrashingStore(directory))
+        inherited = None
+        try:
+            assert renderer.start_method != 'fork'
+            assert renderer.start_method in multiprocessing.get_all_start_methods()
+            assert renderer._executor is None
+
+            crashed = _wait(renderer, renderer.submit(dict(content, summary='crash')))
+            assert crashed['status'] == 'failed', crashed
+            first = renderer._executor
+            assert first._mp_context.get_start_method() == renderer.start_method
+
+            job = _wait(renderer, renderer.submit(content))
+            assert job['status'] == 'complete', job
+            assert renderer._executor is not first and first._shutdown_thread
+            assert renderer._executor._mp_context.get_start_method() == renderer.start_method
+
+            # A pool built by another process (e.g. before a fork) is left alone and replaced
+            inherited, renderer._pid = renderer._executor, -1
+            job = _wait(renderer, renderer.submit(dict(content, summary='Forked worker')))
+            assert job['status'] == 'complete', job
+            assert renderer._executor is not inherited and not inherited._shutdown_thread
+            assert renderer.pending() == 0
+        finally:
+            renderer.shutdown()
+            if inherited is not None:
+                inherited.shutdown()
+    print("✅ Pools start per process and broken pools are replaced")
+
+if __name__ == "__main__":
+    test_jobs_render_in_worker_processes()
+    test_workers_start_per_process_and_recover_from_crashes()
+    print("🎉 PDF renderer tests passed!")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed resume PDF store
+"""
+
+import sys
+import os
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.llm_clients import LLMClients
+from modules.pdf_store import PDFStore, content_hash
+from modules.pdf_renderer import PDFRenderer
+from modules.resume_prep import ResumePreparation
+
+RESUME = {
+    'personal_info': {'full_name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '555-0100',
+                      'location': 'Pune, India'},
+    'summary': 'Backend engineer focused on reliable services.',
+    'experience': [{'job_title': 'Engineer', 'company': 'Acme', 'achievements': 'Built APIs'}],
+    'education': [], 'skills': {'technical_skills': ['Python']}, 'projects': []
+}
+
+def _content(**changes):
+    return ResumePreparation(LLMClients()).generate_resume_content(dict(RESUME, **changes))
+
+def test_identical_content_shares_one_file():
+    print("🗃️ Testing content-addressed PDF store...")
+
+    content = _content()
+    assert content_hash(content) == content_hash(_content(summary='  ' + RESUME['summary'] + '\n'))
+    assert content_hash(content) != content_hash(_content(summary='Frontend engineer.'))
+    assert content_hash(content) != content_hash(content, template_version=2)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = PDFStore(directory)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            names = list(pool.map(lambda _: store.save(_content()), range(4)))
+        assert len(set(names)) == 1
+        assert os.listdir(directory) == [names[0]]
+
+        path = store.path(names[0])
+        modified = os.path.getmtime(path)
+        time.sleep(0.01)
+        assert store.save(content) == names[0]
+        assert os.path.getmtime(path) == modified
+    print(f"✅ 5 saves, 1 file: {names[0]}")
+
+def test_renderer_reuses_stored_pdf():
+    with tempfile.TemporaryDirectory() as directory:
+        store = PDFStore(directory)
+        filename = store.save(_content())
+        renderer = PDFRenderer(pdf_store=store)
+        job = renderer.status(renderer.submit(_content()))
+        assert job == {'status': 'complete', 'filename': filename, 'reused': True}
+        # No worker pool was needed
+        assert renderer._executor is None
+
+if __name__ == "__main__":
+    test_identical_content_shares_one_file()
+    test_renderer_reuses_stored_pdf()
+    print("🎉 PDF store tests passed!")
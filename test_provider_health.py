@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the provider circuit breaker and adaptive timeouts
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.provider_health import ProviderHealth, ProviderUnavailableError
+from modules.llm_clients import LLMClients, LLMProvider, StubProvider
+from modules.session_store import MemorySessionStore
+from modules.ai_interview_prep import AIInterviewPreparation
+
+class _FlakyProvider(LLMProvider):
+    """Fails while ``down`` is set and records the timeout of every call"""
+
+    def __init__(self, name):
+        self.name = name
+        self.down = False
+        self.timeouts = []
+
+    @property
+    def available(self):
+        return True
+
+    def generate(self, prompt, system=None, timeout=None):
+        self.timeouts.append(timeout)
+        if self.down:
+            raise TimeoutError('provider timed out')
+        return 'ok'
+
+def test_breaker_opens_and_probes():
+    print("🔌 Testing circuit breaker...")
+
+    flaky = _FlakyProvider('gemini')
+    llm = LLMClients(gemini=flaky, health_options={'failure_threshold': 3, 'reset_seconds': 0.2})
+    flaky.down = True
+    for _ in range(3):
+        try:
+            llm.gemini.generate('q')
+        except TimeoutError:
+            pass
+
+    assert llm.health['gemini'].state == 'open'
+    assert llm.gemini.available is False
+    try:
+        llm.gemini.generate('q')
+        assert False, 'expected the open circuit to reject the call'
+    except ProviderUnavailableError:
+        pass
+    assert len(flaky.timeouts) == 3
+
+    # A failed half-open probe re-opens the circuit
+    time.sleep(0.25)
+    assert llm.gemini.available is True
+    try:
+        llm.gemini.generate('probe')
+    except TimeoutError:
+        pass
+    assert llm.health['gemini'].state == 'open' and len(flaky.timeouts) == 4
+
+    # A successful probe closes it
+    time.sleep(0.25)
+    flaky.down = False
+    assert llm.gemini.generate('probe') == 'ok'
+    assert llm.stats()['health']['gemini']['state'] == 'closed'
+    assert llm.stats()['health']['gemini']['rejected'] == 1
+    print("✅ Opened after 3 failures, reclosed after a successful probe")
+
+def test_timeout_follows_observed_latency():
+    print("⏱️ Testing adaptive timeouts...")
+
+    health = ProviderHealth('perplexity', min_timeout=0.5, max_timeout=12.0, min_samples=5)
+    assert health.timeout() == 12.0
+    for latency in (0.4, 0.5, 0.6, 0.5, 0.9):
+        health.record_success(latency)
+    assert health.timeout() == 1.8
+
+    for _ in range(100):
+        health.record_success(0.01)
+    assert health.timeout() == 0.5
+
+    flaky = _FlakyProvider('perplexity')
+    llm = LLMClients(perplexity=flaky, health_options={'max_timeout': 4.0})
+    llm.perplexity.generate('q')
+    llm.perplexity.generate('q', timeout=2.0)
+    assert flaky.timeouts == [4.0, 2.0]
+
+    # Short calls shrink the timeout, but a slow prompt keeps its floor and stays out of the window
+    for _ in range(10):
+        llm.health['perplexity'].record_success(0.05)
+    llm.perplexity.generate('short')
+    llm.perplexity.generate('long resume', min_timeout=3.0)
+    assert flaky.timeouts[-2:] == [1.0, 3.0]
+    assert llm.health['perplexity'].snapshot()['samples'] == 13
+    print("✅ Timeout tracks p95 latency within bounds")
+
+def test_open_provider_is_skipped_by_enrichment():
+    llm = LLMClients(gemini=StubProvider('gemini', '{}'), perplexity=StubProvider('perplexity', 'tip'),
+                     health_options={'failure_threshold': 1})
+    llm.health['gemini'].record_failure()
+    interview = AIInterviewPreparation(MemorySessionStore(), llm=llm)
+    question = interview.interview_questions['behavioral'][0]
+    assert list(interview._enrichment_calls(question, 'answer')) == ['perplexity']
+
+if __name__ == "__main__":
+    test_breaker_opens_and_probes()
+    test_timeout_follows_observed_latency()
+    test_open_provider_is_skipped_by_enrichment()
+    print("🎉 Provider health tests passed!")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for response assembly with pre-encoded JSON fragments
+"""
+
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import response_encoding
+from modules.response_encoding import JsonFragments, ResponseEncoder, encode_json
+from modules.analysis_pipeline import AnalysisPipeline
+from modules.skill_mapping import SkillMappingEngine
+from modules.job_market_analysis import JobMarketAnalyzer
+from modules.career_recommender import CareerRecommender
+from modules.learning_planner import LearningPlanGenerator
+from modules.resume_prep import ResumePreparation
+
+def _encoder(job_analyzer, learning_planner, resume_prep, splice=None):
+    encoder = ResponseEncoder(splice=splice)
+    encoder.register('market_analysis.market_forecast', lambda: job_analyzer.static_sections['fragments'])
+    encoder.register('market_analysis.geographic_insights', lambda: job_analyzer.static_sections['fragments'])
+    encoder.register('learning_plan.course_recommendations.*.course', lambda: learning_planner.json_fragments)
+    encoder.register('resume_guidance.resume_guidance.template_recommendation', lambda: resume_prep.json_fragments)
+    return encoder
+
+def test_fragments_match_by_identity():
+    print("🧩 Testing JSON fragments...")
+
+    course = {'name': 'Intro to Python', 'duration': '4 weeks'}
+    fragments = JsonFragments([course])
+
+    assert json.loads(fragments.get(course)) == course
+    assert fragments.get(dict(course)) is None
+    assert fragments.get([]) is None
+    print(f"✅ {len(fragments)} fragment registered")
+
+def test_encoded_response_matches_plain_json():
+    print("📦 Testing response assembly...")
+
+    job_analyzer = JobMarketAnalyzer()
+    learning_planner = LearningPlanGenerator()
+    resume_prep = ResumePreparation()
+    pipeline = AnalysisPipeline(
+        SkillMappingEngine(), job_analyzer, CareerRecommender(job_analyzer.market_scores),
+        learning_planner, resume_prep
+    )
+    analysis = pipeline.analyze({
+        'skills': ['Python Programming', 'Communication'],
+        'interests': ['Technology']
+    })['analysis']
+    assert analysis['learning_plan']['course_recommendations']
+
+    encoder = _encoder(job_analyzer, learning_planner, resume_prep, splice=True)
+    expected = json.loads(json.dumps(analysis))
+
+    fragment_type = response_encoding.Fragment
+    try:
+        # Placeholder splicing (stdlib and older orjson)
+        response_encoding.Fragment = None
+        body = encoder.encode(analysis)
+        assert json.loads(body) == expected
+        assert encoder._token.encode() not in body
+
+        # Plain stdlib encoding without orjson
+        fast_encoder = response_encoding.orjson
+        response_encoding.orjson = None
+        try:
+            body = encoder.encode(analysis)
+            assert json.loads(body) == expected
+            assert body == encode_json(analysis)
+        finally:
+            response_encoding.orjson = fast_encoder
+    finally:
+        response_encoding.Fragment = fragment_type
+
+    if fragment_type is not None:
+        assert json.loads(encoder.encode(analysis)) == expected
+    assert json.loads(_encoder(job_analyzer, learning_planner, resume_prep).encode(analysis)) == expected
+
+    # The source analysis is never modified by splicing
+    assert json.loads(json.dumps(analysis)) == expected
+    print(f"✅ Assembled {len(encoder.encode(analysis))} bytes identical to plain encoding")
+
+def test_pipeline_renders_body_once_per_cached_result():
+    from modules.response_cache import ResponseCache
+
+    job_analyzer = JobMarketAnalyzer()
+    learning_planner = LearningPlanGenerator()
+    resume_prep = ResumePreparation()
+    encoder = _encoder(job_analyzer, learning_planner, resume_prep)
+    renders = []
+
+    def render(analysis):
+        renders.append(1)
+        return encoder.encode({'success': True, **analysis})
+
+    pipeline = AnalysisPipeline(
+        SkillMappingEngine(), job_analyzer, CareerRecommender(job_analyzer.market_scores),
+        learning_planner, resume_prep, cache=ResponseCache(), render=render
+    )
+    first = pipeline.analyze({'skills': ['SQL'], 'interests': ['Finance']})
+    second = pipeline.analyze({'skills': ['sql'], 'interests': ['finance']})
+
+    assert second['cached'] and second['body'] is first['body']
+    assert len(renders) == 1
+    assert json.loads(first['body'])['success'] is True
+    assert 'render' in first['timings']
+    print("✅ Cached results reuse their encoded body")
+
+if __name__ == "__main__":
+    test_fragments_match_by_identity()
+    test_encoded_response_matches_plain_json()
+    test_pipeline_renders_body_once_per_cached_result()
+    print("🎉 Response encoding tests passed!")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for batched AI resume enhancement
+"""
+
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.llm_clients import LLMClients, StubProvider
+from modules.resume_prep import ResumePreparation
+
+RESUME = {
+    'use_ai': True,
+    'summary': 'I write code and like teams.',
+    'experience': [
+        {'job_title': 'Developer', 'company': 'Acme', 'achievements': 'built api\nfixed bugs'},
+        {'job_title': 'Intern', 'company': 'Beta', 'achievements': 'helped with tests'},
+        {'job_title': 'Volunteer', 'company': 'Club', 'achievements': ''}
+    ]
+}
+
+def _reply(prompt, system):
+    entries = json.loads(prompt.split('Input: ', 1)[1])['experience']
+    return '```json\n' + json.dumps({
+        'summary': 'Collaborative developer shipping reliable APIs.',
+        'experience': [{'index': e['index'], 'bullets': [f"- Led {e['job_title']} work", 'Delivered results']}
+                       for e in entries]
+    }) + '\n```'
+
+def test_one_call_enhances_every_entry():
+    print("✍️ Testing batched resume enhancement...")
+
+    llm = LLMClients(gemini=StubProvider('gemini', _reply), perplexity=StubProvider('perplexity', _reply))
+    content = ResumePreparation(llm).generate_resume_content(RESUME)
+
+    assert len(llm.gemini.calls) == 1 and not llm.perplexity.calls
+    assert content['summary'] == 'Collaborative developer shipping reliable APIs.'
+    assert content['experience'][0]['achievements'] == ['Led Developer work', 'Delivered results']
+    assert content['experience'][1]['achievements'] == ['Led Intern work', 'Delivered results']
+    assert content['experience'][2]['achievements'] == []
+    # The request payload is left untouched
+    assert RESUME['experience'][0]['achievements'] == 'built api\nfixed bugs'
+    print("✅ Summary and 2 experience entries rewritten in one call")
+
+def test_invalid_reply_falls_back():
+    print("🛡️ Testing enhancement validation...")
+
+    missing_entry = json.dumps({'summary': 'Short.', 'experience': [{'index': 0, 'bullets': ['One']}]})
+    llm = LLMClients(gemini=StubProvider('gemini', missing_entry), perplexity=StubProvider('perplexity', _reply))
+    content = ResumePreparation(llm).generate_resume_content(RESUME)
+    assert len(llm.gemini.calls) == 1 and len(llm.perplexity.calls) == 1
+    assert content['experience'][1]['achievements'] == ['Led Intern work', 'Delivered results']
+
+    llm = LLMClients(gemini=StubProvider('gemini', 'Sure! Here is your resume.'))
+    content = ResumePreparation(llm).generate_resume_content(RESUME)
+    assert content['summary'] == RESUME['summary']
+    assert content['experience'][0]['achievements'] == ['built api', 'fixed bugs']
+    print("✅ Malformed replies rejected, original content kept")
+
+if __name__ == "__main__":
+    test_one_call_enhances_every_entry()
+    test_invalid_reply_falls_back()
+    print("🎉 Resume enhancement tests passed!")
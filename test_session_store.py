@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared assessment/interview session store
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+import fcntl
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.session_store import (
+    SessionStore, MemorySessionStore, SQLiteSessionStore, FileSessionStore, SessionConflictError,
+    serialize_session, deserialize_session
+)
+from modules.session_lifecycle import SessionLifecycleManager
+from modules.ai_skill_assessment import AISkillAssessment
+from modules.ai_interview_prep import AIInterviewPreparation
+
+def _stores(directory, ttl_seconds=7200.0):
+    return [
+        MemorySessionStore(ttl_seconds),
+        SQLiteSessionStore(os.path.join(directory, 'sessions.db'), ttl_seconds),
+        FileSessionStore(os.path.join(directory, 'files'), ttl_seconds)
+    ]
+
+def test_serialization_is_compact():
+    print("🗜️ Testing session serialization...")
+
+    small = {'user_id': 'u1', 'current_question': 2}
+    large = {'responses': {f'q{i}': 'A fairly repetitive answer text' for i in range(100)}}
+
+    assert serialize_session(small).startswith(b'j')
+    assert serialize_session(large).startswith(b'z')
+    assert deserialize_session(serialize_session(small)) == small
+    assert deserialize_session(serialize_session(large)) == large
+    print(f"✅ {len(large['responses'])} responses stored in {len(serialize_session(large))} bytes")
+
+def test_backends_version_and_conflict():
+    print("🔢 Testing optimistic versioning...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for store in _stores(directory):
+            name = type(store).__name__
+            assert store.get('assessment', 'u1') is None
+
+            assert store.put('assessment', 'u1', {'step': 1}) == 1
+            data, version = store.get('assessment', 'u1')
+            assert data == {'step': 1} and version == 1
+
+            # A second writer that read the same version loses the race
+            assert store.put('assessment', 'u1', {'step': 2}, expected_version=version) == 2
+            try:
+                store.put('assessment', 'u1', {'step': 3}, expected_version=version)
+                assert False, f'{name} accepted a stale write'
+            except SessionConflictError:
+                pass
+            assert store.get('assessment', 'u1') == ({'step': 2}, 2)
+
+            # Namespaces are independent
+            assert store.get('interview', 'u1') is None
+
+            assert store.delete('assessment', 'u1') is True
+            assert store.get('assessment', 'u1') is None
+            assert store.delete('assessment', 'u1') is False
+            print(f"✅ {name} versioning works")
+
+def test_backends_expire_sessions():
+    print("⏳ Testing session expiry...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for store in _stores(directory, ttl_seconds=0.05):
+            store.put('interview', 'u2', {'answers': {}})
+            assert store.get('interview', 'u2') is not None
+            time.sleep(0.1)
+            assert store.get('interview', 'u2') is None
+            # An expired session counts as absent for compare-and-set
+            assert store.put('interview', 'u2', {'answers': {}}, expected_version=0) == 1
+            time.sleep(0.1)
+            assert store.purge_expired() == 1
+            print(f"✅ {type(store).__name__} expired and purged sessions")
+
+def test_sessions_survive_across_workers():
+    print("👥 Testing sessions shared between workers...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for make_store in (
+            lambda: SQLiteSessionStore(os.path.join(directory, 'sessions.db')),
+            lambda: FileSessionStore(os.path.join(directory, 'files'))
+        ):
+            # Two module instances with their own store objects stand in for two workers
+            worker_a = AISkillAssessment(make_store())
+            worker_b = AISkillAssessment(make_store())
+            started = worker_a.start_assessment('shared_user')
+
+            answer = worker_b.submit_answer(started['session_id'], 0)
+            assert 'error' not in answer, answer
+            assert answer['current_question'] == 1
+            assert worker_a.submit_answer('shared_user', 1)['current_question'] == 2
+
+            interview_a = AIInterviewPreparation(make_store())
+            interview_b = AIInterviewPreparation(make_store())
+            interview_a.start_mock_interview('shared_user', 'behavioral', 'intermediate')
+            result = interview_b.submit_answer('shared_user', 'I led a project under a tight deadline.')
+            assert 'error' not in result, result
+            print(f"✅ {type(worker_a.session_store).__name__} continued sessions across workers")
+
+def test_lifecycle_bounds_sessions():
+    print("🧹 Testing session lifecycle sweeps...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for store in _stores(directory):
+            store.max_sessions = 3
+            for i in range(5):
+                store.put('assessment', f'user{i}', {'responses': {'q1': i}})
+                time.sleep(0.002)
+            # Touching user0 makes it recently used in the memory store
+            store.get('assessment', 'user0')
+
+            manager = SessionLifecycleManager(store, sweep_interval=0)
+            manager.sweep()
+            gauges = manager.gauges()
+            assert gauges['live_sessions'] == 3, gauges
+            assert gauges['approx_bytes'] > 0
+            assert store.get('assessment', 'user4') is not None
+            assert store.get('assessment', 'user1') is None
+            print(f"✅ {gauges['backend']} holds {gauges['live_sessions']} sessions in {gauges['approx_bytes']} bytes")
+
+        # The memory store never exceeds its limit, even between sweeps
+        store = MemorySessionStore(max_sessions=2)
+        for i in range(4):
+            store.put('interview', f'user{i}', {})
+        assert store.stats()['sessions'] == 2 and store.evicted == 2
+
+def test_sweeper_expires_idle_sessions():
+    store = MemorySessionStore(ttl_seconds=0.05)
+    manager = SessionLifecycleManager(store, sweep_interval=0.02)
+    store.put('assessment', 'idle', {'responses': {}})
+    manager.start()
+    try:
+        deadline = time.time() + 2
+        while store.stats()['sessions'] and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        manager.stop()
+    assert store.stats() == {'sessions': 0, 'bytes': 0}
+    assert manager.gauges()['expired_total'] == 1
+
+def test_completed_sessions_are_removed():
+    store = MemorySessionStore()
+    interview = AIInterviewPreparation(store)
+    started = interview.start_mock_interview('finisher', 'behavioral', 'intermediate')
+    result = {}
+    for _ in range(started['total_questions']):
+        result = interview.submit_answer('finisher', 'I resolved a conflict by listening first.')
+    assert result.get('status') == 'completed'
+    assert store.get('interview', 'finisher') is None
+
+def test_incomplete_store_fails_on_creation():
+    class PartialStore(SessionStore):
+        def delete(self, namespace, session_id):
+            return False
+
+    try:
+        PartialStore()
+        assert False, 'expected an incomplete store to be rejected'
+    except TypeError:
+        pass
+
+def test_truncated_session_file_is_discarded():
+    print("🩹 Testing truncated session files...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = FileSessionStore(directory)
+        store.put('interview', 's1', {'step': 1})
+        path = store._path('interview', 's1')
+        with open(path, 'wb') as f:
+            f.write(b'\x00\x01\x02')
+
+        assert store.get('interview', 's1') is None
+        assert not os.path.exists(path)
+        assert store.put('interview', 's1', {'step': 2}, expected_version=0) == 1
+        assert store.get('interview', 's1') == ({'step': 2}, 1)
+    print("✅ Truncated file treated as missing and removed")
+
+def test_file_locks_are_exclusive_and_never_stale():
+    print("🔒 Testing file session locks...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = FileSessionStore(directory, lock_timeout=0.05)
+        version = store.put('interview', 's1', {'step': 1})
+        lock_path = store._path('interview', 's1') + '.lock'
+
+        # A lock file left behind by a crashed writer holds no flock and blocks nobody
+        open(lock_path, 'w').close()
+        version = store.put('interview', 's1', {'step': 2}, expected_version=version)
+        assert not os.path.exists(lock_path)
+
+        # A live holder is never broken, however long it has held the lock
+        fd = os.open(lock_path, os.O_CREAT | os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        os.utime(lock_path, (0, 0))
+        try:
+            store.put('interview', 's1', {'step': 3}, expected_version=version)
+            assert False, 'lock was taken from a live holder'
+        except SessionConflictError:
+            pass
+        finally:
+            os.close(fd)
+        assert store.get('interview', 's1') == ({'step': 2}, version)
+
+        results = []
+        def bump():
+            for _ in range(50):
+                while True:
+                    data, current = store.get('interview', 's1')
+                    try:
+                        store.put('interview', 's1', {'step': data['step'] + 1}, expected_version=current)
+                        break
+                    except SessionConflictError:
+                        continue
+            results.append(True)
+        store.lock_timeout = 5.0
+        threads = [threading.Thread(target=bump) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(results) == 4 and store.get('interview', 's1')[0] == {'step': 202}
+    print("✅ Crashed holders release, live holders are kept, and no update is lost")
+
+def test_sqlite_connections_are_returned():
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteSessionStore(os.path.join(directory, 'sessions.db'))
+        for i in range(50):
+            thread = threading.Thread(target=store.put, args=('interview', f's{i}', {'i': i}))
+            thread.start()
+            thread.join()
+        assert store._pool.stats()['leased'] == 1  # the constructing thread's
+        assert store.stats()['sessions'] == 50
+        store._pool.close()
+
+def test_missing_session_reports_error():
+    assessment = AISkillAssessment()
+    assert assessment.submit_answer('nobody', 0) == {'error': 'Assessment session not found'}
+    interview = AIInterviewPreparation()
+    assert interview.submit_answer('nobody', 'answer') == {'error': 'Interview session not found'}
+
+if __name__ == "__main__":
+    test_serialization_is_compact()
+    test_backends_version_and_conflict()
+    test_backends_expire_sessions()
+    test_sessions_survive_across_workers()
+    test_lifecycle_bounds_sessions()
+    test_sweeper_expires_idle_sessions()
+    test_completed_sessions_are_removed()
+    test_incomplete_store_fails_on_creation()
+    test_truncated_session_file_is_discarded()
+    test_file_locks_are_exclusive_and_never_stale()
+    test_sqlite_connections_are_returned()
+    test_missing_session_reports_error()
+    print("🎉 Session store tests passed!")